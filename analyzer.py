@@ -3,24 +3,33 @@
 """
 
 import logging
-from collections import defaultdict, Counter
+import math
+from collections import defaultdict
 from typing import Dict, List, Any
-import statistics
+import numpy as np
 from summarizer import PostSummarizer
+from post_table import PostTable
+from keyword_matcher import AI_KEYWORDS, clear_match_memos, get_keyword_matcher
+from topk import select_top_k, top_k_indices
+from trend_history import TrendHistory
 
 logger = logging.getLogger(__name__)
 
 class TrendAnalyzer:
     """趋势分析器"""
     
-    def __init__(self, summarizer: PostSummarizer = None):
+    def __init__(self, summarizer: PostSummarizer = None, trend_history: TrendHistory = None):
         """
         初始化趋势分析器
         
         Args:
             summarizer: 摘要生成器实例，如果为None则不生成摘要
+            trend_history: 跨日趋势历史，提供时趋势分析中增加 velocity_trends（需由调用方保存）
         """
         self.summarizer = summarizer
+        self.trend_history = trend_history
+        # 与 QualityScorer 共享的关键词匹配器（进程内只构建一次）
+        self.keyword_matcher = get_keyword_matcher(AI_KEYWORDS)
         logger.info("趋势分析器初始化完成")
     
     def create_hot_ranking(self, posts_dict: Dict[str, List[Dict]], 
@@ -46,7 +55,7 @@ class TrendAnalyzer:
         """
         logger.info(f"生成三个时间维度热门排行榜 TOP{top_k}...")
         
-        # 按时间维度分类帖子
+        # 按时间维度分类帖子（只记录来源，入榜后才复制）
         hot_posts = []
         week_posts = []
         month_posts = []
@@ -54,29 +63,29 @@ class TrendAnalyzer:
         for timeframe_key, posts in posts_dict.items():
             timeframe = timeframe_key.split('_')[0]
             
-            for post in posts:
-                post_copy = post.copy()
-                post_copy['source_key'] = timeframe_key
-                
-                if timeframe == 'hot':
-                    hot_posts.append(post_copy)
-                elif timeframe == 'day':
-                    # 将day时间维度也归入hot，因为都是当天内容
-                    hot_posts.append(post_copy)
-                elif timeframe == 'week':
-                    week_posts.append(post_copy)
-                elif timeframe == 'month':
-                    month_posts.append(post_copy)
+            if timeframe == 'hot':
+                hot_posts.extend((post, timeframe_key) for post in posts)
+            elif timeframe == 'day':
+                # 将day时间维度也归入hot，因为都是当天内容
+                hot_posts.extend((post, timeframe_key) for post in posts)
+            elif timeframe == 'week':
+                week_posts.extend((post, timeframe_key) for post in posts)
+            elif timeframe == 'month':
+                month_posts.extend((post, timeframe_key) for post in posts)
         
         # 对每个时间维度的帖子进行排序
         # hot维度：保持原有的hot排序（按热度实时排序）
-        hot_ranking = hot_posts[:top_k]
+        hot_ranking = self._copy_ranked(hot_posts[:top_k])
         
-        # week维度：按score降序排序
-        week_ranking = sorted(week_posts, key=lambda x: x.get('score', 0), reverse=True)[:top_k]
+        # week维度：按score降序取前K个
+        week_ranking = self._copy_ranked(
+            select_top_k(week_posts, top_k, key=lambda x: x[0].get('score', 0))
+        )
         
-        # month维度：按score降序排序
-        month_ranking = sorted(month_posts, key=lambda x: x.get('score', 0), reverse=True)[:top_k]
+        # month维度：按score降序取前K个
+        month_ranking = self._copy_ranked(
+            select_top_k(month_posts, top_k, key=lambda x: x[0].get('score', 0))
+        )
         
         # 生成摘要
         if generate_summaries and self.summarizer and fetcher:
@@ -119,10 +128,22 @@ class TrendAnalyzer:
             'month': month_ranking
         }
     
+    @staticmethod
+    def _copy_ranked(ranked) -> List[Dict[str, Any]]:
+        """复制入榜的帖子并标记来源列表（排行榜会写入摘要，不修改清洗结果）"""
+        ranking = []
+        for post, timeframe_key in ranked:
+            post_copy = post.copy()
+            post_copy['source_key'] = timeframe_key
+            ranking.append(post_copy)
+        return ranking
+    
     def analyze_trends(self, posts_dict: Dict[str, List[Dict]]) -> Dict[str, Any]:
         """
         综合趋势分析
         
+        帖子先转换为列式的 PostTable，各项统计在数组上聚合完成。
+        
         Args:
             posts_dict: 清洗后的数据
         
@@ -131,136 +152,178 @@ class TrendAnalyzer:
         """
         logger.info("开始趋势分析...")
         
+        # 关键词匹配结果只在本次运行内复用（本次的质量评分仍可命中）
+        clear_match_memos()
+        
         # 收集所有帖子
-        all_posts = []
-        for posts in posts_dict.values():
-            all_posts.extend(posts)
+        table = PostTable.from_posts_dict(posts_dict)
         
-        if not all_posts:
+        if not len(table):
             return {}
         
+        # 关键词只扫描一遍，趋势统计与跨日历史共用计数
+        keyword_counts = self._count_keywords(table)
+        
         analysis = {
-            'keyword_trends': self._analyze_keywords(all_posts),
-            'author_trends': self._analyze_authors(all_posts),
-            'subreddit_trends': self._analyze_subreddits(all_posts),
-            'engagement_trends': self._analyze_engagement(all_posts),
-            'time_distribution': self._analyze_time_distribution(posts_dict)
+            'keyword_trends': self._analyze_keywords(keyword_counts),
+            'author_trends': self._analyze_authors(table),
+            'subreddit_trends': self._analyze_subreddits(table),
+            'engagement_trends': self._analyze_engagement(table),
+            'time_distribution': self._analyze_time_distribution(table)
         }
         
+        if self.trend_history is not None:
+            analysis['velocity_trends'] = self._analyze_velocity(table, keyword_counts)
+        
         logger.info("趋势分析完成")
         return analysis
     
-    def _analyze_keywords(self, posts: List[Dict]) -> Dict[str, Any]:
-        """关键词趋势分析"""
-        ai_keywords = [
-            'llm', 'gpt', 'ai', 'machine learning', 'deep learning',
-            'transformer', 'model', 'training', 'fine-tune', 'finetune',
-            'langchain', 'openai', 'anthropic', 'claude', 'chatgpt',
-            'rag', 'vector', 'embedding', 'prompt', 'agent', 'ollama',
-            'local', 'inference', 'quantization', 'lora', 'rlhf'
-        ]
-        
+    def _count_keywords(self, table: PostTable) -> Dict[str, int]:
+        """统计每个关键词出现在多少个帖子中（按单词边界匹配，每个帖子一次扫描）"""
         keyword_counts = defaultdict(int)
-        
-        for post in posts:
-            text = f"{post.get('title', '')} {post.get('selftext_preview', '')}".lower()
-            
-            for keyword in ai_keywords:
-                if keyword in text:
-                    keyword_counts[keyword] += 1
-        
-        sorted_keywords = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)
+        for title, preview in zip(table.column('title', ''), table.column('selftext_preview', '')):
+            for keyword in self.keyword_matcher.match(f"{title} {preview}"):
+                keyword_counts[keyword] += 1
+        return keyword_counts
+    
+    def _analyze_keywords(self, keyword_counts: Dict[str, int]) -> Dict[str, Any]:
+        """关键词趋势分析"""
+        top_keywords = select_top_k(keyword_counts.items(), 20, key=lambda x: x[1])
         
         return {
             'total_keywords_found': len(keyword_counts),
-            'keyword_frequency': dict(sorted_keywords[:20]),
-            'trending_keywords': [kw for kw, count in sorted_keywords[:10] if count > 1]
+            'keyword_frequency': dict(top_keywords),
+            'trending_keywords': [kw for kw, count in top_keywords[:10] if count > 1]
         }
     
-    def _analyze_authors(self, posts: List[Dict]) -> Dict[str, Any]:
-        """作者趋势分析"""
-        author_stats = defaultdict(lambda: {'posts': 0, 'total_score': 0, 'total_comments': 0})
+    def _analyze_velocity(self, table: PostTable, keyword_counts: Dict[str, int]) -> Dict[str, Any]:
+        """
+        跨日趋势：把本次的关键词、社区、活跃作者帖子数记入历史，返回增速与异常上升的条目
+        
+        作者只记录本次有多于1个帖子的活跃作者：绝大多数作者每次只出现一次，全部记入会让
+        历史规模随作者数无限增长。因此某作者从单帖变为多帖时，在历史中表现为新出现的条目。
+        
+        Args:
+            table: 帖子表
+            keyword_counts: 本次各关键词的帖子数（与关键词趋势共用）
         
-        for post in posts:
-            author = post.get('author')
-            if author and author != '[deleted]':
-                author_stats[author]['posts'] += 1
-                author_stats[author]['total_score'] += post.get('score', 0)
-                author_stats[author]['total_comments'] += post.get('num_comments', 0)
+        Returns:
+            TrendHistory.observe 的结果
+        """
+        subreddits, subreddit_posts, _, _ = self._group_totals(table, 'subreddit', valid=bool)
+        authors, author_posts, _, _ = self._group_totals(
+            table, 'author', valid=lambda author: author and author != '[deleted]'
+        )
+        
+        return self.trend_history.observe({
+            'keywords': keyword_counts,
+            'subreddits': dict(zip(subreddits, subreddit_posts)),
+            # 只跟踪活跃作者（本次多于1个帖子），控制历史规模
+            'authors': {author: count for author, count in zip(authors, author_posts) if count > 1},
+        })
+    
+    @staticmethod
+    def _group_totals(table: PostTable, key: str, valid=None):
+        """
+        按分类列分组统计帖子数、总分数与总评论数
+        
+        Args:
+            table: 帖子表
+            key: 分组字段
+            valid: 判断分组取值是否参与统计的函数，None表示全部参与
+        
+        Returns:
+            (分组取值列表, 帖子数, 总分数, 总评论数)，按取值首次出现的顺序排列，
+            只包含至少有一个帖子的分组
+        """
+        codes, categories = table.codes(key)
+        allowed = [valid is None or bool(valid(value)) for value in categories]
+        # 编码-1（缺失）取到末尾追加的False
+        mask = np.array(allowed + [False], dtype=bool)[codes]
+        codes = codes[mask]
+        
+        posts = np.bincount(codes, minlength=len(categories))
+        totals = []
+        for column in ('score', 'num_comments'):
+            values = table.array(column)[mask]
+            total = np.zeros(len(categories), dtype=values.dtype)
+            # 逐行按顺序累加，浮点数结果与逐个相加一致
+            np.add.at(total, codes, values)
+            totals.append(total)
+        
+        groups = np.flatnonzero(posts)
+        return ([categories[i] for i in groups], posts[groups].tolist(),
+                totals[0][groups].tolist(), totals[1][groups].tolist())
+    
+    def _analyze_authors(self, table: PostTable) -> Dict[str, Any]:
+        """作者趋势分析"""
+        authors, posts, scores, comments = self._group_totals(
+            table, 'author', valid=lambda author: author and author != '[deleted]'
+        )
         
         top_authors = []
-        for author, stats in author_stats.items():
-            if stats['posts'] > 1:
+        for author, count, total_score, total_comments in zip(authors, posts, scores, comments):
+            if count > 1:
                 top_authors.append({
                     'author': author,
-                    'posts_count': stats['posts'],
-                    'avg_score': stats['total_score'] / stats['posts'],
-                    'total_engagement': stats['total_score'] + stats['total_comments']
+                    'posts_count': count,
+                    'avg_score': total_score / count,
+                    'total_engagement': total_score + total_comments
                 })
         
-        top_authors.sort(key=lambda x: x['total_engagement'], reverse=True)
-        
         return {
-            'total_unique_authors': len(author_stats),
-            'active_authors': len([a for a in author_stats.values() if a['posts'] > 1]),
-            'top_authors': top_authors[:10]
+            'total_unique_authors': len(authors),
+            'active_authors': sum(1 for count in posts if count > 1),
+            'top_authors': select_top_k(top_authors, 10, key=lambda x: x['total_engagement'])
         }
     
-    def _analyze_subreddits(self, posts: List[Dict]) -> Dict[str, Any]:
+    def _analyze_subreddits(self, table: PostTable) -> Dict[str, Any]:
         """Subreddit趋势分析"""
-        subreddit_stats = defaultdict(lambda: {'posts': 0, 'total_score': 0, 'avg_score': 0})
+        subreddits, posts, scores, _ = self._group_totals(table, 'subreddit', valid=bool)
         
-        for post in posts:
-            subreddit = post.get('subreddit')
-            if subreddit:
-                subreddit_stats[subreddit]['posts'] += 1
-                subreddit_stats[subreddit]['total_score'] += post.get('score', 0)
-        
-        for stats in subreddit_stats.values():
-            if stats['posts'] > 0:
-                stats['avg_score'] = stats['total_score'] / stats['posts']
+        subreddit_stats = {
+            subreddit: {'posts': count, 'total_score': total_score, 'avg_score': total_score / count}
+            for subreddit, count, total_score in zip(subreddits, posts, scores)
+        }
         
-        sorted_subs = sorted(
+        top_subs = select_top_k(
             subreddit_stats.items(),
-            key=lambda x: x[1]['total_score'],
-            reverse=True
+            10,
+            key=lambda x: x[1]['total_score']
         )
         
         return {
             'total_subreddits': len(subreddit_stats),
-            'subreddit_performance': {name: stats for name, stats in sorted_subs[:10]}
+            'subreddit_performance': {name: stats for name, stats in top_subs}
         }
     
-    def _analyze_engagement(self, posts: List[Dict]) -> Dict[str, Any]:
+    def _analyze_engagement(self, table: PostTable) -> Dict[str, Any]:
         """互动趋势分析"""
-        engagement_ratios = []
-        high_engagement_posts = []
+        scores = table.array('score')
+        comments = table.array('num_comments')
         
-        for post in posts:
-            score = post.get('score', 0)
-            comments = post.get('num_comments', 0)
-            
-            if score > 0:
-                ratio = comments / score
-                engagement_ratios.append(ratio)
-                
-                if ratio > 0.1:  # 评论率超过10%
-                    high_engagement_posts.append(post)
+        positive = np.flatnonzero(scores > 0)
+        engagement_ratios = comments[positive] / scores[positive]
         
-        high_engagement_posts.sort(key=lambda x: x['num_comments'], reverse=True)
+        # 评论率超过10%，按评论数降序（稳定排序，与原帖子顺序一致）
+        high_engagement = positive[engagement_ratios > 0.1]
+        top_engagement = high_engagement[top_k_indices(comments[high_engagement], 5)]
         
+        count = len(engagement_ratios)
         return {
-            'avg_engagement_ratio': statistics.mean(engagement_ratios) if engagement_ratios else 0,
-            'median_engagement_ratio': statistics.median(engagement_ratios) if engagement_ratios else 0,
-            'high_engagement_count': len(high_engagement_posts),
-            'top_engagement_posts': high_engagement_posts[:5]
+            'avg_engagement_ratio': math.fsum(engagement_ratios.tolist()) / count if count else 0,
+            'median_engagement_ratio': float(np.median(engagement_ratios)) if count else 0,
+            'high_engagement_count': len(high_engagement),
+            'top_engagement_posts': table.to_dicts(top_engagement)
         }
     
-    def _analyze_time_distribution(self, posts_dict: Dict[str, List[Dict]]) -> Dict[str, Any]:
+    def _analyze_time_distribution(self, table: PostTable) -> Dict[str, Any]:
         """时间分布分析"""
         timeframe_stats = {}
+        scores = table.array('score')
+        comments = table.array('num_comments')
         
-        for timeframe_key, posts in posts_dict.items():
+        for timeframe_key, rows in table.groups.items():
             timeframe = timeframe_key.split('_')[0]
             
             if timeframe not in timeframe_stats:
@@ -270,12 +333,11 @@ class TrendAnalyzer:
                     'avg_comments': 0
                 }
             
-            timeframe_stats[timeframe]['total_posts'] += len(posts)
+            count = rows.stop - rows.start
+            timeframe_stats[timeframe]['total_posts'] += count
             
-            if posts:
-                scores = [p.get('score', 0) for p in posts]
-                comments = [p.get('num_comments', 0) for p in posts]
-                timeframe_stats[timeframe]['avg_score'] += sum(scores) / len(posts)
-                timeframe_stats[timeframe]['avg_comments'] += sum(comments) / len(posts)
+            if count:
+                timeframe_stats[timeframe]['avg_score'] += sum(scores[rows].tolist()) / count
+                timeframe_stats[timeframe]['avg_comments'] += sum(comments[rows].tolist()) / count
         
-        return timeframe_stats
\ No newline at end of file
+        return timeframe_stats
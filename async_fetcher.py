@@ -0,0 +1,290 @@
+"""
+异步抓取后端 - 基于asyncpraw，以协程并发执行列表、搜索和评论请求
+
+asyncpraw 为可选依赖，未安装时 create_async_backend 返回None，调用方退回同步PRAW。
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from rate_limiter import create_reddit_rate_limiter
+
+try:
+    import asyncpraw
+except ImportError:  # pragma: no cover - 可选依赖
+    asyncpraw = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRedditBackend:
+    """asyncpraw抓取后端，所有请求共享一个并发上限和限流器"""
+
+    def __init__(self, config: Dict[str, Any], user_agent: str):
+        """
+        初始化异步后端
+
+        Args:
+            config: FETCH_CONFIG
+            user_agent: Reddit User-Agent
+        """
+        self.config = config
+        self.user_agent = user_agent
+        self.max_concurrency = config.get("async_concurrency", 16)
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        self._session = None
+        logger.info(f"异步抓取后端初始化完成 - 最大并发: {self.max_concurrency}")
+
+    def run(self, coro_factory, *args):
+        """
+        在后台事件循环中运行一次异步抓取任务（可从任意线程调用）
+
+        所有任务共用一个事件循环和一个asyncpraw会话，列表、搜索与评论请求之间
+        复用连接、并发上限和限流器。
+
+        Args:
+            coro_factory: 形如 async def f(session, *args) 的协程函数
+            *args: 传给协程函数的参数
+
+        Returns:
+            协程的返回值
+        """
+        future = asyncio.run_coroutine_threadsafe(self._run(coro_factory, *args), self._ensure_loop())
+        return future.result()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """首次调用时在守护线程中启动事件循环，进程退出时关闭会话"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="async-reddit", daemon=True
+                )
+                self._loop_thread.start()
+                atexit.register(self.close)
+            return self._loop
+
+    async def _run(self, coro_factory, *args):
+        # asyncpraw客户端必须在事件循环内创建，之后一直复用到 close
+        if self._session is None:
+            reddit = asyncpraw.Reddit(
+                client_id=os.getenv("REDDIT_CLIENT_ID"),
+                client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+                user_agent=self.user_agent
+            )
+            self._session = AsyncRedditSession(reddit, self.config, self.max_concurrency)
+        return await coro_factory(self._session, *args)
+
+    def close(self) -> None:
+        """关闭asyncpraw会话并停止事件循环"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._session is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._session.reddit.close(), loop).result()
+            except Exception as e:
+                logger.debug(f"关闭asyncpraw会话失败: {e}")
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop_thread.join()
+        loop.close()
+
+    def fetch_listings(self, fetcher, sub_infos: List[Dict],
+                       on_result: Optional[Callable[[str, Dict[str, List[Dict]]], None]] = None
+                       ) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        并发获取多个subreddit的列表
+
+        Args:
+            fetcher: RedditDataFetcher实例（复用其抓取计划、提取与缓存逻辑）
+            sub_infos: [{"name": "xxx", "limit": 50}]
+            on_result: 每个社区完成时的回调 (name, listings)，用于流式处理
+
+        Returns:
+            {name: listings}
+        """
+        return self.run(_fetch_listings, fetcher, sub_infos, on_result)
+
+    def fetch_submission_trees(self, fetcher, post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """并发获取多个帖子的详情与评论树，返回 {post_id: tree}"""
+        return self.run(_fetch_submission_trees, fetcher, post_ids)
+
+    def search(self, requests: List[Dict[str, Any]]) -> List[List[Any]]:
+        """
+        并发执行多个搜索请求
+
+        Args:
+            requests: [{"subreddit": "a+b", "query": ..., "sort": ..., "time_filter": ..., "limit": ...}]
+
+        Returns:
+            与requests一一对应的原始Submission列表，失败的请求返回空列表
+        """
+        return self.run(_search_all, requests)
+
+
+class AsyncRedditSession:
+    """后台事件循环内的asyncpraw会话：客户端、信号量与限流器"""
+
+    def __init__(self, reddit, config: Dict[str, Any], max_concurrency: int):
+        self.reddit = reddit
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.rate_limiter = create_reddit_rate_limiter(reddit, config)
+
+    async def throttle(self, tokens: int = 1) -> None:
+        """按限流器给出的等待时间让出事件循环"""
+        wait = self.rate_limiter.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def listing(self, generator_factory, tokens: int) -> List[Any]:
+        """在并发上限内拉取一个列表"""
+        async with self.semaphore:
+            await self.throttle(tokens)
+            return [item async for item in generator_factory()]
+
+
+async def _fetch_listings(session: AsyncRedditSession, fetcher, sub_infos: List[Dict],
+                          on_result) -> Dict[str, Dict[str, List[Dict]]]:
+    async def fetch_one(name, limit):
+        listings = await _fetch_subreddit_listings(session, fetcher, name, limit)
+        if on_result:
+            on_result(name, listings)
+        return listings
+
+    names = [sub_info['name'] for sub_info in sub_infos]
+    results = await asyncio.gather(
+        *(fetch_one(sub_info['name'], sub_info['limit']) for sub_info in sub_infos),
+        return_exceptions=True
+    )
+
+    subreddit_results = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error(f"获取 r/{name} 失败: {result}")
+        else:
+            subreddit_results[name] = result
+    return subreddit_results
+
+
+async def _fetch_subreddit_listings(session: AsyncRedditSession, fetcher,
+                                    name: str, limit: int) -> Dict[str, List[Dict]]:
+    """与 RedditDataFetcher._fetch_subreddit_listings 相同的抓取计划，hot与month宽列表并发请求"""
+    # 读缓存与刷新易变字段是同步的SQLite与PRAW调用，放到线程中执行，不阻塞事件循环
+    cached = await asyncio.to_thread(fetcher._load_cached_listings, name, limit)
+    if cached is not None:
+        return cached
+
+    subreddit = await session.reddit.subreddit(name)
+    day_limit, week_limit, wide_limit = fetcher._listing_limits(limit)
+
+    results = await asyncio.gather(
+        session.listing(lambda: subreddit.hot(limit=limit), fetcher._listing_cost(limit)),
+        session.listing(lambda: subreddit.top(time_filter='month', limit=wide_limit),
+                        fetcher._listing_cost(wide_limit)),
+        return_exceptions=True
+    )
+
+    # 某个请求失败时保留其余已获取的时间维度（不写入缓存）
+    fetched, errors = {}, []
+    for timeframe, result in zip(('hot', 'month'), results):
+        if isinstance(result, Exception):
+            errors.append(result)
+        else:
+            fetched[timeframe] = result
+
+    # 宽列表覆盖不足（或month请求失败）的时间维度单独请求
+    fallbacks = []
+    for timeframe, needed in (('day', day_limit), ('week', week_limit)):
+        posts = None
+        if 'month' in fetched:
+            posts = fetcher._derive_timeframe(fetched['month'], timeframe, needed, wide_limit)
+        if posts is None:
+            fallbacks.append((timeframe, needed))
+        else:
+            fetched[timeframe] = posts
+
+    results = await asyncio.gather(
+        *(session.listing(lambda timeframe=timeframe, needed=needed: subreddit.top(time_filter=timeframe, limit=needed),
+                          fetcher._listing_cost(needed))
+          for timeframe, needed in fallbacks),
+        return_exceptions=True
+    )
+    for (timeframe, _), result in zip(fallbacks, results):
+        if isinstance(result, Exception):
+            errors.append(result)
+        else:
+            fetched[timeframe] = result
+
+    if errors:
+        if not fetched:
+            raise errors[0]
+        logger.error(f"获取 r/{name} 部分失败，保留已获取的 {list(fetched)} 列表: {errors[0]}")
+    return await asyncio.to_thread(fetcher._build_listings, name, limit, fetched)
+
+
+async def _fetch_submission_trees(session: AsyncRedditSession, fetcher,
+                                  post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    results = await asyncio.gather(
+        *(_fetch_submission_tree(session, fetcher, post_id) for post_id in post_ids),
+        return_exceptions=True
+    )
+
+    trees = {}
+    for post_id, result in zip(post_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f"异步获取帖子 {post_id} 详情失败: {result}")
+        else:
+            trees[post_id] = result
+    return trees
+
+
+async def _fetch_submission_tree(session: AsyncRedditSession, fetcher, post_id: str) -> Dict[str, Any]:
+    async with session.semaphore:
+        await session.throttle()
+        submission = await session.reddit.submission(post_id)
+
+        forest = submission.comments
+        if fetcher._needs_replace_more(forest[:20]):
+            await session.throttle(5)
+            await forest.replace_more(limit=5)
+
+    comments = fetcher._build_comment_list(forest)
+    return await asyncio.to_thread(fetcher._build_submission_tree, submission, comments)
+
+
+async def _search_all(session: AsyncRedditSession, requests: List[Dict[str, Any]]) -> List[List[Any]]:
+    async def search_one(request):
+        subreddit = await session.reddit.subreddit(request['subreddit'])
+        try:
+            return await session.listing(
+                lambda: subreddit.search(
+                    query=request['query'],
+                    sort=request['sort'],
+                    time_filter=request['time_filter'],
+                    limit=request['limit']
+                ),
+                max(1, -(-request['limit'] // 100))
+            )
+        except Exception as e:
+            logger.error(f"异步搜索 '{request['query']}' 失败: {e}")
+            return []
+
+    return await asyncio.gather(*(search_one(request) for request in requests))
+
+
+def create_async_backend(config: Dict[str, Any], user_agent: str) -> Optional[AsyncRedditBackend]:
+    """按配置创建异步后端；未启用或asyncpraw未安装时返回None"""
+    if config.get("backend", "sync") != "async":
+        return None
+    if asyncpraw is None:
+        logger.warning("未安装asyncpraw，退回同步PRAW抓取（pip install asyncpraw）")
+        return None
+    return AsyncRedditBackend(config, user_agent)
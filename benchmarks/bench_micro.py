@@ -0,0 +1,116 @@
+"""
+微基准测试 - 在合成数据上测量清洗、趋势分析、质量评分与Markdown报告生成的耗时
+
+按规模（默认1千、10万、100万个帖子）依次运行：
+    DataCleaner.clean_posts -> TrendAnalyzer.analyze_trends
+    -> QualityScorer.score_posts（去重后的帖子）-> ReportGenerator._create_markdown_report
+
+每个步骤重复 --repeat 次取最小值；评分会写入 quality_score，因此每次重复前复制帖子。
+100万规模需要数GB内存，可用 --scales 指定规模。
+
+用法：
+    python benchmarks/bench_micro.py
+    python benchmarks/bench_micro.py --scales 1000,100000 --repeat 3 --output micro.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# fixtures 会把仓库根目录加入 sys.path
+from fixtures import synthetic_raw_posts
+from profiler import peak_rss_mb
+
+
+def _best_of(func: Callable[[], Any], repeat: int, setup: Callable[[], Any] = None):
+    """运行 repeat 次，返回 (最短耗时, 最后一次的结果)"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        result = func(argument) if setup else func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_scale(n: int, repeat: int = 1, seed: int = 0) -> Dict[str, Any]:
+    """
+    在 n 个合成帖子上运行各步骤
+
+    Returns:
+        {"posts": n, "seconds": {步骤: 耗时}, ...}
+    """
+    from analyzer import TrendAnalyzer
+    from cleaner import DataCleaner
+    from reporter import ReportGenerator
+    from scorer import QualityScorer
+
+    start = time.perf_counter()
+    raw_posts = synthetic_raw_posts(n, seed=seed)
+    generate_seconds = time.perf_counter() - start
+
+    seconds = {}
+    seconds['clean_posts'], cleaned = _best_of(
+        lambda: DataCleaner().clean_posts(raw_posts, remove_duplicates=False), repeat)
+
+    analyzer = TrendAnalyzer()
+    seconds['analyze_trends'], trend_analysis = _best_of(lambda: analyzer.analyze_trends(cleaned), repeat)
+
+    unique_posts = DataCleaner().deduplicate_posts(cleaned, keep='highest_hot')
+    scorer = QualityScorer()
+    seconds['score_posts'], scored = _best_of(
+        lambda posts: scorer.score_posts(posts, trend_analysis), repeat,
+        setup=lambda: [dict(post) for post in unique_posts])
+
+    rankings = analyzer.create_hot_ranking(cleaned, top_k=20, generate_summaries=False)
+    report_data = {
+        'timeframe_rankings': rankings,
+        'quality_ranking': scorer.get_top_quality_posts(scored, top_k=5),
+        'trend_analysis': trend_analysis,
+        'detailed_posts': [],
+        'llm_analysis': "## 基准测试\n\n合成数据，无LLM分析。",
+        'metadata': {'start_time': '', 'end_time': '', 'duration': 0},
+    }
+    reporter = ReportGenerator()
+    seconds['create_markdown_report'], markdown = _best_of(
+        lambda: reporter._create_markdown_report(report_data), repeat)
+
+    return {
+        'posts': n,
+        'unique_posts': len(unique_posts),
+        'generate_seconds': round(generate_seconds, 3),
+        'seconds': {name: round(value, 4) for name, value in seconds.items()},
+        'report_chars': len(markdown),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="清洗/分析/评分/报告生成的微基准测试")
+    parser.add_argument("--scales", default="1000,100000,1000000", help="逗号分隔的帖子数量")
+    parser.add_argument("--repeat", type=int, default=1, help="每个步骤重复次数（取最小值）")
+    parser.add_argument("--seed", type=int, default=0, help="合成数据的随机种子")
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    # ReportGenerator 初始化时创建LLM客户端，微基准不会发出请求
+    os.environ.setdefault('LLM_API_KEY', 'bench')
+    logging.basicConfig(level=logging.WARNING)
+
+    results: List[Dict[str, Any]] = []
+    for n in (int(value) for value in args.scales.split(',')):
+        result = bench_scale(n, repeat=args.repeat, seed=args.seed)
+        results.append(result)
+        steps = ', '.join(f"{name} {value:.3f}s" for name, value in result['seconds'].items())
+        print(f"{n:>9} 个帖子（去重后 {result['unique_posts']}）: {steps}；内存峰值 {result['peak_rss_mb']} MB")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
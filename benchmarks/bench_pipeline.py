@@ -0,0 +1,194 @@
+"""
+端到端基准测试 - 用回放的Reddit响应和本地假LLM服务运行 main.main()
+
+不需要Reddit或LLM凭据：RedditDataFetcher 使用 fixtures.ReplayReddit，
+摘要生成与综合分析指向 fake_llm_server.FakeLLMServer。每次运行在临时工作目录中进行
+（.cache 与 reports 都写在其中），结束后汇总 profiler 的阶段耗时与计数。
+
+配置通过环境变量传入（与生产运行一致，config.py 在导入时读取），因此比较不同的
+并发设置时用 --sweep 为每个取值启动一个子进程：
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --runs 2 --incremental          # 冷启动 + 增量热运行
+    python benchmarks/bench_pipeline.py --stream --llm-latency 1.0
+    python benchmarks/bench_pipeline.py --sweep SUMMARY_CONCURRENCY_MAX=2,4,8,16
+    python benchmarks/bench_pipeline.py --sweep REDDIT_FETCH_WORKERS=1,4 --reddit-latency 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+# fixtures 会把仓库根目录加入 sys.path
+from fake_llm_server import FakeLLMServer
+from fixtures import DEFAULT_FIXTURE_PATH, ROOT, ReplayReddit, load_or_generate_fixture
+
+# 汇总表中展示的计数
+SUMMARY_COUNTERS = (
+    'reddit_api_requests', 'reddit_rate_limit_wait_seconds', 'reddit_cache_hits',
+    'reddit_day_derived', 'reddit_day_fallback',
+    'reddit_week_derived', 'reddit_week_fallback',
+    'llm_requests', 'llm_prompt_tokens', 'llm_completion_tokens', 'retries',
+    'summary_cache_hits', 'checkpoint_restored',
+)
+
+
+def parse_args(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="离线运行主流程的端到端基准测试")
+    parser.add_argument("--fixture", default=str(ROOT / DEFAULT_FIXTURE_PATH),
+                        help="Reddit fixture路径，不存在时生成合成fixture")
+    parser.add_argument("--runs", type=int, default=1, help="在同一工作目录中连续运行的次数（之后的运行命中缓存）")
+    parser.add_argument("--fresh", action="store_true", help="每次运行前清空工作目录中的 .cache")
+    parser.add_argument("--stream", action="store_true", help="以 --stream 运行主流程")
+    parser.add_argument("--incremental", action="store_true", help="以 --incremental 运行主流程")
+    parser.add_argument("--reddit-latency", type=float, default=0.05, help="每次Reddit请求的延迟（秒）")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="每次LLM请求的基础延迟（秒）")
+    parser.add_argument("--llm-per-token-latency", type=float, default=0.0, help="每个输出token的额外延迟（秒）")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="LLM请求返回429的概率")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="运行前设置的环境变量（如 SUMMARY_BATCH_SIZE=1），可重复")
+    parser.add_argument("--sweep", metavar="KEY=V1,V2,...",
+                        help="对一个环境变量的多个取值分别运行（每个取值一个子进程）并对比")
+    parser.add_argument("--workdir", help="工作目录（默认临时目录，运行结束后删除）")
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    parser.add_argument("--verbose", action="store_true", help="显示主流程的输出与INFO日志")
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args) -> List[Dict[str, Any]]:
+    """启动假LLM服务、回放Reddit，在工作目录中运行主流程 args.runs 次"""
+    server = FakeLLMServer(latency=args.llm_latency, per_token_latency=args.llm_per_token_latency,
+                           error_rate=args.llm_error_rate).start()
+
+    # config.py 在导入时读取环境变量，必须在导入主流程（包括生成fixture）之前设置
+    os.environ.update({
+        'LLM_API_KEY': 'bench',
+        'LLM_BASE_URL': server.base_url,
+        'LLM_ANALYSIS_BASE_URL': server.base_url,
+    })
+    for item in args.env:
+        key, _, value = item.partition('=')
+        os.environ[key] = value
+
+    fixture = load_or_generate_fixture(args.fixture)
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='reddit-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    replays = []
+
+    def replay_reddit(**kwargs):
+        reddit = ReplayReddit(fixture, latency=args.reddit_latency)
+        replays.append(reddit)
+        return reddit
+
+    results = []
+    try:
+        import fetcher
+        import main
+        from profiler import profiler
+
+        if not args.verbose:
+            logging.getLogger().setLevel(logging.WARNING)
+
+        argv = ['main.py'] + (['--stream'] if args.stream else []) + (['--incremental'] if args.incremental else [])
+        for run in range(1, args.runs + 1):
+            if args.fresh:
+                shutil.rmtree(workdir / '.cache', ignore_errors=True)
+            profiler.reset()
+            server.reset_stats()
+            replays.clear()
+
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            start = time.perf_counter()
+            with mock.patch.object(fetcher.praw, 'Reddit', replay_reddit), \
+                    mock.patch.object(sys, 'argv', argv), output:
+                main.main()
+            wall = time.perf_counter() - start
+
+            profile = profiler.to_dict()
+            reddit_calls = {}
+            for reddit in replays:
+                for kind, calls in reddit.calls.items():
+                    reddit_calls[kind] = reddit_calls.get(kind, 0) + calls
+            results.append({
+                'run': run,
+                'wall_seconds': round(wall, 3),
+                'peak_rss_mb': profile['peak_rss_mb'],
+                'stages': {stage['name']: stage['wall_seconds'] for stage in profile['stages']},
+                'counters': profile['counters'],
+                'timings': profile['timings'],
+                'reddit_calls': reddit_calls,
+                'llm_server': dict(server.stats),
+                'env': dict(item.partition('=')[::2] for item in args.env),
+            })
+    finally:
+        os.chdir(previous_cwd)
+        server.stop()
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
+
+
+def run_sweep(args) -> List[Dict[str, Any]]:
+    """为 --sweep 的每个取值启动一个子进程运行基准测试"""
+    key, _, values = args.sweep.partition('=')
+    argv = [arg for arg in sys.argv[1:] if not arg.startswith('--sweep')]
+    if args.sweep in argv:
+        argv.remove(args.sweep)
+
+    results = []
+    for value in values.split(','):
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            output_path = f.name
+        try:
+            subprocess.run(
+                [sys.executable, __file__, *argv, '--env', f"{key}={value}", '--output', output_path],
+                check=True, stdout=subprocess.DEVNULL if not args.verbose else None
+            )
+            results.extend(json.loads(Path(output_path).read_text(encoding='utf-8')))
+        finally:
+            os.unlink(output_path)
+    return results
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """打印每次运行的总耗时、阶段耗时与关键计数"""
+    for result in results:
+        label = ' '.join(f"{k}={v}" for k, v in result['env'].items())
+        print(f"\n=== 运行 {result['run']}{'  ' + label if label else ''} ===")
+        print(f"总耗时 {result['wall_seconds']:.2f}s, 内存峰值 {result['peak_rss_mb']} MB")
+        print("阶段耗时: " + ', '.join(f"{name} {seconds:.2f}s" for name, seconds in result['stages'].items()))
+        counters = result['counters']
+        print("计数: " + ', '.join(f"{name}={counters[name]}" for name in SUMMARY_COUNTERS if name in counters))
+        print(f"Reddit请求: {result['reddit_calls']}")
+        server = result['llm_server']
+        print(f"LLM服务: {server['requests']} 个请求, 最大并发 {server['peak_in_flight']}, "
+              f"429 {server['errors']} 次")
+
+
+def main():
+    args = parse_args()
+    results = run_sweep(args) if args.sweep else run_benchmark(args)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    if not args.output or args.sweep:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
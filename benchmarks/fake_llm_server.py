@@ -0,0 +1,235 @@
+"""
+本地OpenAI兼容的假LLM服务 - 基准测试时替代真实的LLM接口
+
+实现 POST /v1/chat/completions：
+- 每个请求休眠 latency 秒（加上 ±jitter 的随机抖动，以及按输出token计的 per_token_latency）
+- 按 error_rate 的概率返回429（带Retry-After头），用于观察自适应并发与重试
+- 批量摘要请求（提示词末行为 [{"id":...,"content":...}] 数组）返回以帖子id为键的JSON对象
+- stream=True 时以SSE分块返回，stream_options.include_usage 时最后一块附带usage
+- 响应中始终包含usage（按约4字符/token估算），供运行剖析统计token用量
+
+用法：
+    python benchmarks/fake_llm_server.py --port 8765 --latency 0.5
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 LLM_ANALYSIS_BASE_URL=http://127.0.0.1:8765/v1 python main.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+SUMMARY_TEXT = "帖子讨论了模型在本地推理中的表现，作者分享了量化与上下文长度的实测数据，评论区补充了不同硬件上的对比。"
+ANALYSIS_TEXT = "## 核心趋势\n\n" + "社区讨论集中在本地部署、推理成本与智能体工具链。\n\n" * 20
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeLLMServer:
+    """在后台线程中运行的假LLM服务"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5,
+                 jitter: float = 0.1, per_token_latency: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 0):
+        """
+        初始化服务（port为0时自动选择空闲端口）
+
+        Args:
+            host: 监听地址
+            port: 监听端口
+            latency: 每个请求的基础延迟（秒）
+            jitter: 延迟的随机抖动比例（0.1 表示 ±10%）
+            per_token_latency: 每个输出token额外的延迟（秒），模拟长输出的生成耗时
+            error_rate: 返回429的概率
+            seed: 抖动与错误注入的随机种子
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.per_token_latency = per_token_latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'requests': 0, 'errors': 0, 'in_flight': 0, 'peak_in_flight': 0,
+                      'prompt_tokens': 0, 'completion_tokens': 0}
+
+        server = self
+
+        class Handler(_ChatCompletionHandler):
+            fake = server
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'FakeLLMServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _begin(self) -> bool:
+        """登记一个请求，返回是否注入429错误"""
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.stats['errors'] += 1
+            jitter = self._rng.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, self.latency * (1 + jitter)))
+        return failed
+
+    def _end(self, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        with self._lock:
+            self.stats['in_flight'] -= 1
+            self.stats['prompt_tokens'] += prompt_tokens
+            self.stats['completion_tokens'] += completion_tokens
+
+    @staticmethod
+    def reply_for(messages) -> str:
+        """按提示词类型构造回复：批量摘要返回JSON对象，综合分析返回长文本，其余返回单条摘要"""
+        prompt = messages[-1].get('content', '') if messages else ''
+        last_line = prompt.rstrip().rsplit('\n', 1)[-1]
+        if last_line.startswith('[{'):
+            try:
+                items = json.loads(last_line)
+                return json.dumps({item['id']: SUMMARY_TEXT for item in items}, ensure_ascii=False)
+            except (ValueError, KeyError, TypeError):
+                pass
+        if len(prompt) > 5000:
+            return ANALYSIS_TEXT
+        return SUMMARY_TEXT
+
+
+class _ChatCompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeLLMServer = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+
+        request = json.loads(body or b'{}')
+        failed = self.fake._begin()
+        if failed:
+            self.fake._end()
+            self._send_json(429, {'error': {'message': 'rate limited', 'type': 'rate_limit_error'}},
+                            headers={'Retry-After': '1'})
+            return
+
+        text = self.fake.reply_for(request.get('messages', []))
+        usage = {
+            'prompt_tokens': sum(_estimate_tokens(m.get('content') or '') for m in request.get('messages', [])),
+            'completion_tokens': _estimate_tokens(text),
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        if self.fake.per_token_latency:
+            time.sleep(usage['completion_tokens'] * self.fake.per_token_latency)
+
+        try:
+            if request.get('stream'):
+                self._send_stream(request, text, usage)
+            else:
+                self._send_json(200, {
+                    'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'fake'),
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': text}}],
+                    'usage': usage,
+                })
+        finally:
+            self.fake._end(usage['prompt_tokens'], usage['completion_tokens'])
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, request: Dict[str, Any], text: str, usage: Dict[str, int]):
+        # 流式响应不带Content-Length，发送完毕后关闭连接
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        base = {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': request.get('model', 'fake'),
+        }
+        for i in range(0, len(text), 64):
+            self._send_event({**base, 'choices': [{'index': 0, 'delta': {'content': text[i:i + 64]},
+                                                    'finish_reason': None}]})
+        self._send_event({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})
+        if (request.get('stream_options') or {}).get('include_usage'):
+            self._send_event({**base, 'choices': [], 'usage': usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _send_event(self, payload: Dict[str, Any]):
+        self.wfile.write(b"data: " + json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地OpenAI兼容的假LLM服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="每个请求的基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.1, help="延迟抖动比例")
+    parser.add_argument("--per-token-latency", type=float, default=0.0, help="每个输出token的额外延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回429的概率")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.latency, args.jitter,
+                           args.per_token_latency, args.error_rate)
+    print(f"假LLM服务已启动: {server.base_url}（Ctrl+C 退出）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"请求统计: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
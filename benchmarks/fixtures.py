@@ -0,0 +1,483 @@
+"""
+基准测试数据 - 合成帖子、Reddit响应录制与回放
+
+- synthetic_raw_posts：直接生成与 fetch_posts_from_subreddits 输出结构相同的帖子，用于微基准
+- generate_fixture / record_fixture：生成（或用真实凭据录制）Reddit列表与评论树
+- ReplayReddit：按fixture回放的 praw.Reddit 替身，可配置每次请求的延迟
+
+fixture 为gzip压缩的JSON：
+    {
+        "recorded_at": 录制时间戳,
+        "subreddits": {社区名: {"hot": [id], "top_day": [id], "top_week": [id], "top_month": [id]}},
+        "submissions": {id: {PRAW Submission属性..., "comments": [评论树]}}
+    }
+回放时所有 created_utc 按 (当前时间 - recorded_at) 平移，帖子的相对年龄与录制时一致。
+
+用法：
+    python benchmarks/fixtures.py generate --out .cache/bench/reddit_fixture.json.gz
+    python benchmarks/fixtures.py record --out .cache/bench/reddit_recorded.json.gz   # 需要Reddit凭据
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import math
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE_PATH = ".cache/bench/reddit_fixture.json.gz"
+
+TIMEFRAME_SECONDS = {'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400}
+
+# 列表请求的每页上限，与Reddit一致
+LISTING_SIZE = 100
+
+_TOPIC_WORDS = [
+    'llm', 'gpt', 'ai', 'machine learning', 'deep learning', 'transformer', 'model',
+    'training', 'fine-tune', 'langchain', 'openai', 'anthropic', 'claude', 'chatgpt',
+    'rag', 'vector', 'embedding', 'prompt', 'agent', 'ollama', 'local', 'inference',
+    'quantization', 'lora', 'rlhf',
+]
+_FILLER_WORDS = [
+    'new', 'release', 'benchmark', 'results', 'my', 'experience', 'with', 'running',
+    'on', 'a', 'single', 'gpu', 'why', 'does', 'the', 'open', 'source', 'paper',
+    'discussion', 'question', 'about', 'performance', 'dataset', 'tool', 'guide',
+    'is', 'better', 'than', 'how', 'to', 'build', 'fast', 'cheap', 'weights', 'context',
+]
+_FLAIRS = ['Discussion', 'News', 'Question | Help', 'Resources', 'Research', 'Funny', None]
+
+
+# ---------------------------------------------------------------------------
+# 合成数据
+# ---------------------------------------------------------------------------
+
+def _synthetic_text(rng: random.Random, words: int) -> str:
+    return ' '.join(
+        rng.choice(_TOPIC_WORDS) if rng.random() < 0.3 else rng.choice(_FILLER_WORDS)
+        for _ in range(words)
+    )
+
+
+def _synthetic_submission(rng: random.Random, post_id: str, subreddit: str, now: float,
+                          authors: int = 500) -> Dict[str, Any]:
+    """生成一个帖子的PRAW属性（分数近似对数正态分布，越新的帖子越多）"""
+    age = TIMEFRAME_SECONDS['month'] * rng.random() ** 2
+    selftext_words = rng.choice([0, 0, 5, 20, 60, 150])
+    return {
+        'id': post_id,
+        'title': _synthetic_text(rng, rng.randint(2, 16)).capitalize(),
+        'author': None if rng.random() < 0.01 else f"user_{rng.randrange(authors)}",
+        'subreddit': subreddit,
+        'score': int(rng.lognormvariate(4, 1.6)) - (5 if rng.random() < 0.02 else 0),
+        'upvote_ratio': round(rng.uniform(0.5, 1.0), 2),
+        'num_comments': int(rng.lognormvariate(2.5, 1.3)),
+        'created_utc': now - age,
+        'url': f"https://www.reddit.com/r/{subreddit}/comments/{post_id}/",
+        'is_self': selftext_words > 0,
+        'selftext': _synthetic_text(rng, selftext_words),
+        'link_flair_text': rng.choice(_FLAIRS),
+        'permalink': f"/r/{subreddit}/comments/{post_id}/",
+        'stickied': rng.random() < 0.01,
+        'locked': rng.random() < 0.01,
+    }
+
+
+def _synthetic_comments(rng: random.Random, post_id: str, created_utc: float, now: float,
+                        count: int, depth: int = 2) -> List[Dict[str, Any]]:
+    comments = []
+    for i in range(count):
+        comments.append({
+            'id': f"{post_id}c{depth}{i}",
+            'author': f"user_{rng.randrange(2000)}",
+            'body': _synthetic_text(rng, rng.randint(3, 60)),
+            'score': int(rng.lognormvariate(1.5, 1.2)),
+            'created_utc': rng.uniform(created_utc, now),
+            'is_submitter': rng.random() < 0.05,
+            'replies': _synthetic_comments(rng, f"{post_id}c{depth}{i}", created_utc, now,
+                                           rng.randint(0, 3), depth - 1) if depth > 1 else [],
+        })
+    comments.sort(key=lambda c: c['score'], reverse=True)
+    return comments
+
+
+def basic_post(submission: Dict[str, Any]) -> Dict[str, Any]:
+    """把PRAW属性转换为基础帖子字典（与 RedditDataFetcher._extract_basic_post 的输出一致）"""
+    return {
+        'id': submission['id'],
+        'title': submission['title'],
+        'author': submission['author'] or "[deleted]",
+        'subreddit': submission['subreddit'],
+        'score': submission['score'],
+        'upvote_ratio': submission['upvote_ratio'],
+        'num_comments': submission['num_comments'],
+        'created_utc': datetime.fromtimestamp(submission['created_utc']).isoformat(),
+        'url': submission['url'],
+        'is_self': submission['is_self'],
+        'selftext_preview': submission['selftext'][:200] if submission['selftext'] else "",
+        'flair': submission['link_flair_text'],
+        'permalink': f"https://reddit.com{submission['permalink']}",
+        'stickied': submission['stickied'],
+        'locked': submission['locked'],
+    }
+
+
+def _subreddit_names(subreddit_config: Dict[str, List[Dict]] = None) -> List[str]:
+    if subreddit_config is None:
+        from main import SUBREDDIT_CONFIG
+        subreddit_config = SUBREDDIT_CONFIG
+    return [sub_info['name'] for subs in subreddit_config.values() for sub_info in subs]
+
+
+def synthetic_raw_posts(n: int, seed: int = 0,
+                        subreddit_config: Dict[str, List[Dict]] = None) -> Dict[str, List[Dict]]:
+    """
+    生成 n 个合成帖子，结构与 fetch_posts_from_subreddits 的输出相同
+
+    各社区的 hot/day/week/month 列表均分 n 个位置；约30%的位置复用同一社区中已生成的帖子
+    （同一帖子出现在多个时间维度，覆盖去重逻辑），少量帖子为负分或标题过短（覆盖过滤逻辑）。
+
+    Args:
+        n: 帖子总数（含重复出现）
+        seed: 随机种子，相同参数生成相同数据
+        subreddit_config: 社区配置，默认使用 main.SUBREDDIT_CONFIG
+
+    Returns:
+        {"timeframe_sub": [posts]}
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    names = _subreddit_names(subreddit_config)
+    keys = [(timeframe, name) for name in names for timeframe in ('hot', 'day', 'week', 'month')]
+    authors = max(50, n // 20)
+
+    posts_dict = {}
+    seen_by_subreddit = {name: [] for name in names}
+    for index, (timeframe, name) in enumerate(keys):
+        size = n // len(keys) + (1 if index < n % len(keys) else 0)
+        seen = seen_by_subreddit[name]
+        posts = []
+        for i in range(size):
+            if seen and rng.random() < 0.3:
+                posts.append(dict(rng.choice(seen)))
+                continue
+            post = basic_post(_synthetic_submission(rng, f"{name[:3].lower()}{index}x{i}", name, now, authors))
+            if rng.random() < 0.01:
+                post['title'] = post['title'][:6]
+            seen.append(post)
+            posts.append(post)
+        if timeframe != 'hot':
+            posts.sort(key=lambda p: p['score'], reverse=True)
+        posts_dict[f"{timeframe}_{name}"] = posts
+
+    return posts_dict
+
+
+def generate_fixture(subreddit_config: Dict[str, List[Dict]] = None, seed: int = 0,
+                     posts_per_subreddit: int = 200, comments_per_post: int = 20) -> Dict[str, Any]:
+    """
+    生成合成的Reddit fixture（无需凭据，结构与 record_fixture 相同）
+
+    Args:
+        subreddit_config: 社区配置，默认使用 main.SUBREDDIT_CONFIG
+        seed: 随机种子
+        posts_per_subreddit: 每个社区的帖子池大小
+        comments_per_post: 每个帖子的顶层评论数
+
+    Returns:
+        fixture字典
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    fixture = {'recorded_at': now, 'subreddits': {}, 'submissions': {}}
+
+    for name in _subreddit_names(subreddit_config):
+        pool = []
+        for i in range(posts_per_subreddit):
+            submission = _synthetic_submission(rng, f"{name[:3].lower()}{i:04d}", name, now)
+            submission['comments'] = _synthetic_comments(
+                rng, submission['id'], submission['created_utc'], now,
+                min(comments_per_post, submission['num_comments'])
+            )
+            fixture['submissions'][submission['id']] = submission
+            pool.append(submission)
+
+        def hotness(s):
+            return math.log10(max(1, s['score'])) - (now - s['created_utc']) / 45000
+
+        listings = {'hot': [s['id'] for s in sorted(pool, key=hotness, reverse=True)[:LISTING_SIZE]]}
+        for timeframe, seconds in TIMEFRAME_SECONDS.items():
+            in_window = [s for s in pool if now - s['created_utc'] <= seconds]
+            in_window.sort(key=lambda s: s['score'], reverse=True)
+            listings[f"top_{timeframe}"] = [s['id'] for s in in_window[:LISTING_SIZE]]
+        fixture['subreddits'][name] = listings
+
+    return fixture
+
+
+# ---------------------------------------------------------------------------
+# 录制
+# ---------------------------------------------------------------------------
+
+def _record_submission(submission) -> Dict[str, Any]:
+    return {
+        'id': submission.id,
+        'title': submission.title,
+        'author': str(submission.author) if submission.author else None,
+        'subreddit': submission.subreddit.display_name,
+        'score': submission.score,
+        'upvote_ratio': submission.upvote_ratio,
+        'num_comments': submission.num_comments,
+        'created_utc': submission.created_utc,
+        'url': submission.url,
+        'is_self': submission.is_self,
+        'selftext': submission.selftext,
+        'link_flair_text': submission.link_flair_text,
+        'permalink': submission.permalink,
+        'stickied': submission.stickied,
+        'locked': submission.locked,
+    }
+
+
+def _record_comments(forest, depth: int = 2) -> List[Dict[str, Any]]:
+    comments = []
+    for comment in list(forest)[:20]:
+        if not hasattr(comment, 'body'):
+            continue
+        comments.append({
+            'id': comment.id,
+            'author': str(comment.author) if comment.author else None,
+            'body': comment.body,
+            'score': comment.score,
+            'created_utc': comment.created_utc,
+            'is_submitter': comment.is_submitter,
+            'replies': _record_comments(comment.replies, depth - 1) if depth > 1 else [],
+        })
+    return comments
+
+
+def record_fixture(subreddit_config: Dict[str, List[Dict]] = None,
+                   comment_posts: int = 30) -> Dict[str, Any]:
+    """
+    使用真实Reddit凭据（环境变量 REDDIT_CLIENT_ID 等）录制fixture
+
+    录制各社区的 hot 与 top(day/week/month) 列表（各一页），并为每个列表分数最高的
+    comment_posts 个帖子录制评论树。未录制评论的帖子回放时评论为空。
+
+    Returns:
+        fixture字典
+    """
+    import os
+    import praw
+
+    reddit = praw.Reddit(
+        client_id=os.getenv("REDDIT_CLIENT_ID"),
+        client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+        user_agent=os.getenv("REDDIT_USER_AGENT", "python:reddit-analyzer:1.0")
+    )
+    fixture = {'recorded_at': time.time(), 'subreddits': {}, 'submissions': {}}
+    with_comments = set()
+
+    for name in _subreddit_names(subreddit_config):
+        subreddit = reddit.subreddit(name)
+        listings = {'hot': list(subreddit.hot(limit=LISTING_SIZE))}
+        for timeframe in TIMEFRAME_SECONDS:
+            listings[f"top_{timeframe}"] = list(subreddit.top(time_filter=timeframe, limit=LISTING_SIZE))
+
+        fixture['subreddits'][name] = {}
+        for key, submissions in listings.items():
+            fixture['subreddits'][name][key] = [s.id for s in submissions]
+            for submission in submissions:
+                fixture['submissions'].setdefault(submission.id, _record_submission(submission))
+            with_comments.update(s.id for s in submissions[:comment_posts])
+        logger.info(f"已录制 r/{name} 的列表")
+
+    for post_id in sorted(with_comments):
+        submission = reddit.submission(id=post_id)
+        submission.comments.replace_more(limit=0)
+        fixture['submissions'][post_id]['comments'] = _record_comments(submission.comments)
+    logger.info(f"已录制 {len(with_comments)} 个帖子的评论树")
+
+    return fixture
+
+
+def save_fixture(fixture: Dict[str, Any], path: str) -> str:
+    """保存fixture（gzip压缩的JSON）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(fixture, f, ensure_ascii=False, separators=(',', ':'))
+    return str(path)
+
+
+def load_fixture(path: str) -> Dict[str, Any]:
+    """加载fixture"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_or_generate_fixture(path: str = DEFAULT_FIXTURE_PATH, seed: int = 0) -> Dict[str, Any]:
+    """加载fixture，不存在时生成合成fixture并保存"""
+    if Path(path).exists():
+        return load_fixture(path)
+    fixture = generate_fixture(seed=seed)
+    save_fixture(fixture, path)
+    logger.info(f"已生成合成fixture: {path}")
+    return fixture
+
+
+# ---------------------------------------------------------------------------
+# 回放
+# ---------------------------------------------------------------------------
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class ReplayCommentForest(list):
+    """评论森林替身（所有评论均已展开，replace_more 只模拟一次请求的延迟）"""
+
+    def __init__(self, comments: Iterable, reddit: 'ReplayReddit'):
+        super().__init__(comments)
+        self._reddit = reddit
+
+    def replace_more(self, limit: int = 32):
+        self._reddit._request('replace_more')
+        return []
+
+
+class ReplayReddit:
+    """
+    按fixture回放的 praw.Reddit 替身
+
+    支持 RedditDataFetcher 用到的接口：subreddit(name).hot/top/search、submission(id)、
+    info(fullnames)、auth.limits 与 user.me()。每次请求休眠 latency 秒；
+    auth.limits 按Reddit的10分钟窗口（1000次）模拟剩余额度。
+    """
+
+    QUOTA = 1000
+    WINDOW = 600
+
+    def __init__(self, fixture: Dict[str, Any], latency: float = 0.0):
+        self.fixture = fixture
+        self.latency = latency
+        self.offset = time.time() - fixture.get('recorded_at', time.time())
+        self.calls = {}
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._window_used = 0
+        self._submissions = {}
+        self.user = _Namespace(me=self._me)
+        self.auth = self
+
+    @property
+    def limits(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'remaining': float(max(0, self.QUOTA - self._window_used)),
+                'used': self._window_used,
+                'reset_timestamp': self._window_start + self.WINDOW,
+            }
+
+    def _request(self, kind: str) -> None:
+        with self._lock:
+            if time.time() - self._window_start >= self.WINDOW:
+                self._window_start, self._window_used = time.time(), 0
+            self._window_used += 1
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _me(self):
+        raise RuntimeError("回放模式没有登录用户")
+
+    def _submission(self, post_id: str):
+        submission = self._submissions.get(post_id)
+        if submission is None:
+            data = self.fixture['submissions'].get(post_id)
+            if data is None:
+                raise LookupError(f"fixture中没有帖子 {post_id}")
+            submission = self._build_submission(data)
+            self._submissions[post_id] = submission
+        return submission
+
+    def _build_submission(self, data: Dict[str, Any]):
+        attrs = dict(data)
+        attrs['created_utc'] = data['created_utc'] + self.offset
+        attrs['subreddit'] = _Namespace(display_name=data['subreddit'])
+        attrs['comments'] = self._build_forest(data.get('comments', []))
+        return _Namespace(**attrs)
+
+    def _build_forest(self, comments: List[Dict[str, Any]]) -> ReplayCommentForest:
+        return ReplayCommentForest((
+            _Namespace(**{
+                **comment,
+                'created_utc': comment['created_utc'] + self.offset,
+                'replies': self._build_forest(comment.get('replies', [])),
+            })
+            for comment in comments
+        ), self)
+
+    def _listing(self, name: str, key: str, limit: int) -> List:
+        self._request(key)
+        ids = self.fixture['subreddits'].get(name, {}).get(key, [])
+        return [self._submission(post_id) for post_id in ids[:limit]]
+
+    def subreddit(self, name: str):
+        def top(time_filter: str = 'all', limit: int = 100):
+            return iter(self._listing(name, f"top_{time_filter}", limit))
+
+        def search(query: str = '', sort: str = 'relevance', time_filter: str = 'all', limit: int = 100):
+            return iter(self._listing(name, f"top_{time_filter}", limit))
+
+        return _Namespace(
+            display_name=name,
+            hot=lambda limit=100: iter(self._listing(name, 'hot', limit)),
+            top=top,
+            search=search,
+        )
+
+    def submission(self, id: str = None):
+        self._request('submission')
+        return self._submission(id)
+
+    def info(self, fullnames: List[str] = None):
+        self._request('info')
+        for fullname in fullnames or []:
+            post_id = fullname.split('_', 1)[-1]
+            if post_id in self.fixture['submissions']:
+                yield self._submission(post_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成或录制基准测试用的Reddit fixture")
+    parser.add_argument("command", choices=["generate", "record"])
+    parser.add_argument("--out", default=DEFAULT_FIXTURE_PATH, help="输出路径（gzip压缩的JSON）")
+    parser.add_argument("--seed", type=int, default=0, help="generate：随机种子")
+    parser.add_argument("--posts-per-subreddit", type=int, default=200, help="generate：每个社区的帖子池大小")
+    parser.add_argument("--comment-posts", type=int, default=30, help="record：每个列表录制评论树的帖子数")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.command == "generate":
+        fixture = generate_fixture(seed=args.seed, posts_per_subreddit=args.posts_per_subreddit)
+    else:
+        fixture = record_fixture(comment_posts=args.comment_posts)
+    path = save_fixture(fixture, args.out)
+    print(f"fixture已保存: {path}（{len(fixture['submissions'])} 个帖子）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+缓存模块 - 基于SQLite的Reddit数据本地缓存
+
+帖子字段按变化频率分为两组，各自有独立的TTL：
+- 稳定字段（标题、正文、作者等）：很少变化，可长期复用
+- 易变字段（分数、评论数、点赞率等）：需要较频繁地刷新
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from profiler import count
+
+logger = logging.getLogger(__name__)
+
+# 需要频繁刷新的帖子字段，其余字段视为稳定字段
+VOLATILE_FIELDS = (
+    'score', 'upvote_ratio', 'num_comments', 'stickied', 'locked', 'collected_at'
+)
+
+
+class RedditCache:
+    """Reddit数据缓存（线程安全）"""
+
+    def __init__(self, path: str, ttl: Dict[str, int]):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite数据库文件路径
+            ttl: 各类数据的有效期（秒），键为 stable / volatile / comments / listing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS posts (
+                id TEXT PRIMARY KEY,
+                stable TEXT,
+                stable_at REAL,
+                volatile TEXT,
+                volatile_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS comments (
+                post_id TEXT,
+                variant TEXT,
+                payload TEXT,
+                fetched_at REAL,
+                PRIMARY KEY (post_id, variant)
+            );
+            CREATE TABLE IF NOT EXISTS listings (
+                key TEXT PRIMARY KEY,
+                post_ids TEXT,
+                fetched_at REAL
+            );
+        """)
+        self.purge_expired()
+        logger.info(f"Reddit缓存初始化完成: {self.path}")
+
+    def get_listing(self, key: str) -> Optional[List[str]]:
+        """获取未过期的列表（帖子ID序列）"""
+        row = self._fetchone("SELECT post_ids, fetched_at FROM listings WHERE key = ?", (key,))
+        if row and self._is_fresh(row[1], 'listing'):
+            count('reddit_cache_hits')
+            return json.loads(row[0])
+        count('reddit_cache_misses')
+        return None
+
+    def put_listing(self, key: str, post_ids: List[str]) -> None:
+        """保存列表"""
+        self._execute(
+            "INSERT OR REPLACE INTO listings (key, post_ids, fetched_at) VALUES (?, ?, ?)",
+            (key, json.dumps(post_ids), time.time())
+        )
+
+    def get_post(self, post_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存的帖子
+
+        Returns:
+            稳定字段与易变字段都未过期时返回完整帖子；稳定字段未过期但易变字段
+            过期时返回带 '_volatile_stale': True 标记的帖子；否则返回None
+        """
+        row = self._fetchone(
+            "SELECT stable, stable_at, volatile, volatile_at FROM posts WHERE id = ?", (post_id,)
+        )
+        if not row or not self._is_fresh(row[1], 'stable'):
+            count('reddit_cache_misses')
+            return None
+        count('reddit_cache_hits')
+
+        post = json.loads(row[0])
+        post.update(json.loads(row[2] or '{}'))
+        if not self._is_fresh(row[3], 'volatile'):
+            post['_volatile_stale'] = True
+        return post
+
+    def put_post(self, post: Dict[str, Any]) -> None:
+        """
+        保存帖子，新字段与已缓存的字段合并
+
+        稳定字段与易变字段分别合并：详情中的完整正文补充到稳定字段，只带部分易变字段的
+        帖子（例如评论树）不会清掉已缓存的 stickied、locked 等字段。
+        """
+        now = time.time()
+        stable = {k: v for k, v in post.items() if k not in VOLATILE_FIELDS and k != 'comments'}
+        volatile = {k: v for k, v in post.items() if k in VOLATILE_FIELDS}
+
+        with self._lock:
+            row = self._conn.execute("SELECT stable, volatile FROM posts WHERE id = ?", (post['id'],)).fetchone()
+            if row:
+                stable = {**json.loads(row[0]), **stable}
+                volatile = {**json.loads(row[1] or '{}'), **volatile}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posts (id, stable, stable_at, volatile, volatile_at) VALUES (?, ?, ?, ?, ?)",
+                (post['id'], json.dumps(stable, ensure_ascii=False), now,
+                 json.dumps(volatile, ensure_ascii=False), now)
+            )
+            self._conn.commit()
+
+    def update_volatile(self, post_id: str, volatile: Dict[str, Any]) -> None:
+        """只刷新帖子的易变字段"""
+        self._execute(
+            "UPDATE posts SET volatile = ?, volatile_at = ? WHERE id = ?",
+            (json.dumps(volatile, ensure_ascii=False), time.time(), post_id)
+        )
+
+    def get_comments(self, post_id: str, variant: str) -> Optional[Any]:
+        """获取未过期的评论数据"""
+        row = self._fetchone(
+            "SELECT payload, fetched_at FROM comments WHERE post_id = ? AND variant = ?",
+            (post_id, variant)
+        )
+        if row and self._is_fresh(row[1], 'comments'):
+            count('reddit_cache_hits')
+            return json.loads(row[0])
+        count('reddit_cache_misses')
+        return None
+
+    def put_comments(self, post_id: str, variant: str, payload: Any) -> None:
+        """保存评论数据"""
+        self._execute(
+            "INSERT OR REPLACE INTO comments (post_id, variant, payload, fetched_at) VALUES (?, ?, ?, ?)",
+            (post_id, variant, json.dumps(payload, ensure_ascii=False), time.time())
+        )
+
+    def purge_expired(self) -> None:
+        """清理所有已过期的数据"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM posts WHERE stable_at < ?", (now - self.ttl['stable'],))
+            self._conn.execute("DELETE FROM comments WHERE fetched_at < ?", (now - self.ttl['comments'],))
+            self._conn.execute("DELETE FROM listings WHERE fetched_at < ?", (now - self.ttl['listing'],))
+            self._conn.commit()
+
+    def _is_fresh(self, fetched_at: Optional[float], kind: str) -> bool:
+        return fetched_at is not None and time.time() - fetched_at < self.ttl[kind]
+
+    def _fetchone(self, sql: str, params: tuple):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+
+class SummaryCache:
+    """
+    LLM摘要缓存（线程安全）
+
+    键为 (模型, 提示词模板, 帖子内容) 的SHA-256，内容或提示词任一变化都会生成新键。
+    条目超过TTL后失效；条目数超过上限时按最近使用时间（LRU）淘汰。
+    """
+
+    def __init__(self, path: str, ttl: int, max_entries: int = 5000):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite数据库文件路径
+            ttl: 摘要有效期（秒）
+            max_entries: 最多保留的摘要条数
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT,
+                created_at REAL,
+                last_used_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries (last_used_at);
+        """)
+        self.evict()
+        logger.info(f"摘要缓存初始化完成: {self.path}")
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """由模型、提示词模板和帖子内容等字符串计算缓存键"""
+        digest = hashlib.sha256()
+        for part in parts:
+            encoded = (part or '').encode('utf-8')
+            # 写入长度前缀，避免不同切分方式拼出相同的字节串
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """获取未过期的摘要，命中时刷新最近使用时间"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                count('summary_cache_misses')
+                return None
+            self._conn.execute("UPDATE summaries SET last_used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        count('summary_cache_hits')
+        return row[0]
+
+    def put(self, key: str, summary: str) -> None:
+        """保存摘要"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                (key, summary, now, now)
+            )
+            self._conn.commit()
+
+    def evict(self) -> None:
+        """清理过期条目，并按最近使用时间淘汰超出上限的条目"""
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries WHERE created_at < ?", (time.time() - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM summaries WHERE key NOT IN "
+                "(SELECT key FROM summaries ORDER BY last_used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
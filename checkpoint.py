@@ -0,0 +1,96 @@
+"""
+检查点模块 - 持久化主流程各阶段的结果，失败后可从最后完成的阶段继续
+
+每个阶段的结果保存为一个gzip压缩的JSON文件；运行完整结束后清空检查点，
+因此 --resume 只会继续上一次未完成的运行。
+"""
+
+import gzip
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from profiler import count, profiler
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineCheckpoint:
+    """主流程检查点"""
+
+    def __init__(self, directory: str, resume: bool = False, max_age: int = 24 * 3600):
+        """
+        初始化检查点
+
+        Args:
+            directory: 检查点目录
+            resume: 是否复用已有检查点；为False时清空目录重新开始
+            max_age: 检查点的最长有效期（秒），超过后不再复用
+        """
+        self.directory = Path(directory)
+        self.resume = resume
+        self.max_age = max_age
+
+        if not resume and self.directory.exists():
+            shutil.rmtree(self.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def run(self, stage: str, func: Callable[[], Any],
+            should_save: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        执行一个阶段：有可用检查点时直接加载，否则执行并保存结果
+
+        每个阶段同时作为运行剖析（profiler）中的一个阶段记录耗时与计数。
+
+        Args:
+            stage: 阶段名
+            func: 执行该阶段的函数
+            should_save: 判断结果是否值得保存（例如失败的分析结果不保存，下次重试）
+
+        Returns:
+            阶段结果
+        """
+        with profiler.stage(stage):
+            if self.resume:
+                result = self.load(stage)
+                if result is not None:
+                    logger.info(f"从检查点恢复阶段 {stage}，跳过执行")
+                    count('checkpoint_restored')
+                    return result
+
+            result = func()
+            if should_save is None or should_save(result):
+                self.save(stage, result)
+            return result
+
+    def load(self, stage: str) -> Any:
+        """加载阶段结果，不存在或已过期时返回None"""
+        path = self._path(stage)
+        if not path.exists() or time.time() - path.stat().st_mtime > self.max_age:
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取检查点 {stage} 失败，重新执行该阶段: {e}")
+            return None
+
+    def save(self, stage: str, result: Any) -> None:
+        """保存阶段结果（先写临时文件再替换，避免中断时留下损坏的检查点）"""
+        path = self._path(stage)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=5) as f:
+            json.dump(result, f, ensure_ascii=False, separators=(',', ':'), default=str)
+        tmp_path.replace(path)
+        logger.info(f"已保存阶段 {stage} 的检查点 ({path.stat().st_size / 1024:.1f} KB)")
+
+    def clear(self) -> None:
+        """运行完整结束后清空检查点"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        logger.info("运行完成，已清空检查点")
+
+    def _path(self, stage: str) -> Path:
+        return self.directory / f"{stage}.json.gz"
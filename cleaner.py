@@ -4,7 +4,7 @@
 
 import logging
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -38,46 +38,64 @@ class DataCleaner:
         cleaned_dict = {}
         
         for key, posts in posts_dict.items():
-            cleaned_posts = []
-            
-            for post in posts:
-                # 首先检查post是否为None
-                if post is None:
-                    logger.error(f"⚠️ 在 {key} 中发现None帖子，已跳过")
-                    self.stats['invalid'] += 1
-                    continue
-                
-                # 验证数据完整性
-                if not self._validate_post(post):
-                    self.stats['invalid'] += 1
-                    logger.debug(f"帖子验证失败: {post.get('id', 'unknown')}")
-                    continue
-                
-                # 质量过滤
-                if not self._quality_filter(post):
-                    self.stats['filtered'] += 1
-                    logger.debug(f"帖子质量过滤: {post.get('id', 'unknown')} - {post.get('title', '')[:30]}")
-                    continue
-                
-                # 数据清洗
-                cleaned_post = self._clean_post_data(post)
-                
-                # 二次验证清洗后的数据不是None
-                if cleaned_post is None:
-                    logger.error(f"⚠️ 清洗后帖子变成None: {post.get('id', 'unknown')}")
-                    self.stats['invalid'] += 1
-                    continue
-                
-                cleaned_posts.append(cleaned_post)
-                self.stats['valid'] += 1
-            
-            cleaned_dict[key] = cleaned_posts
+            cleaned_dict[key] = self._clean_post_list(key, posts)
         
         logger.info(f"清洗完成: {self.stats['valid']}/{self.stats['total']} 有效, "
                    f"{self.stats['invalid']} 无效, {self.stats['filtered']} 过滤")
         
         return cleaned_dict
     
+    def iter_clean_posts(self, posts_stream: Iterable[Tuple[str, List[Dict]]]) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        流式清洗：逐个清洗到达的帖子列表
+        
+        Args:
+            posts_stream: 产出 (timeframe_sub, [posts]) 的可迭代对象
+        
+        Yields:
+            (timeframe_sub, 清洗后的帖子列表)
+        """
+        for key, posts in posts_stream:
+            self.stats['total'] += len(posts)
+            yield key, self._clean_post_list(key, posts)
+    
+    def _clean_post_list(self, key: str, posts: List[Dict]) -> List[Dict]:
+        """清洗单个时间维度列表中的帖子"""
+        cleaned_posts = []
+        
+        for post in posts:
+            # 首先检查post是否为None
+            if post is None:
+                logger.error(f"⚠️ 在 {key} 中发现None帖子，已跳过")
+                self.stats['invalid'] += 1
+                continue
+            
+            # 验证数据完整性
+            if not self._validate_post(post):
+                self.stats['invalid'] += 1
+                logger.debug(f"帖子验证失败: {post.get('id', 'unknown')}")
+                continue
+            
+            # 质量过滤
+            if not self._quality_filter(post):
+                self.stats['filtered'] += 1
+                logger.debug(f"帖子质量过滤: {post.get('id', 'unknown')} - {post.get('title', '')[:30]}")
+                continue
+            
+            # 数据清洗
+            cleaned_post = self._clean_post_data(post)
+            
+            # 二次验证清洗后的数据不是None
+            if cleaned_post is None:
+                logger.error(f"⚠️ 清洗后帖子变成None: {post.get('id', 'unknown')}")
+                self.stats['invalid'] += 1
+                continue
+            
+            cleaned_posts.append(cleaned_post)
+            self.stats['valid'] += 1
+        
+        return cleaned_posts
+    
     def deduplicate_posts(self, posts_dict: Dict[str, List[Dict]], 
                          keep: str = 'highest_hot') -> List[Dict]:
         """
@@ -0,0 +1,191 @@
+"""
+并发控制模块 - 自适应并发上限（AIMD）与带抖动的指数退避重试
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, Tuple, Type
+
+from profiler import count
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD自适应并发上限（线程安全）
+
+    - 加性增：请求成功且延迟未明显高于基线时，每完成约 limit 个请求上限加1
+    - 乘性减：遇到过载信号（429、超时）时上限乘以 decrease_factor，
+      冷却期内的多次过载只计一次，避免同一波失败把上限压到最低
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 16,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 2.0,
+                 overload_errors: Tuple[Type[BaseException], ...] = ()):
+        """
+        初始化并发控制器
+
+        Args:
+            initial: 初始并发上限
+            min_limit: 并发上限的下限
+            max_limit: 并发上限的上限
+            decrease_factor: 过载时上限的缩减比例
+            latency_tolerance: 延迟超过基线的多少倍时停止增长
+            overload_errors: 视为过载信号的异常类型
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.overload_errors = overload_errors
+
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._baseline_latency = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self):
+        """占用一个并发名额执行请求，退出时根据结果调整上限"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as exc:
+            self._release(overloaded=isinstance(exc, self.overload_errors), latency=None)
+            raise
+        else:
+            self._release(overloaded=False, latency=time.monotonic() - start)
+
+    @asynccontextmanager
+    async def async_slot(self, poll_interval: float = 0.01):
+        """协程版 slot：名额不足时让出事件循环轮询等待，不阻塞线程"""
+        while not self._try_acquire():
+            await asyncio.sleep(poll_interval)
+
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as exc:
+            self._release(overloaded=isinstance(exc, self.overload_errors), latency=None)
+            raise
+        else:
+            self._release(overloaded=False, latency=time.monotonic() - start)
+
+    def _try_acquire(self) -> bool:
+        with self._condition:
+            if self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self, overloaded: bool, latency: float = None) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+
+            if overloaded:
+                # 冷却期取一个基线延迟（约一轮请求），同一批在途请求的失败只触发一次缩减
+                cooldown = self._baseline_latency or 1.0
+                if now - self._last_decrease >= cooldown:
+                    old = self.limit
+                    self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+                    logger.warning(f"LLM接口过载，并发上限 {old} -> {self.limit}")
+            elif latency is not None:
+                if self._baseline_latency is None or latency < self._baseline_latency:
+                    self._baseline_latency = latency
+                else:
+                    # 基线缓慢上移，适应接口整体变慢的情况
+                    self._baseline_latency += (latency - self._baseline_latency) * 0.05
+
+                if latency <= self._baseline_latency * self.latency_tolerance:
+                    old = self.limit
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+                    if self.limit > old:
+                        logger.debug(f"LLM并发上限 {old} -> {self.limit}")
+
+            self._condition.notify_all()
+
+
+def call_with_retry(func: Callable[..., Any], *args,
+                    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                    max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                    **kwargs) -> Any:
+    """
+    调用函数，遇到可重试的异常时按带抖动的指数退避重试
+
+    等待时间取 [0, min(max_delay, base_delay * 2^n)] 内的随机值（full jitter），
+    避免并发请求在同一时刻集中重试；异常带有 Retry-After 响应头时以其为下限（不超过 max_delay）。
+
+    Args:
+        func: 要调用的函数
+        *args: 位置参数
+        retry_on: 需要重试的异常类型
+        max_retries: 最大重试次数
+        base_delay: 退避基准时间（秒）
+        max_delay: 单次等待的上限（秒）
+        **kwargs: 关键字参数
+
+    Returns:
+        函数返回值
+
+    Raises:
+        最后一次调用的异常
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except retry_on as exc:
+            if attempt >= max_retries:
+                raise
+            time.sleep(_backoff_delay(exc, attempt, base_delay, max_delay))
+
+
+async def async_call_with_retry(func: Callable[..., Awaitable[Any]], *args,
+                                retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                                max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                                **kwargs) -> Any:
+    """call_with_retry 的协程版本，退避期间让出事件循环"""
+    for attempt in range(max_retries + 1):
+        try:
+            return await func(*args, **kwargs)
+        except retry_on as exc:
+            if attempt >= max_retries:
+                raise
+            await asyncio.sleep(_backoff_delay(exc, attempt, base_delay, max_delay))
+
+
+def _backoff_delay(exc: BaseException, attempt: int, base_delay: float, max_delay: float) -> float:
+    delay = max(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)),
+                min(_retry_after(exc), max_delay))
+    logger.warning(f"请求失败（{type(exc).__name__}），{delay:.1f} 秒后第 {attempt + 1} 次重试")
+    count('retries')
+    return delay
+
+
+def _retry_after(exc: BaseException) -> float:
+    """读取异常响应中的 Retry-After 头（秒），没有时返回0"""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return 0.0
+    try:
+        return float(headers.get('retry-after', 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
@@ -27,6 +27,13 @@ def _get_env_int(key: str, default: int) -> int:
         return default
 
 
+def _get_env_bool(key: str, default: bool) -> bool:
+    value = os.getenv(key)
+    if not value or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 LLM_CONFIG = {
     "model": _get_env_str("LLM_MODEL", "qwen-max"),
     "base_url": _get_env_str("LLM_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1"),
@@ -42,6 +49,16 @@ LLM_ANALYSIS_CONFIG = {
     "api_key": _get_env_str("LLM_ANALYSIS_API_KEY", ""),  # 如果为空则使用LLM_CONFIG的api_key
     "temperature": _get_env_float("LLM_ANALYSIS_TEMPERATURE", 0.3),
     "max_tokens": _get_env_int("LLM_ANALYSIS_MAX_TOKENS", 10000),  # qwen3-max用于深度分析
+    "prompt_token_budget": _get_env_int("LLM_ANALYSIS_PROMPT_BUDGET", 12000),  # 输入提示词的token预算（估算值）
+    "stream_usage": _get_env_bool("LLM_ANALYSIS_STREAM_USAGE", True),  # 流式响应附带token用量（stream_options），端点不支持时关闭
+}
+
+# LLM HTTP连接池配置（摘要生成与综合分析共享，见 llm_client.py）
+LLM_HTTP_CONFIG = {
+    "max_connections": _get_env_int("LLM_MAX_CONNECTIONS", 20),
+    "max_keepalive_connections": _get_env_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 10),
+    "keepalive_expiry": _get_env_float("LLM_KEEPALIVE_EXPIRY", 30.0),  # 空闲连接保留时间（秒）
+    "timeout": _get_env_float("LLM_TIMEOUT", 120.0),
 }
 
 # LLM模型配置说明:
@@ -54,9 +71,98 @@ LLM_ANALYSIS_CONFIG = {
 # 1. 修改上面的 LLM_CONFIG 字典中的 "model", "base_url", "api_key"
 # 2. 或者设置环境变量 LLM_MODEL, LLM_BASE_URL, LLM_API_KEY
 
+# Reddit抓取配置
+# Reddit OAuth 客户端配额为每分钟100次请求（按10分钟窗口统计，窗口内共1000次），
+# 限流器根据响应头中的剩余额度决定是否等待；在拿到第一个响应头之前，
+# 使用令牌桶（requests_per_minute / burst）兜底
+FETCH_CONFIG = {
+    "backend": _get_env_str("REDDIT_FETCH_BACKEND", "sync"),  # sync: PRAW + 线程池; async: asyncpraw 协程
+    "async_concurrency": _get_env_int("REDDIT_ASYNC_CONCURRENCY", 16),  # async 后端同时进行的请求数上限
+    "max_workers": _get_env_int("REDDIT_FETCH_WORKERS", 4),  # 并发抓取的社区数，1 表示串行
+    "requests_per_minute": _get_env_int("REDDIT_REQUESTS_PER_MINUTE", 100),
+    "burst": _get_env_int("REDDIT_RATE_BURST", 30),
+    "rate_limit_window": _get_env_int("REDDIT_RATE_LIMIT_WINDOW", 600),  # 配额窗口（秒）
+    "rate_limit_reserve": _get_env_int("REDDIT_RATE_LIMIT_RESERVE", 10),  # 剩余额度低于此值时等待窗口重置
+    "rate_limit_pacing": _get_env_int("REDDIT_RATE_LIMIT_PACING", 100),  # 剩余额度低于此值时开始均匀放缓
+    "planner_overfetch": _get_env_int("REDDIT_PLANNER_OVERFETCH", 2),  # month宽列表相对limit的放大倍数（上限100，即一页）
+}
+
+# 本地缓存配置（SQLite）
+# 稳定字段（标题、正文、作者）长期复用，易变字段（分数、评论数）按较短TTL刷新
+CACHE_CONFIG = {
+    "enabled": _get_env_bool("REDDIT_CACHE_ENABLED", True),
+    "path": _get_env_str("REDDIT_CACHE_PATH", ".cache/reddit_cache.sqlite3"),
+    "ttl": {
+        "stable": _get_env_int("REDDIT_CACHE_STABLE_TTL", 7 * 24 * 3600),
+        "volatile": _get_env_int("REDDIT_CACHE_VOLATILE_TTL", 3600),
+        "comments": _get_env_int("REDDIT_CACHE_COMMENTS_TTL", 6 * 3600),
+        "listing": _get_env_int("REDDIT_CACHE_LISTING_TTL", 30 * 60),
+    },
+}
+
+# 帖子摘要配置
+SUMMARY_CONFIG = {
+    # 每次LLM请求打包的帖子数，1 表示逐个请求；解析失败的帖子自动退回单帖请求
+    "batch_size": _get_env_int("SUMMARY_BATCH_SIZE", 5),
+    # 自适应并发（AIMD）：接口健康时逐步提高并发，遇到429/超时减半
+    "concurrency_initial": _get_env_int("SUMMARY_CONCURRENCY_INITIAL", 4),
+    "concurrency_min": _get_env_int("SUMMARY_CONCURRENCY_MIN", 1),
+    "concurrency_max": _get_env_int("SUMMARY_CONCURRENCY_MAX", 12),
+    # 429/超时/连接错误的重试（带抖动的指数退避）
+    "max_retries": _get_env_int("SUMMARY_MAX_RETRIES", 4),
+    "retry_base_delay": _get_env_float("SUMMARY_RETRY_BASE_DELAY", 1.0),
+    "retry_max_delay": _get_env_float("SUMMARY_RETRY_MAX_DELAY", 30.0),
+    # 以协程并发发送摘要请求（AsyncOpenAI），替代每个请求占用一个线程
+    "async_fanout": _get_env_bool("SUMMARY_ASYNC", False),
+}
+
+# LLM摘要缓存配置（SQLite）
+# 以 (模型, 提示词模板, 帖子内容) 的哈希为键，内容不变的帖子直接复用昨天的摘要
+SUMMARY_CACHE_CONFIG = {
+    "enabled": _get_env_bool("SUMMARY_CACHE_ENABLED", True),
+    "path": _get_env_str("SUMMARY_CACHE_PATH", ".cache/summary_cache.sqlite3"),
+    "ttl": _get_env_int("SUMMARY_CACHE_TTL", 30 * 24 * 3600),
+    "max_entries": _get_env_int("SUMMARY_CACHE_MAX_ENTRIES", 5000),  # 超出后按最近使用时间淘汰
+}
+
+# 流水线配置
+PIPELINE_CONFIG = {
+    # 流式模式：抓取、清洗与摘要生成重叠执行（也可用命令行参数 --stream 开启）
+    "stream": _get_env_bool("PIPELINE_STREAM", False),
+    # 增量模式：复用上次运行中未变化帖子的清洗结果与摘要（也可用 --incremental 开启）
+    "incremental": _get_env_bool("PIPELINE_INCREMENTAL", False),
+    "state_path": _get_env_str("PIPELINE_STATE_PATH", ".cache/run_state.json.gz"),
+    "fingerprint_buckets": _get_env_int("PIPELINE_FINGERPRINT_BUCKETS", 2),  # 分数/评论数每翻一倍划分的档位数
+    # 各阶段检查点（--resume 时从上一次未完成运行的检查点继续）
+    "checkpoint_dir": _get_env_str("PIPELINE_CHECKPOINT_DIR", ".cache/checkpoints"),
+    "checkpoint_max_age": _get_env_int("PIPELINE_CHECKPOINT_MAX_AGE", 24 * 3600),
+}
+
+# 跨日趋势历史（关键词/社区/作者计数的滚动窗口，计算增速与异常）
+TREND_HISTORY_CONFIG = {
+    "enabled": _get_env_bool("TREND_HISTORY_ENABLED", True),
+    "path": _get_env_str("TREND_HISTORY_PATH", ".cache/trend_history.npz"),
+    "window": _get_env_int("TREND_HISTORY_WINDOW", 30),  # 每个序列保留的运行次数（每天一次）
+    "min_history": _get_env_int("TREND_HISTORY_MIN_HISTORY", 3),  # 计算z-score至少需要的历史运行次数
+    "z_threshold": _get_env_float("TREND_HISTORY_Z_THRESHOLD", 2.0),  # 视为新兴话题的z-score阈值
+}
+
+# 帖子快照配置（分数/评论轨迹，用于质量评分的动量维度）
+SNAPSHOT_CONFIG = {
+    "enabled": _get_env_bool("SNAPSHOT_ENABLED", True),
+    "path": _get_env_str("SNAPSHOT_PATH", ".cache/post_snapshots.npz"),
+    "max_age_days": _get_env_int("SNAPSHOT_MAX_AGE_DAYS", 30),  # 快照保留天数
+    "min_interval": _get_env_int("SNAPSHOT_MIN_INTERVAL", 3600),  # 同一帖子相邻快照的最小间隔（秒）
+}
+
 # 报告配置
 REPORT_CONFIG = {
     "output_dir": "reports",
     "include_tables": True,
     "include_analysis": True,
+    # Markdown之外额外输出的数据文件：json（report_data）、parquet（帖子表，需要安装pyarrow）
+    "data_formats": _get_env_str("REPORT_DATA_FORMATS", "json,parquet"),
+    # 历史报告索引（SQLite + FTS5），每次生成报告后增量更新
+    "index_enabled": _get_env_bool("REPORT_INDEX_ENABLED", True),
+    "index_path": _get_env_str("REPORT_INDEX_PATH", ".cache/report_index.sqlite3"),
 }
\ No newline at end of file
@@ -5,73 +5,324 @@
 import os
 import praw
 import logging
+import queue
+import threading
 import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from async_fetcher import create_async_backend
+from cache import RedditCache
+from config import CACHE_CONFIG, FETCH_CONFIG
+from profiler import count, timed
+from rate_limiter import create_reddit_rate_limiter
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# top(time_filter) 对应的时间窗口长度（秒）
+TIMEFRAME_SECONDS = {
+    'day': 24 * 3600,
+    'week': 7 * 24 * 3600,
+}
+
+# 评论树抓取深度（顶层评论 + 一层回复），覆盖所有调用方的需求
+COMMENT_TREE_DEPTH = 2
+
+# 列表帖子与详情帖子包含的字段（从缓存恢复时按此投影）
+BASIC_POST_FIELDS = (
+    'id', 'title', 'author', 'subreddit', 'score', 'upvote_ratio', 'num_comments',
+    'created_utc', 'url', 'is_self', 'selftext_preview', 'flair', 'permalink',
+    'stickied', 'locked'
+)
+DETAIL_POST_FIELDS = (
+    'id', 'title', 'author', 'subreddit', 'content', 'url', 'permalink', 'score',
+    'upvote_ratio', 'num_comments', 'created_utc', 'flair', 'is_self', 'collected_at'
+)
+
 class RedditDataFetcher:
     """Reddit数据获取器"""
     
     def __init__(self):
         """初始化Reddit客户端"""
+        user_agent = os.getenv("REDDIT_USER_AGENT", "python:reddit-analyzer:1.0")
         self.reddit = praw.Reddit(
             client_id=os.getenv("REDDIT_CLIENT_ID"),
             client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-            user_agent=os.getenv("REDDIT_USER_AGENT", "python:reddit-analyzer:1.0")
+            user_agent=user_agent
         )
         
+        # 可选的asyncpraw后端（FETCH_CONFIG["backend"] == "async"），未启用时为None
+        self.async_backend = create_async_backend(FETCH_CONFIG, user_agent)
+        
+        # 所有抓取线程（以及摘要生成器）共享的限流器
+        self.rate_limiter = create_reddit_rate_limiter(self.reddit, FETCH_CONFIG)
+        
+        # 本次运行内的帖子评论树存储，摘要生成与深度信息获取共用
+        self._comment_trees: Dict[str, Dict[str, Any]] = {}
+        self._tree_locks: Dict[str, threading.Lock] = {}
+        self._tree_lock = threading.Lock()
+        
+        # 本地缓存：连续运行或手动重跑时尽量不访问Reddit
+        self.cache = None
+        if CACHE_CONFIG.get("enabled"):
+            self.cache = RedditCache(CACHE_CONFIG["path"], CACHE_CONFIG["ttl"])
+        
         try:
             self.reddit.user.me()
             logger.info("Reddit API连接成功（已认证）")
         except:
             logger.info("Reddit API连接成功（只读模式）")
     
-    def fetch_posts_from_subreddits(self, subreddit_config: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    def fetch_posts_from_subreddits(self, subreddit_config: Dict[str, List[Dict]],
+                                    max_workers: int = None) -> Dict[str, List[Dict]]:
         """
-        从多个subreddit获取帖子
+        从多个subreddit获取帖子（不同社区并发抓取，共享同一个限流器）
         
         Args:
             subreddit_config: {"priority": [{"name": "xxx", "limit": 50}]}
+            max_workers: 并发抓取的社区数，默认从FETCH_CONFIG读取，1表示串行
         
         Returns:
-            {"timeframe_subreddit": [post1, post2, ...]}
+            {"timeframe_subreddit": [post1, post2, ...]}，键顺序与配置顺序一致
         """
+        subreddit_results = dict(self.iter_posts_from_subreddits(subreddit_config, max_workers))
+        
+        # 按配置顺序组装结果，保证hot排行等依赖顺序的逻辑结果稳定
         all_posts = {}
+        for sub_info in self.flatten_subreddit_config(subreddit_config):
+            all_posts.update(subreddit_results.get(sub_info['name'], {}))
+        
+        return all_posts
+    
+    def iter_posts_from_subreddits(self, subreddit_config: Dict[str, List[Dict]],
+                                   max_workers: int = None) -> Iterator[Tuple[str, Dict[str, List[Dict]]]]:
+        """
+        按完成顺序逐个产出各subreddit的帖子，供流式处理使用
+        
+        Args:
+            subreddit_config: {"priority": [{"name": "xxx", "limit": 50}]}
+            max_workers: 并发抓取的社区数（同步后端），默认从FETCH_CONFIG读取
+        
+        Yields:
+            (社区名, {"timeframe_subreddit": [posts]})，获取失败的社区会被跳过
+        """
+        max_workers = max_workers or FETCH_CONFIG.get("max_workers", 4)
         
         for priority, subreddits in subreddit_config.items():
-            logger.info(f"正在获取 {priority} 优先级社区...")
+            logger.info(f"正在获取 {priority} 优先级社区: {[s['name'] for s in subreddits]}")
+        sub_infos = self.flatten_subreddit_config(subreddit_config)
+        
+        if self.async_backend:
+            yield from self._iter_async_listings(sub_infos)
+            return
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            future_to_name = {
+                executor.submit(self._fetch_subreddit_listings, sub_info['name'], sub_info['limit']): sub_info['name']
+                for sub_info in sub_infos
+            }
             
-            for sub_info in subreddits:
-                name = sub_info['name']
-                limit = sub_info['limit']
-                
+            for future in as_completed(future_to_name):
+                name = future_to_name[future]
                 try:
-                    subreddit = self.reddit.subreddit(name)
-                    
-                    # 获取多个时间维度的帖子
-                    for timeframe, method in [
-                        ('hot', lambda: subreddit.hot(limit=limit)),
-                        ('day', lambda: subreddit.top(time_filter='day', limit=max(10, limit//2))),
-                        ('week', lambda: subreddit.top(time_filter='week', limit=max(15, limit//2))),
-                        ('month', lambda: subreddit.top(time_filter='month', limit=limit))
-                    ]:
-                        key = f"{timeframe}_{name}"
-                        posts = list(method())
-                        all_posts[key] = [self._extract_basic_post(post) for post in posts]
-                        logger.info(f"  r/{name} [{timeframe}]: {len(all_posts[key])} 个帖子")
-                        time.sleep(0.5)  # API限流
-                
+                    listings = future.result()
                 except Exception as e:
                     logger.error(f"获取 r/{name} 失败: {e}")
                     continue
+                yield name, listings
+    
+    def _iter_async_listings(self, sub_infos: List[Dict]) -> Iterator[Tuple[str, Dict[str, List[Dict]]]]:
+        """在后台线程运行异步抓取，每个社区完成后立即产出"""
+        results = queue.Queue()
         
-        return all_posts
+        def run():
+            try:
+                self.async_backend.fetch_listings(
+                    self, sub_infos, on_result=lambda name, listings: results.put((name, listings))
+                )
+            except Exception as e:
+                logger.error(f"异步抓取失败: {e}")
+            finally:
+                results.put(None)
+        
+        threading.Thread(target=run, daemon=True).start()
+        
+        while True:
+            item = results.get()
+            if item is None:
+                return
+            yield item
+    
+    @staticmethod
+    def flatten_subreddit_config(subreddit_config: Dict[str, List[Dict]]) -> List[Dict]:
+        """把按优先级分组的社区配置展开为有序列表"""
+        return [sub_info for subreddits in subreddit_config.values() for sub_info in subreddits]
+    
+    @timed("fetcher.fetch_subreddit_listings")
+    def _fetch_subreddit_listings(self, name: str, limit: int) -> Dict[str, List[Dict]]:
+        """
+        获取单个subreddit多个时间维度的帖子
+        
+        top(day)、top(week) 基本是 top(month) 的子集：先请求一次更宽的month列表，再按
+        created_utc 在本地切出day和week；宽列表不够深、无法覆盖所需数量时才单独请求。
+        
+        某个请求失败时保留此前已获取的时间维度（不写入缓存），全部失败时抛出异常。
+        """
+        cached = self._load_cached_listings(name, limit)
+        if cached is not None:
+            for key, posts in cached.items():
+                logger.info(f"  r/{name} [{key.split('_')[0]}]: {len(posts)} 个帖子（缓存）")
+            return cached
+        
+        subreddit = self.reddit.subreddit(name)
+        day_limit, week_limit, wide_limit = self._listing_limits(limit)
+        fetched = {}
+        
+        try:
+            # hot按实时热度排序，无法由top列表推导
+            self.rate_limiter.acquire(self._listing_cost(limit))
+            fetched['hot'] = list(subreddit.hot(limit=limit))
+            
+            # 宽窗口请求：在不增加分页的前提下多取一些，提高day/week的覆盖率
+            self.rate_limiter.acquire(self._listing_cost(wide_limit))
+            fetched['month'] = list(subreddit.top(time_filter='month', limit=wide_limit))
+            
+            for timeframe, needed in (('day', day_limit), ('week', week_limit)):
+                posts = self._derive_timeframe(fetched['month'], timeframe, needed, wide_limit)
+                if posts is None:
+                    # 宽列表覆盖不足，单独请求
+                    self.rate_limiter.acquire(self._listing_cost(needed))
+                    posts = list(subreddit.top(time_filter=timeframe, limit=needed))
+                fetched[timeframe] = posts
+        except Exception as e:
+            if not fetched:
+                raise
+            logger.error(f"获取 r/{name} 部分失败，保留已获取的 {list(fetched)} 列表: {e}")
+        
+        return self._build_listings(name, limit, fetched)
+    
+    @staticmethod
+    def _listing_limits(limit: int) -> Tuple[int, int, int]:
+        """计算 (day数量, week数量, month宽列表请求数量)"""
+        day_limit = max(10, limit//2)
+        week_limit = max(15, limit//2)
+        overfetch = FETCH_CONFIG.get("planner_overfetch", 2)
+        wide_limit = max(limit, week_limit, min(100, limit * overfetch))
+        return day_limit, week_limit, wide_limit
+    
+    @staticmethod
+    def _derive_timeframe(month_wide: List, timeframe: str, needed: int, wide_limit: int) -> Optional[List]:
+        """
+        从按分数排序的month宽列表中切出day或week的帖子
+        
+        宽列表中落在窗口内的帖子恰好是该窗口top列表的前缀；数量不足且宽列表
+        未取尽时无法保证完整，返回None表示需要单独请求。推导成功与回退的次数
+        记入运行剖析（reddit_<timeframe>_derived / reddit_<timeframe>_fallback）。
+        """
+        cutoff = time.time() - TIMEFRAME_SECONDS[timeframe]
+        posts = [post for post in month_wide if post.created_utc >= cutoff][:needed]
+        
+        if len(posts) >= needed or len(month_wide) < wide_limit:
+            count(f'reddit_{timeframe}_derived')
+            return posts
+        count(f'reddit_{timeframe}_fallback')
+        return None
+    
+    def _build_listings(self, name: str, limit: int, fetched: Dict[str, List]) -> Dict[str, List[Dict]]:
+        """
+        提取帖子信息、按固定顺序组装各时间维度列表，四个维度齐全时写入缓存
+        
+        Args:
+            name: 社区名
+            limit: 配置的帖子数量
+            fetched: {时间维度: 原始Submission列表}，month为宽列表
+        """
+        listings = {}
+        for timeframe in ('hot', 'day', 'week', 'month'):
+            if timeframe not in fetched:
+                continue
+            posts = fetched[timeframe][:limit] if timeframe == 'month' else fetched[timeframe]
+            key = f"{timeframe}_{name}"
+            listings[key] = [self._extract_basic_post(post) for post in posts]
+            logger.info(f"  r/{name} [{timeframe}]: {len(listings[key])} 个帖子")
+        
+        if self.cache and len(listings) == 4:
+            for key, posts in listings.items():
+                for post in posts:
+                    self.cache.put_post(post)
+                self.cache.put_listing(f"{key}:{limit}", [post['id'] for post in posts])
+        
+        return listings
+    
+    def _load_cached_listings(self, name: str, limit: int) -> Dict[str, List[Dict]]:
+        """从缓存恢复单个subreddit的全部列表，任一列表或帖子缺失时返回None"""
+        if not self.cache:
+            return None
+        
+        listings = {}
+        for timeframe in ('hot', 'day', 'week', 'month'):
+            key = f"{timeframe}_{name}"
+            post_ids = self.cache.get_listing(f"{key}:{limit}")
+            if post_ids is None:
+                return None
+            
+            posts = []
+            for post_id in post_ids:
+                post = self.cache.get_post(post_id)
+                if post is None or 'selftext_preview' not in post:
+                    return None
+                posts.append(post)
+            listings[key] = posts
+        
+        all_posts = [post for posts in listings.values() for post in posts]
+        self._refresh_volatile_fields(all_posts)
+        
+        return {
+            key: [{field: post.get(field) for field in BASIC_POST_FIELDS} for post in posts]
+            for key, posts in listings.items()
+        }
     
+    @timed("fetcher.refresh_volatile_fields")
+    def _refresh_volatile_fields(self, posts: List[Dict]) -> None:
+        """
+        刷新缓存帖子中已过期的易变字段（分数、评论数等）
+        
+        使用 /api/info 批量接口，每次请求最多刷新100个帖子。
+        """
+        stale_posts = {}
+        for post in posts:
+            if post.pop('_volatile_stale', False):
+                stale_posts.setdefault(post['id'], []).append(post)
+        
+        if not stale_posts:
+            return
+        
+        logger.info(f"刷新 {len(stale_posts)} 个缓存帖子的易变字段...")
+        post_ids = list(stale_posts)
+        for i in range(0, len(post_ids), 100):
+            chunk = post_ids[i:i + 100]
+            self.rate_limiter.acquire()
+            for submission in self.reddit.info(fullnames=[f"t3_{post_id}" for post_id in chunk]):
+                volatile = {
+                    'score': submission.score,
+                    'upvote_ratio': submission.upvote_ratio,
+                    'num_comments': submission.num_comments,
+                    'stickied': submission.stickied,
+                    'locked': submission.locked,
+                    'collected_at': datetime.now().isoformat()
+                }
+                self.cache.update_volatile(submission.id, volatile)
+                for post in stale_posts.get(submission.id, []):
+                    post.update(volatile)
+    
+    @staticmethod
+    def _listing_cost(limit: int) -> int:
+        """列表请求消耗的API次数（PRAW每页最多100条）"""
+        return max(1, -(-limit // 100))
+    
+    @timed("fetcher.fetch_detailed_posts")
     def fetch_detailed_posts(self, post_ids: List[str], 
                            comment_depth: int = 2,
                            max_workers: int = 3) -> List[Dict[str, Any]]:
@@ -92,6 +343,9 @@ class RedditDataFetcher:
         detailed_posts = []
         failed_posts = []  # 记录失败的帖子
         
+        # 摘要阶段已经获取过的帖子直接复用，其余的先尝试从本地缓存批量恢复
+        self.prefetch_submission_trees(post_ids)
+        
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_id = {
                 executor.submit(self._fetch_single_detail, post_id, comment_depth): post_id
@@ -113,8 +367,6 @@ class RedditDataFetcher:
                     logger.error(f"❌ 获取帖子 {post_id} 详情失败 - https://reddit.com/comments/{post_id}")
                     logger.error(f"   错误类型: {type(e).__name__}")
                     logger.error(f"   错误信息: {str(e)}")
-                
-                time.sleep(0.2)  # 限流
         
         # 汇总报告
         logger.info(f"\n{'='*60}")
@@ -127,32 +379,159 @@ class RedditDataFetcher:
         
         return detailed_posts
     
+    def get_submission_tree(self, post_id: str) -> Dict[str, Any]:
+        """
+        获取帖子详情及评论树（本次运行内每个帖子只请求一次）
+        
+        评论树按所有调用方中最深的需求（COMMENT_TREE_DEPTH）抓取，
+        摘要生成与深度信息获取都从同一份数据中截取所需部分。
+        
+        Args:
+            post_id: 帖子ID
+        
+        Returns:
+            帖子详情字典，'comments' 为完整评论树
+        """
+        # 同一帖子的并发请求只有一个真正访问Reddit，其余等待结果
+        with self._post_tree_lock(post_id):
+            tree = self._comment_trees.get(post_id)
+            if tree is None:
+                tree = self._load_cached_trees([post_id]).get(post_id)
+            if tree is None:
+                tree = self._fetch_submission_tree(post_id)
+                self._comment_trees[post_id] = tree
+            return tree
+    
+    def _post_tree_lock(self, post_id: str) -> threading.Lock:
+        """帖子评论树的锁：写入 _comment_trees 前必须持有"""
+        with self._tree_lock:
+            return self._tree_locks.setdefault(post_id, threading.Lock())
+    
+    def _store_trees(self, trees: Dict[str, Dict[str, Any]]) -> None:
+        """在各帖子的锁内登记评论树（已有的不覆盖）"""
+        for post_id, tree in trees.items():
+            with self._post_tree_lock(post_id):
+                self._comment_trees.setdefault(post_id, tree)
+    
+    def prefetch_submission_trees(self, post_ids: List[str]) -> None:
+        """
+        批量预取帖子评论树
+        
+        先从本地缓存恢复；启用异步后端时，其余帖子以协程并发获取。同步模式下
+        不在此处发起请求，由各调用方的线程池按需获取。
+        """
+        self._store_trees(self._load_cached_trees(post_ids))
+        
+        if not self.async_backend:
+            return
+        
+        missing = [post_id for post_id in dict.fromkeys(post_ids) if post_id not in self._comment_trees]
+        if not missing:
+            return
+        
+        logger.info(f"异步预取 {len(missing)} 个帖子的评论树...")
+        self._store_trees(self.async_backend.fetch_submission_trees(self, missing))
+    
+    def _load_cached_trees(self, post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        从本地缓存批量读取评论树（帖子与评论都命中才算命中）
+        
+        只读取不登记，由调用方在帖子的锁内写入 _comment_trees。
+        
+        Returns:
+            {post_id: 评论树}，不含本次运行中已有的帖子
+        """
+        if not self.cache:
+            return {}
+        
+        trees = []
+        for post_id in post_ids:
+            if post_id in self._comment_trees:
+                continue
+            post = self.cache.get_post(post_id)
+            comments = self.cache.get_comments(post_id, "tree")
+            if post is None or 'content' not in post or comments is None:
+                continue
+            post['comments'] = comments
+            trees.append(post)
+        
+        if not trees:
+            return {}
+        
+        self._refresh_volatile_fields(trees)
+        logger.info(f"缓存命中 {len(trees)} 个帖子的详细信息")
+        return {
+            post['id']: {
+                **{field: post.get(field) for field in DETAIL_POST_FIELDS},
+                'comments': post['comments']
+            }
+            for post in trees
+        }
+    
+    @timed("fetcher.fetch_submission_tree")
+    def _fetch_submission_tree(self, post_id: str) -> Dict[str, Any]:
+        """从Reddit获取帖子详情及完整评论树，并写入本地缓存"""
+        self.rate_limiter.acquire()
+        submission = self.reddit.submission(id=post_id)
+        comments = self._extract_comments(submission, COMMENT_TREE_DEPTH)
+        return self._build_submission_tree(submission, comments)
+    
+    def _build_submission_tree(self, submission, comments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """组装帖子详情与评论树，并写入本地缓存"""
+        tree = {
+            'id': submission.id,
+            'title': submission.title,
+            'author': str(submission.author) if submission.author else "[deleted]",
+            'subreddit': submission.subreddit.display_name,
+            'content': submission.selftext,
+            'url': submission.url,
+            'permalink': f"https://reddit.com{submission.permalink}",
+            'score': submission.score,
+            'upvote_ratio': submission.upvote_ratio,
+            'num_comments': submission.num_comments,
+            'created_utc': datetime.fromtimestamp(submission.created_utc).isoformat(),
+            'flair': submission.link_flair_text,
+            'is_self': submission.is_self,
+            'comments': comments,
+            'collected_at': datetime.now().isoformat()
+        }
+        
+        if self.cache:
+            self.cache.put_post(tree)
+            self.cache.put_comments(submission.id, "tree", comments)
+        
+        return tree
+    
     def _fetch_single_detail(self, post_id: str, comment_depth: int) -> Dict[str, Any]:
         """获取单个帖子的详细信息"""
         try:
-            submission = self.reddit.submission(id=post_id)
+            tree = self.get_submission_tree(post_id)
             
-            return {
-                'id': submission.id,
-                'title': submission.title,
-                'author': str(submission.author) if submission.author else "[deleted]",
-                'subreddit': submission.subreddit.display_name,
-                'content': submission.selftext,
-                'url': submission.url,
-                'permalink': f"https://reddit.com{submission.permalink}",
-                'score': submission.score,
-                'upvote_ratio': submission.upvote_ratio,
-                'num_comments': submission.num_comments,
-                'created_utc': datetime.fromtimestamp(submission.created_utc).isoformat(),
-                'flair': submission.link_flair_text,
-                'is_self': submission.is_self,
-                'comments': self._extract_comments(submission, comment_depth),
-                'collected_at': datetime.now().isoformat()
-            }
+            detail = dict(tree)
+            if comment_depth <= 1:
+                detail['comments'] = [
+                    {k: v for k, v in comment.items() if k != 'replies'}
+                    for comment in tree['comments']
+                ]
+            return detail
         except Exception as e:
             logger.error(f"提取帖子 {post_id} 详情失败: {e}")
             return None
     
+    def fetch_comment_snippets(self, post_id: str, max_comments: int = 5) -> List[str]:
+        """
+        获取帖子前几条顶层评论的文本片段（用于摘要生成）
+        
+        Args:
+            post_id: 帖子ID
+            max_comments: 最大评论数
+        
+        Returns:
+            评论文本列表（每条最多200字符）
+        """
+        tree = self.get_submission_tree(post_id)
+        return [comment['body'][:200] for comment in tree['comments'][:max_comments]]
+    
     def _extract_basic_post(self, post) -> Dict[str, Any]:
         """提取基础帖子信息"""
         return {
@@ -175,32 +554,52 @@ class RedditDataFetcher:
     
     def _extract_comments(self, submission, depth: int) -> List[Dict[str, Any]]:
         """提取评论"""
-        comments = []
-        
         try:
-            submission.comments.replace_more(limit=5)
+            # 只有前20条顶层评论（及其前5条回复）中存在未展开的"更多评论"时才调用
+            # replace_more，它每展开一次都是一个额外的请求
+            if self._needs_replace_more(submission.comments[:20]):
+                self.rate_limiter.acquire(5)
+                submission.comments.replace_more(limit=5)
             
-            for comment in submission.comments[:20]:
-                if hasattr(comment, 'body') and comment.body != '[deleted]':
-                    comment_data = {
-                        'id': comment.id,
-                        'author': str(comment.author) if comment.author else "[deleted]",
-                        'body': comment.body[:500],
-                        'score': comment.score,
-                        'created_utc': datetime.fromtimestamp(comment.created_utc).isoformat(),
-                        'is_submitter': comment.is_submitter
-                    }
-                    
-                    if depth > 1 and hasattr(comment, 'replies'):
-                        comment_data['replies'] = self._extract_replies(comment.replies, depth - 1)
-                    
-                    comments.append(comment_data)
+            return self._build_comment_list(submission.comments, depth)
         
         except Exception as e:
             logger.error(f"提取评论失败: {e}")
+            return []
+    
+    def _build_comment_list(self, comment_forest, depth: int = COMMENT_TREE_DEPTH) -> List[Dict[str, Any]]:
+        """把已加载的评论森林转换为评论字典列表（不发起请求）"""
+        comments = []
+        
+        for comment in comment_forest[:20]:
+            if hasattr(comment, 'body') and comment.body != '[deleted]':
+                comment_data = {
+                    'id': comment.id,
+                    'author': str(comment.author) if comment.author else "[deleted]",
+                    'body': comment.body[:500],
+                    'score': comment.score,
+                    'created_utc': datetime.fromtimestamp(comment.created_utc).isoformat(),
+                    'is_submitter': comment.is_submitter
+                }
+                
+                if depth > 1 and hasattr(comment, 'replies'):
+                    comment_data['replies'] = self._extract_replies(comment.replies, depth - 1)
+                
+                comments.append(comment_data)
         
         return comments
     
+    @staticmethod
+    def _needs_replace_more(top_level) -> bool:
+        """判断评论列表中是否有未展开的MoreComments"""
+        for comment in top_level:
+            if not hasattr(comment, 'body'):
+                return True
+            replies = getattr(comment, 'replies', None)
+            if replies is not None and any(not hasattr(reply, 'body') for reply in replies[:5]):
+                return True
+        return False
+    
     def _extract_replies(self, replies, depth: int) -> List[Dict[str, Any]]:
         """提取回复"""
         reply_list = []
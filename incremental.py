@@ -0,0 +1,182 @@
+"""
+增量运行模块 - 保存上一次运行的帖子状态，只重新处理有实质变化的帖子
+
+每个帖子的变化指纹由三部分组成：分数档位、评论数档位（均按对数分档，
+小幅波动不算变化）和标题/正文的哈希。指纹未变的帖子直接复用上次的
+清洗结果与摘要。质量评分依赖本次的趋势分析、发布时长与分数动量，每次重新计算。
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# 指纹未变时，以本次抓取的值覆盖复用记录中的易变字段
+_REFRESHED_FIELDS = ('score', 'num_comments', 'upvote_ratio', 'stickied', 'locked', 'collected_at')
+
+
+def post_fingerprint(post: Dict[str, Any], buckets_per_doubling: int = 2) -> str:
+    """
+    计算帖子的变化指纹
+
+    文本按清洗器相同的规则规范化（合并空白、截断），因此清洗前后的同一帖子指纹相同。
+
+    Args:
+        post: 帖子数据（原始或清洗后）
+        buckets_per_doubling: 数值每翻一倍划分的档位数
+
+    Returns:
+        指纹字符串
+    """
+    title = ' '.join((post.get('title') or '').split())[:300]
+    selftext = ' '.join((post.get('selftext_preview') or '').split())[:500]
+    text_hash = hashlib.sha1(f"{title}\0{selftext}".encode('utf-8')).hexdigest()[:16]
+
+    return ':'.join([
+        str(_log_bucket(post.get('score', 0), buckets_per_doubling)),
+        str(_log_bucket(post.get('num_comments', 0), buckets_per_doubling)),
+        text_hash
+    ])
+
+
+def _log_bucket(value: Any, buckets_per_doubling: int) -> int:
+    try:
+        value = max(0, int(value or 0))
+    except (TypeError, ValueError):
+        value = 0
+    return int(math.log2(value + 1) * buckets_per_doubling)
+
+
+class IncrementalState:
+    """增量运行状态（gzip压缩的JSON文件）"""
+
+    def __init__(self, path: str, buckets_per_doubling: int = 2):
+        """
+        初始化并加载上一次运行的状态
+
+        Args:
+            path: 状态文件路径
+            buckets_per_doubling: 指纹中数值每翻一倍划分的档位数
+        """
+        self.path = Path(path)
+        self.buckets_per_doubling = buckets_per_doubling
+        self.previous: Dict[str, Dict[str, Any]] = self._load()
+        self.stats = {'reused': 0, 'changed': 0, 'summaries_reused': 0}
+        logger.info(f"增量运行：上次状态包含 {len(self.previous)} 个帖子")
+
+    def fingerprint(self, post: Dict[str, Any]) -> str:
+        """计算帖子的变化指纹"""
+        return post_fingerprint(post, self.buckets_per_doubling)
+
+    def unchanged_record(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        """帖子指纹与上次一致时返回上次的记录，否则返回None"""
+        record = self.previous.get(post.get('id'))
+        if record and record.get('fingerprint') == self.fingerprint(post):
+            return record
+        return None
+
+    def clean_posts(self, cleaner, raw_posts: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        增量清洗：未变化的帖子复用上次的清洗结果（刷新易变字段），其余帖子交给清洗器
+
+        Args:
+            cleaner: DataCleaner实例
+            raw_posts: {"timeframe_sub": [posts]}
+
+        Returns:
+            与 cleaner.clean_posts 相同结构的清洗结果，帖子顺序不变
+        """
+        logger.info("开始增量数据清洗...")
+        cleaned_dict = {}
+
+        for key, posts in raw_posts.items():
+            cleaned = []
+            for post in posts:
+                record = self.unchanged_record(post) if post else None
+                if record is None:
+                    self.stats['changed'] += 1
+                    for _, cleaned_posts in cleaner.iter_clean_posts([(key, [post])]):
+                        cleaned.extend(cleaned_posts)
+                    continue
+
+                reused = dict(record['post'])
+                for field in _REFRESHED_FIELDS:
+                    if field in post:
+                        reused[field] = post[field]
+                reused['score'] = max(0, int(reused.get('score', 0)))
+                reused['num_comments'] = max(0, int(reused.get('num_comments', 0)))
+                cleaned.append(reused)
+                cleaner.stats['total'] += 1
+                cleaner.stats['valid'] += 1
+                self.stats['reused'] += 1
+            cleaned_dict[key] = cleaned
+
+        logger.info(f"增量清洗完成: 复用 {self.stats['reused']} 个帖子, 重新清洗 {self.stats['changed']} 个")
+        return cleaned_dict
+
+    def seed_summaries(self, summarizer, posts_dict: Dict[str, List[Dict]]) -> int:
+        """
+        把未变化帖子的上次摘要登记到摘要生成器，之后不再为它们调用LLM
+
+        Returns:
+            登记的摘要数
+        """
+        summaries = {}
+        for posts in posts_dict.values():
+            for post in posts:
+                record = self.unchanged_record(post)
+                if record and record.get('summary'):
+                    summaries[post['id']] = record['summary']
+
+        seeded = summarizer.seed_summaries(summaries)
+        self.stats['summaries_reused'] += seeded
+        if seeded:
+            logger.info(f"增量运行：复用 {seeded} 个帖子的摘要")
+        return seeded
+
+    def save(self, cleaned_posts: Dict[str, List[Dict]], ranked_posts: List[Dict]) -> None:
+        """
+        保存本次运行的状态
+
+        Args:
+            cleaned_posts: 清洗后的数据
+            ranked_posts: 带摘要的帖子（排行榜与高质量帖子）
+        """
+        summaries = {post['id']: post['summary'] for post in ranked_posts if post and post.get('summary')}
+
+        state = {}
+        for posts in cleaned_posts.values():
+            for post in posts:
+                post_id = post['id']
+                if post_id in state:
+                    continue
+                stored = {k: v for k, v in post.items()
+                          if k not in ('quality_score', 'summary', 'source_key', 'source_timeframe')}
+                state[post_id] = {
+                    'fingerprint': self.fingerprint(post),
+                    'post': stored,
+                    'summary': summaries.get(post_id),
+                }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+        tmp_path.replace(self.path)
+
+        logger.info(f"增量状态已保存: {len(state)} 个帖子 -> {self.path}")
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取增量状态失败，本次全量处理: {e}")
+            return {}
@@ -7,11 +7,14 @@ import os
 import json
 import praw
 import logging
-import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Union
 from collections import defaultdict
 from dotenv import load_dotenv
+from async_fetcher import create_async_backend
+from config import FETCH_CONFIG
+from rate_limiter import create_reddit_rate_limiter
+from topk import select_top_k
 
 # 加载环境变量
 load_dotenv()
@@ -28,12 +31,18 @@ class KeywordRedditCollector:
     
     def __init__(self):
         """初始化收集器"""
+        user_agent = os.getenv("REDDIT_USER_AGENT", "python:keyword-reddit-collector:1.0 (by /u/developer)")
         self.reddit = praw.Reddit(
             client_id=os.getenv("REDDIT_CLIENT_ID"),
             client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-            user_agent=os.getenv("REDDIT_USER_AGENT", "python:keyword-reddit-collector:1.0 (by /u/developer)")
+            user_agent=user_agent
         )
         
+        self.rate_limiter = create_reddit_rate_limiter(self.reddit, FETCH_CONFIG)
+        
+        # 可选的asyncpraw后端，多组关键词搜索时并发执行
+        self.async_backend = create_async_backend(FETCH_CONFIG, user_agent)
+        
         # 验证连接
         try:
             self.reddit.user.me()
@@ -66,56 +75,112 @@ class KeywordRedditCollector:
         Returns:
             搜索结果列表
         """
+        request = self._build_search_request(keywords, subreddits, sort, time_filter, limit)
+        
+        logger.info(f"开始搜索关键词: '{request['query']}', 限制: {limit}, 排序: {sort}, 时间: {time_filter}")
+        logger.info(f"搜索范围: {request['scope_info']}")
+        
+        try:
+            # 执行搜索（PRAW每页最多100条）
+            self.rate_limiter.acquire(max(1, -(-limit // 100)))
+            search_results = self.reddit.subreddit(request['subreddit']).search(
+                query=request['query'],
+                sort=sort,
+                time_filter=time_filter,
+                limit=limit
+            )
+            
+            return self._filter_search_results(search_results, min_score, min_comments)
+            
+        except Exception as e:
+            logger.error(f"搜索失败: {e}")
+            return []
+    
+    def _build_search_request(self, keywords: Union[str, List[str]],
+                              subreddits: Optional[List[str]],
+                              sort: str, time_filter: str, limit: int) -> Dict[str, Any]:
+        """构建搜索请求参数"""
         # 处理关键词
         if isinstance(keywords, list):
             query = " ".join(keywords)
         else:
             query = keywords
         
-        logger.info(f"开始搜索关键词: '{query}', 限制: {limit}, 排序: {sort}, 时间: {time_filter}")
-        
         # 确定搜索范围
         if subreddits:
             # 在指定社区中搜索
             subreddit_str = "+".join(subreddits)
-            search_subreddit = self.reddit.subreddit(subreddit_str)
             scope_info = f"社区: {subreddit_str}"
         else:
             # 全站搜索
-            search_subreddit = self.reddit.subreddit("all")
+            subreddit_str = "all"
             scope_info = "全站"
         
-        logger.info(f"搜索范围: {scope_info}")
-        
-        try:
-            # 执行搜索
-            search_results = search_subreddit.search(
-                query=query,
-                sort=sort,
-                time_filter=time_filter,
-                limit=limit
-            )
-            
-            # 提取并过滤结果
-            posts = []
-            for post in search_results:
-                post_data = self._extract_post_data(post)
-                
-                # 应用过滤条件
-                if (post_data['score'] >= min_score and 
-                    post_data['num_comments'] >= min_comments):
-                    posts.append(post_data)
-            
-            logger.info(f"搜索完成: 找到 {len(posts)} 个符合条件的帖子")
-            
-            # 按分数排序
-            posts.sort(key=lambda x: x['score'], reverse=True)
-            
-            return posts
+        return {
+            'subreddit': subreddit_str,
+            'scope_info': scope_info,
+            'query': query,
+            'sort': sort,
+            'time_filter': time_filter,
+            'limit': limit
+        }
+    
+    def _filter_search_results(self, search_results, min_score: int, min_comments: int) -> List[Dict[str, Any]]:
+        """提取、过滤并按分数排序搜索结果"""
+        posts = []
+        for post in search_results:
+            post_data = self._extract_post_data(post)
             
-        except Exception as e:
-            logger.error(f"搜索失败: {e}")
-            return []
+            # 应用过滤条件
+            if (post_data['score'] >= min_score and 
+                post_data['num_comments'] >= min_comments):
+                posts.append(post_data)
+        
+        logger.info(f"搜索完成: 找到 {len(posts)} 个符合条件的帖子")
+        
+        # 按分数排序
+        posts.sort(key=lambda x: x['score'], reverse=True)
+        
+        return posts
+    
+    def _search_many(self, keyword_groups: Dict[str, Union[str, List[str]]],
+                     subreddits: Optional[List[str]] = None,
+                     sort: str = "top",
+                     time_filter: str = "week",
+                     limit: int = 100,
+                     min_score: int = 5,
+                     min_comments: int = 3) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        执行多个搜索：启用异步后端时并发执行，否则逐个调用search_by_keywords
+        
+        Returns:
+            {组名: 搜索结果列表}
+        """
+        if not self.async_backend:
+            return {
+                name: self.search_by_keywords(
+                    keywords=keywords,
+                    subreddits=subreddits,
+                    sort=sort,
+                    time_filter=time_filter,
+                    limit=limit,
+                    min_score=min_score,
+                    min_comments=min_comments
+                )
+                for name, keywords in keyword_groups.items()
+            }
+        
+        requests = [
+            self._build_search_request(keywords, subreddits, sort, time_filter, limit)
+            for keywords in keyword_groups.values()
+        ]
+        logger.info(f"并发执行 {len(requests)} 个搜索请求...")
+        raw_results = self.async_backend.search(requests)
+        
+        return {
+            name: self._filter_search_results(submissions, min_score, min_comments)
+            for name, submissions in zip(keyword_groups, raw_results)
+        }
     
     def multi_keyword_search(self, 
                            keyword_groups: Dict[str, List[str]],
@@ -134,24 +199,7 @@ class KeywordRedditCollector:
         """
         logger.info(f"开始多关键词组合搜索: {list(keyword_groups.keys())}")
         
-        results = {}
-        
-        for group_name, keywords in keyword_groups.items():
-            logger.info(f"搜索关键词组: {group_name} - {keywords}")
-            
-            # 对每组关键词进行搜索
-            group_results = self.search_by_keywords(
-                keywords=keywords,
-                subreddits=subreddits,
-                **search_params
-            )
-            
-            results[group_name] = group_results
-            
-            # API限制控制
-            time.sleep(1)
-        
-        return results
+        return self._search_many(keyword_groups, subreddits, **search_params)
     
     def trending_topics_search(self, 
                              ai_categories: Optional[Dict[str, List[str]]] = None,
@@ -202,26 +250,20 @@ class KeywordRedditCollector:
         }
         
         # 按类别搜索
-        all_posts = []
+        results['category_results'] = self._search_many(
+            ai_categories,
+            subreddits,
+            sort="top",
+            time_filter="week",
+            limit=limit_per_category,
+            min_score=10,
+            min_comments=5
+        )
         
-        for category, keywords in ai_categories.items():
-            category_posts = self.search_by_keywords(
-                keywords=keywords,
-                subreddits=subreddits,
-                sort="top",
-                time_filter="week",
-                limit=limit_per_category,
-                min_score=10,
-                min_comments=5
-            )
-            
-            results['category_results'][category] = category_posts
+        all_posts = []
+        for category, category_posts in results['category_results'].items():
             all_posts.extend(category_posts)
-            
             logger.info(f"类别 '{category}' 找到 {len(category_posts)} 个帖子")
-            
-            # API限制控制
-            time.sleep(1)
         
         # 生成摘要统计
         results['summary'] = self._generate_search_summary(results['category_results'])
@@ -330,9 +372,9 @@ class KeywordRedditCollector:
             total_comments += post['num_comments']
         
         # 排序统计
-        top_subreddits = sorted(subreddit_stats.items(), key=lambda x: x[1], reverse=True)[:5]
-        top_authors = sorted(author_stats.items(), key=lambda x: x[1], reverse=True)[:5]
-        top_domains = sorted(domain_stats.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_subreddits = select_top_k(subreddit_stats.items(), 5, key=lambda x: x[1])
+        top_authors = select_top_k(author_stats.items(), 5, key=lambda x: x[1])
+        top_domains = select_top_k(domain_stats.items(), 5, key=lambda x: x[1])
         
         # 找出最热门的帖子
         top_post = max(all_posts, key=lambda x: x['score'])
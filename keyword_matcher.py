@@ -0,0 +1,234 @@
+"""
+关键词匹配模块 - 趋势分析与质量评分共享的多关键词匹配器
+
+文本与关键词都按单词切分（字母数字串），在单词序列上构建 Aho–Corasick 自动机，
+一次扫描即可找出文本中出现的全部关键词，耗时与关键词数量无关，可扩展到上千个关键词。
+按单词匹配同时保证了单词边界：'ai' 不会匹配 'said' 中的子串，多词关键词
+（如 'machine learning'、'fine-tune'）按连续单词匹配。文本中的单词原样匹配，不做词形还原；
+每个关键词额外登记一个复数形式（最后一个单词加 's'），'LLMs'、'models'、'agents' 分别计入
+'llm'、'model'、'agent'；文本本身不被改写，'bias' 不会变成 'bia'。
+
+匹配器按关键词列表在进程内缓存，并记住已匹配过的文本：趋势分析扫描一遍帖子后，
+质量评分（以及同一帖子在多个时间维度中的重复出现）直接复用匹配结果。记忆的文本
+只在一次运行内有效，每次趋势分析开始时由 clear_match_memos 清空。
+"""
+
+import functools
+import re
+import weakref
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+# 趋势分析统计的AI关键词
+AI_KEYWORDS = (
+    'llm', 'gpt', 'ai', 'machine learning', 'deep learning',
+    'transformer', 'model', 'training', 'fine-tune', 'finetune',
+    'langchain', 'openai', 'anthropic', 'claude', 'chatgpt',
+    'rag', 'vector', 'embedding', 'prompt', 'agent', 'ollama',
+    'local', 'inference', 'quantization', 'lora', 'rlhf'
+)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+# 所有匹配器（用于在每次运行开始时清空记忆）
+_MATCHERS: "weakref.WeakSet[KeywordMatcher]" = weakref.WeakSet()
+
+
+def tokenize(text: str) -> List[str]:
+    """把文本切分为小写单词序列"""
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def keyword_variants(keyword: str) -> List[List[str]]:
+    """
+    关键词的单词序列及其复数形式（最后一个单词加 's'，已以 's' 结尾的关键词不加）
+
+    Args:
+        keyword: 关键词
+
+    Returns:
+        单词序列列表，第一个为关键词本身
+    """
+    tokens = tokenize(keyword)
+    if not tokens or tokens[-1].endswith('s'):
+        return [tokens]
+    return [tokens, tokens[:-1] + [tokens[-1] + 's']]
+
+
+def post_text(post: Dict[str, Any]) -> str:
+    """参与关键词匹配的帖子文本（标题 + 正文预览）"""
+    return f"{post.get('title', '')} {post.get('selftext_preview', '')}"
+
+
+class KeywordMatcher:
+    """单词级 Aho–Corasick 多关键词匹配器"""
+
+    def __init__(self, keywords: Iterable[str], memo_size: int = 200000):
+        """
+        构建自动机
+
+        Args:
+            keywords: 关键词列表（不区分大小写，重复项只保留第一个）
+            memo_size: 记住匹配结果的文本数上限，0 表示不记忆
+        """
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        self.keyword_set = frozenset(self.keywords)
+        self.memo_size = memo_size
+        self._memo: Dict[str, Tuple[str, ...]] = {}
+        _MATCHERS.add(self)
+
+        # 状态0为根；_goto[state] 为 {单词: 下一状态}，_output[state] 为在该状态结束的关键词下标
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        # 关键词的复数形式与关键词本身输出同一个下标
+        for index, keyword in enumerate(self.keywords):
+            for tokens in keyword_variants(keyword):
+                self._insert(tokens, index)
+
+        self._build_failure_links()
+
+    def _insert(self, tokens: List[str], index: int) -> None:
+        """把单词序列插入字典树，在结束状态登记关键词下标"""
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if state and index not in self._output[state]:
+            self._output[state] += (index,)
+
+    def _build_failure_links(self) -> None:
+        """按广度优先计算失败链接，并把后缀状态的输出合并到当前状态"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def clear_memo(self) -> None:
+        """清空记住的匹配结果"""
+        self._memo.clear()
+
+    def match(self, text: str) -> Tuple[str, ...]:
+        """
+        找出文本中出现的关键词
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            出现过的关键词（去重，按关键词列表中的顺序）
+        """
+        hits = self._memo.get(text)
+        if hits is not None:
+            return hits
+
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found.update(output[state])
+
+        hits = tuple(self.keywords[index] for index in sorted(found))
+        if len(self._memo) < self.memo_size:
+            self._memo[text] = hits
+        return hits
+
+    def match_post(self, post: Dict[str, Any]) -> Tuple[str, ...]:
+        """找出帖子标题与正文预览中出现的关键词"""
+        return self.match(post_text(post))
+
+
+def clear_match_memos() -> None:
+    """清空所有匹配器记住的文本（每次运行开始时调用，避免在进程内跨运行累积）"""
+    for matcher in list(_MATCHERS):
+        matcher.clear_memo()
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_keyword_matcher(keywords: Iterable[str] = AI_KEYWORDS) -> KeywordMatcher:
+    """
+    获取关键词列表对应的匹配器（进程内缓存，相同的关键词列表只构建一次）
+
+    Args:
+        keywords: 关键词列表，默认为 AI_KEYWORDS
+
+    Returns:
+        KeywordMatcher实例
+    """
+    return _cached_matcher(tuple(keywords))
+
+
+@functools.lru_cache(maxsize=32)
+def _covering_matcher(keywords: Tuple[str, ...]) -> Tuple[KeywordMatcher, Tuple[str, ...]]:
+    """返回能匹配这组关键词的匹配器（优先复用 AI_KEYWORDS 的匹配器）及小写后的关键词"""
+    lowered = tuple(keyword.lower() for keyword in keywords)
+    matcher = get_keyword_matcher(AI_KEYWORDS)
+    if not matcher.keyword_set.issuperset(lowered):
+        matcher = get_keyword_matcher(lowered)
+    return matcher, lowered
+
+
+def count_keyword_matches(post: Dict[str, Any], keywords: Iterable[str]) -> int:
+    """
+    统计帖子中出现了 keywords 中的几个关键词
+
+    keywords 都属于 AI_KEYWORDS 时（趋势关键词总是如此）复用趋势分析的匹配器及其匹配结果，
+    否则为这组关键词单独构建匹配器。
+
+    Args:
+        post: 帖子数据
+        keywords: 关键词列表
+
+    Returns:
+        出现的关键词数
+    """
+    matcher, lowered = _covering_matcher(tuple(keywords))
+    hits = matcher.match_post(post)
+    return sum(1 for keyword in lowered if keyword in hits)
+
+
+def count_keyword_matches_many(posts: Iterable[Dict[str, Any]], keywords: Iterable[str]) -> List[int]:
+    """
+    对一批帖子分别统计出现了 keywords 中的几个关键词（与逐个调用 count_keyword_matches 相同）
+
+    Args:
+        posts: 帖子列表
+        keywords: 关键词列表
+
+    Returns:
+        与posts顺序对应的关键词数列表
+    """
+    matcher, lowered = _covering_matcher(tuple(keywords))
+    # 不同帖子的匹配结果大量重复，相同的结果只计数一次
+    counted: Dict[Tuple[str, ...], int] = {}
+    counts = []
+    for post in posts:
+        hits = matcher.match_post(post)
+        count = counted.get(hits)
+        if count is None:
+            count = counted[hits] = sum(1 for keyword in lowered if keyword in hits)
+        counts.append(count)
+    return counts
@@ -0,0 +1,149 @@
+"""
+LLM客户端模块 - 摘要生成与综合分析共享的连接池化OpenAI客户端
+
+同步客户端按 (api_key, base_url, max_retries) 缓存为进程级单例，多次调用复用同一个
+HTTP连接池（keep-alive），避免每次请求重新建立TLS连接。异步客户端的连接绑定在
+事件循环上，因此所有异步请求都在一个进程级的后台事件循环中执行，异步客户端同样按参数
+缓存在该循环上，跨多次调用复用连接池，进程退出时关闭。
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from openai import AsyncOpenAI, OpenAI
+
+from config import LLM_HTTP_CONFIG
+
+try:
+    import httpx
+    from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+except ImportError:  # pragma: no cover - 随openai安装，缺失时使用SDK默认连接池
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Tuple, OpenAI] = {}
+_clients_lock = threading.Lock()
+
+# 异步客户端只在后台事件循环线程中创建和使用
+_async_clients: Dict[Tuple, AsyncOpenAI] = {}
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_loop_thread: Optional[threading.Thread] = None
+_async_loop_lock = threading.Lock()
+
+
+def get_llm_client(api_key: str, base_url: str, max_retries: int = 2) -> OpenAI:
+    """
+    获取共享的同步LLM客户端
+
+    Args:
+        api_key: API密钥
+        base_url: API基础URL
+        max_retries: SDK自带的重试次数（自行处理重试的调用方传0）
+
+    Returns:
+        OpenAI客户端，相同参数返回同一个实例
+    """
+    key = (api_key, base_url, max_retries)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=max_retries,
+                timeout=LLM_HTTP_CONFIG.get("timeout", 120.0),
+                **_http_client_kwargs(DefaultHttpxClient if httpx else None)
+            )
+            _clients[key] = client
+            logger.info(f"创建LLM客户端: {base_url}（连接池上限 {LLM_HTTP_CONFIG.get('max_connections', 20)}）")
+    return client
+
+
+def run_async_llm(api_key: str, base_url: str, coro_factory: Callable, *args, max_retries: int = 2) -> Any:
+    """
+    在共享的后台事件循环中运行一次异步LLM任务（可从任意线程调用）
+
+    用法：
+        results = run_async_llm(api_key, base_url, fetch_all, contents)
+        # async def fetch_all(client, contents): return await asyncio.gather(...)
+
+    Args:
+        api_key: API密钥
+        base_url: API基础URL
+        coro_factory: 形如 async def f(client, *args) 的协程函数，client为共享的AsyncOpenAI
+        *args: 传给协程函数的参数
+        max_retries: SDK自带的重试次数（自行处理重试的调用方传0）
+
+    Returns:
+        协程的返回值
+    """
+    key = (api_key, base_url, max_retries)
+    future = asyncio.run_coroutine_threadsafe(_run_with_client(key, coro_factory, *args), _ensure_async_loop())
+    return future.result()
+
+
+def _ensure_async_loop() -> asyncio.AbstractEventLoop:
+    """首次调用时在守护线程中启动事件循环，进程退出时关闭异步客户端"""
+    global _async_loop, _async_loop_thread
+    with _async_loop_lock:
+        if _async_loop is None:
+            _async_loop = asyncio.new_event_loop()
+            _async_loop_thread = threading.Thread(target=_async_loop.run_forever, name="async-llm", daemon=True)
+            _async_loop_thread.start()
+            atexit.register(close_async_llm_clients)
+        return _async_loop
+
+
+async def _run_with_client(key: Tuple, coro_factory: Callable, *args) -> Any:
+    # 异步客户端必须在事件循环内创建，之后一直复用到 close_async_llm_clients
+    client = _async_clients.get(key)
+    if client is None:
+        api_key, base_url, max_retries = key
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=max_retries,
+            timeout=LLM_HTTP_CONFIG.get("timeout", 120.0),
+            **_http_client_kwargs(DefaultAsyncHttpxClient if httpx else None)
+        )
+        _async_clients[key] = client
+        logger.info(f"创建异步LLM客户端: {base_url}")
+    return await coro_factory(client, *args)
+
+
+def close_async_llm_clients() -> None:
+    """关闭异步客户端的连接池并停止后台事件循环"""
+    global _async_loop
+    with _async_loop_lock:
+        loop, _async_loop = _async_loop, None
+    if loop is None:
+        return
+
+    async def close_all():
+        for client in _async_clients.values():
+            await client.close()
+        _async_clients.clear()
+
+    try:
+        asyncio.run_coroutine_threadsafe(close_all(), loop).result()
+    except Exception as e:
+        logger.debug(f"关闭异步LLM客户端失败: {e}")
+    loop.call_soon_threadsafe(loop.stop)
+    _async_loop_thread.join()
+    loop.close()
+
+
+def _http_client_kwargs(client_class: Optional[type]) -> dict:
+    """按LLM_HTTP_CONFIG构造带连接池上限的HTTP客户端参数"""
+    if client_class is None:
+        return {}
+    limits = httpx.Limits(
+        max_connections=LLM_HTTP_CONFIG.get("max_connections", 20),
+        max_keepalive_connections=LLM_HTTP_CONFIG.get("max_keepalive_connections", 10),
+        keepalive_expiry=LLM_HTTP_CONFIG.get("keepalive_expiry", 30.0),
+    )
+    return {"http_client": client_class(limits=limits)}
@@ -3,14 +3,26 @@ Reddit社区数据分析系统 - 主程序
 流程：获取 -> 清洗 -> 分析 -> 评分 -> 深度抓取 -> 综合报告
 """
 
+import argparse
+import contextlib
 import logging
+import sqlite3
 from datetime import datetime
+from pathlib import Path
+from config import PIPELINE_CONFIG, REPORT_CONFIG, SNAPSHOT_CONFIG, TREND_HISTORY_CONFIG
 from fetcher import RedditDataFetcher
 from cleaner import DataCleaner
 from analyzer import TrendAnalyzer
 from scorer import QualityScorer
 from reporter import ReportGenerator
 from summarizer import PostSummarizer
+from streaming import stream_fetch_and_clean
+from incremental import IncrementalState
+from checkpoint import PipelineCheckpoint
+from profiler import profiler
+from report_index import ReportIndex
+from snapshot_store import SnapshotStore
+from trend_history import TrendHistory
 
 # 配置日志
 logging.basicConfig(
@@ -33,8 +45,27 @@ SUBREDDIT_CONFIG = {
     ]
 }
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="Reddit AI社区深度分析系统")
+    parser.add_argument(
+        "--stream", action="store_true", default=PIPELINE_CONFIG["stream"],
+        help="流式模式：抓取与清洗边到边处理，进入排行榜的帖子提前生成摘要"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true", default=PIPELINE_CONFIG["incremental"],
+        help="增量模式：复用上次运行中未变化帖子的清洗结果与摘要"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="从上一次未完成运行的检查点继续，跳过已完成的阶段"
+    )
+    return parser.parse_args()
+
 def main():
     """主流程"""
+    args = parse_args()
+    
     print("=" * 60)
     print("Reddit AI社区深度分析系统")
     print("=" * 60)
@@ -45,57 +76,125 @@ def main():
     fetcher = RedditDataFetcher()
     cleaner = DataCleaner()
     summarizer = PostSummarizer()  # 初始化摘要生成器
-    analyzer = TrendAnalyzer(summarizer=summarizer)  # 传入summarizer
-    scorer = QualityScorer()
+    trend_history = None
+    if TREND_HISTORY_CONFIG["enabled"]:
+        trend_history = TrendHistory(
+            TREND_HISTORY_CONFIG["path"],
+            window=TREND_HISTORY_CONFIG["window"],
+            min_history=TREND_HISTORY_CONFIG["min_history"],
+            z_threshold=TREND_HISTORY_CONFIG["z_threshold"]
+        )
+    analyzer = TrendAnalyzer(summarizer=summarizer, trend_history=trend_history)  # 传入summarizer
+    snapshot_store = None
+    if SNAPSHOT_CONFIG["enabled"]:
+        snapshot_store = SnapshotStore(
+            SNAPSHOT_CONFIG["path"],
+            max_age_days=SNAPSHOT_CONFIG["max_age_days"],
+            min_interval=SNAPSHOT_CONFIG["min_interval"]
+        )
+    scorer = QualityScorer(snapshot_store=snapshot_store)
     reporter = ReportGenerator()
     
-    # ========== 步骤1: 获取基础帖子信息 ==========
-    logger.info("步骤1: 获取基础帖子信息")
-    raw_posts = fetcher.fetch_posts_from_subreddits(SUBREDDIT_CONFIG)
-    logger.info(f"共获取 {sum(len(posts) for posts in raw_posts.values())} 个帖子")
+    incremental = None
+    if args.incremental:
+        incremental = IncrementalState(
+            PIPELINE_CONFIG["state_path"],
+            buckets_per_doubling=PIPELINE_CONFIG["fingerprint_buckets"]
+        )
     
-    # ========== 步骤2: 数据清洗（不去重）==========
-    logger.info("步骤2: 数据清洗")
-    cleaned_posts = cleaner.clean_posts(raw_posts, remove_duplicates=False)
-    logger.info(f"清洗后保留 {sum(len(posts) for posts in cleaned_posts.values())} 个帖子")
+    checkpoint = PipelineCheckpoint(
+        PIPELINE_CONFIG["checkpoint_dir"],
+        resume=args.resume,
+        max_age=PIPELINE_CONFIG["checkpoint_max_age"]
+    )
+    
+    if args.stream:
+        # ========== 步骤1+2: 流式获取与清洗（同时提前生成排行榜摘要）==========
+        logger.info("步骤1+2: 流式获取与清洗")
+        cleaned_posts = checkpoint.run('cleaned_posts', lambda: stream_fetch_and_clean(
+            fetcher, cleaner, SUBREDDIT_CONFIG,
+            top_k=20,
+            summarizer=summarizer,
+            max_comments=5,
+            incremental=incremental
+        ))
+        logger.info(f"清洗后保留 {sum(len(posts) for posts in cleaned_posts.values())} 个帖子")
+    else:
+        # ========== 步骤1: 获取基础帖子信息 ==========
+        logger.info("步骤1: 获取基础帖子信息")
+        raw_posts = checkpoint.run('raw_posts', lambda: fetcher.fetch_posts_from_subreddits(SUBREDDIT_CONFIG))
+        logger.info(f"共获取 {sum(len(posts) for posts in raw_posts.values())} 个帖子")
+        
+        # ========== 步骤2: 数据清洗（不去重）==========
+        logger.info("步骤2: 数据清洗")
+        def clean_stage():
+            if incremental:
+                return incremental.clean_posts(cleaner, raw_posts)
+            return cleaner.clean_posts(raw_posts, remove_duplicates=False)
+        
+        cleaned_posts = checkpoint.run('cleaned_posts', clean_stage)
+        logger.info(f"清洗后保留 {sum(len(posts) for posts in cleaned_posts.values())} 个帖子")
+    
+    # 在检查点之外登记未变化帖子的上次摘要，从清洗结果续跑时同样生效（已登记的帖子会跳过）
+    if incremental:
+        incremental.seed_summaries(summarizer, cleaned_posts)
     
     # ========== 步骤3: 制作三个时间维度的热门排行表 + 趋势分析 + 生成摘要 ==========
     logger.info("步骤3: 三个时间维度热门排行 + 趋势分析 + 摘要生成")
-    timeframe_rankings = analyzer.create_hot_ranking(
-        cleaned_posts, 
-        top_k=20, 
-        fetcher=fetcher,  # 传入fetcher用于获取评论
-        generate_summaries=True  # 启用摘要生成
-    )
-    trend_analysis = analyzer.analyze_trends(cleaned_posts)
+    def ranking_stage():
+        rankings = analyzer.create_hot_ranking(
+            cleaned_posts, 
+            top_k=20, 
+            fetcher=fetcher,  # 传入fetcher用于获取评论
+            generate_summaries=True  # 启用摘要生成
+        )
+        trend_analysis = analyzer.analyze_trends(cleaned_posts)
+        if trend_history:
+            trend_history.save()
+        return {'timeframe_rankings': rankings, 'trend_analysis': trend_analysis}
+    
+    ranking_result = checkpoint.run('rankings', ranking_stage)
+    timeframe_rankings = ranking_result['timeframe_rankings']
+    trend_analysis = ranking_result['trend_analysis']
     logger.info(f"生成热门排行榜: hot-{len(timeframe_rankings['hot'])}, week-{len(timeframe_rankings['week'])}, month-{len(timeframe_rankings['month'])}")
     logger.info("摘要生成已完成")
     
-    # ========== 步骤4: 去重（保留hot最高）==========
-    logger.info("步骤4: 数据去重")
-    unique_posts = cleaner.deduplicate_posts(cleaned_posts, keep='highest_hot')
-    logger.info(f"去重后保留 {len(unique_posts)} 个唯一帖子")
-    
-    # ========== 步骤5: 质量评分排序 ==========
-    logger.info("步骤5: 质量评分")
-    scored_posts = scorer.score_posts(unique_posts, trend_analysis)
-    quality_ranking = scorer.get_top_quality_posts(scored_posts, top_k=5)
-    logger.info(f"高质量帖子TOP5已选出")
-    
-    # 为高质量帖子生成摘要（如果还没有）
-    logger.info("为高质量帖子生成摘要...")
-    quality_ranking = summarizer.generate_summaries_for_posts(
-        quality_ranking, 
-        fetcher,
-        max_workers=3,  # TOP5数量少，减少并发
-        max_comments=5
-    )
-    logger.info("高质量帖子摘要生成完成")
+    def scoring_stage():
+        # 记录本次的分数/评论快照（去重前，各列表中的副本按采集时间合并）
+        if snapshot_store is not None:
+            snapshot_store.record(post for posts in cleaned_posts.values() for post in posts)
+            snapshot_store.save()
+        
+        # ========== 步骤4: 去重（保留hot最高）==========
+        logger.info("步骤4: 数据去重")
+        unique_posts = cleaner.deduplicate_posts(cleaned_posts, keep='highest_hot')
+        logger.info(f"去重后保留 {len(unique_posts)} 个唯一帖子")
+        
+        # ========== 步骤5: 质量评分排序 ==========
+        logger.info("步骤5: 质量评分")
+        scored = scorer.score_posts(unique_posts, trend_analysis)
+        top_posts = scorer.get_top_quality_posts(scored, top_k=5)
+        logger.info(f"高质量帖子TOP5已选出")
+        
+        # 为高质量帖子生成摘要（如果还没有）
+        logger.info("为高质量帖子生成摘要...")
+        top_posts = summarizer.generate_summaries_for_posts(
+            top_posts, 
+            fetcher,
+            max_workers=3,  # TOP5数量少，减少并发
+            max_comments=5
+        )
+        logger.info("高质量帖子摘要生成完成")
+        return {'scored_posts': scored, 'quality_ranking': top_posts}
+    
+    scoring_result = checkpoint.run('scored_posts', scoring_stage)
+    scored_posts = scoring_result['scored_posts']
+    quality_ranking = scoring_result['quality_ranking']
     
     # ========== 步骤6: 深度信息获取（TOP5）==========
     logger.info("步骤6: 深度信息获取")
     top5_ids = [post['id'] for post in quality_ranking]
-    detailed_posts = fetcher.fetch_detailed_posts(top5_ids, comment_depth=2)
+    detailed_posts = checkpoint.run('detailed_posts', lambda: fetcher.fetch_detailed_posts(top5_ids, comment_depth=2))
     logger.info(f"成功获取 {len(detailed_posts)} 个帖子的详细信息")
     
     # ========== 步骤7: 大模型综合分析 ==========
@@ -160,10 +259,15 @@ def main():
     
     logger.info(f"合并后排行榜总数: {len(combined_ranking)} 个帖子")
 
-    llm_analysis = reporter.analyze_with_llm(
-        hot_ranking=combined_ranking,  # 传递合并后的排行榜
-        trend_analysis=trend_analysis,
-        detailed_posts=detailed_posts
+    llm_analysis = checkpoint.run(
+        'llm_analysis',
+        lambda: reporter.analyze_with_llm(
+            hot_ranking=combined_ranking,  # 传递合并后的排行榜
+            trend_analysis=trend_analysis,
+            detailed_posts=detailed_posts
+        ),
+        # 分析失败时不保存，--resume 会重试这一步
+        should_save=lambda result: not result.startswith("分析失败")
     )
     
     # ========== 步骤8: 生成最终报告 ==========
@@ -171,6 +275,7 @@ def main():
     report_data = {
         'timeframe_rankings': timeframe_rankings,  # 这里改为timeframe_rankings
         'quality_ranking': quality_ranking,
+        'scored_posts': scored_posts,
         'trend_analysis': trend_analysis,
         'detailed_posts': detailed_posts,
         'llm_analysis': llm_analysis,
@@ -181,7 +286,36 @@ def main():
         }
     }   
     
-    report_files = reporter.generate_report(report_data)
+    with profiler.stage('report'):
+        report_files = reporter.generate_report(report_data)
+    
+    # 更新历史报告索引（首次运行时回填 reports/ 下的全部历史报告）
+    if REPORT_CONFIG.get('index_enabled', True):
+        with profiler.stage('report_index'):
+            try:
+                with contextlib.closing(ReportIndex(REPORT_CONFIG.get('index_path'))) as report_index:
+                    report_index.update(REPORT_CONFIG.get('output_dir', 'reports'))
+            except (sqlite3.Error, OSError) as exc:
+                logger.warning(f"更新报告索引失败（不影响本次报告）: {exc}")
+    
+    # 运行剖析与报告放在同一目录：report_*.profile.json
+    report_files['profile'] = profiler.write(
+        Path(report_files['markdown']).with_suffix('.profile.json')
+    )
+    
+    if incremental:
+        incremental.save(
+            cleaned_posts,
+            timeframe_rankings['hot'] + timeframe_rankings['week'] + timeframe_rankings['month'] + quality_ranking
+        )
+    
+    # 之后不再需要摘要，关闭后台摘要线程池
+    summarizer.close()
+    
+    if llm_analysis.startswith("分析失败"):
+        logger.warning("大模型分析失败，已保留检查点，可使用 --resume 只重试分析与报告生成")
+    else:
+        checkpoint.clear()
     
     # ========== 完成 ==========
     duration = (datetime.now() - start_time).total_seconds()
@@ -189,6 +323,10 @@ def main():
     print("分析完成!")
     print(f"耗时: {duration:.1f}秒")
     print(f"Markdown报告: {report_files.get('markdown', 'N/A')}")
+    print(f"数据文件: {report_files.get('json', 'N/A')}")
+    if 'parquet' in report_files:
+        print(f"帖子表: {report_files['parquet']}")
+    print(f"运行剖析: {report_files.get('profile', 'N/A')}")
     print("=" * 60)
 
 if __name__ == "__main__":
@@ -0,0 +1,251 @@
+"""
+列式帖子表 - 趋势分析与质量评分使用的内存结构
+
+帖子按列存储：分数、评论数、点赞率为NumPy数组，社区、作者、标签为整数编码加
+去重后的类别列表（相同字符串只存一份），发布时间额外解析为 datetime64 数组；
+其余字段（标题、正文预览、链接等）按列保存为Python列表。聚合与评分直接在数组上进行，
+每个帖子不再是一个独立的dict。
+
+PostRow 提供与帖子dict兼容的只读视图（post['score']、post.get(...)、遍历键），
+需要可修改的dict时使用 to_dict / to_dicts。
+"""
+
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# 缺失字段的占位符（区分"没有这个键"与"值为None"）
+_MISSING = object()
+
+
+def parse_created(value: Any) -> Optional[datetime]:
+    """把 created_utc（ISO字符串或时间戳）解析为本地时间的naive datetime，无法解析时返回None"""
+    try:
+        if isinstance(value, str):
+            created = datetime.fromisoformat(value.replace('Z', ''))
+        else:
+            created = datetime.fromtimestamp(value)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+    return created if created.tzinfo is None else None
+
+
+class PostTable:
+    """列式帖子表"""
+
+    NUMERIC_COLUMNS = ('score', 'num_comments', 'upvote_ratio')
+    CATEGORICAL_COLUMNS = ('subreddit', 'author', 'flair')
+
+    def __init__(self, posts: List[Dict[str, Any]], columns: Iterable[str] = None):
+        """
+        从帖子列表构建（通常使用 from_posts / from_posts_dict）
+
+        Args:
+            posts: 帖子dict列表，构建完成后表不再引用这些dict
+            columns: 只存储这些字段（默认全部字段）；to_dict 也只还原这些字段
+        """
+        self._size = len(posts)
+        self.groups: Dict[str, slice] = {}
+
+        if columns is None:
+            # 所有出现过的字段，按首次出现的顺序
+            self.keys: List[str] = list(dict.fromkeys(key for post in posts for key in post))
+        else:
+            self.keys = list(dict.fromkeys(columns))
+
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._categorical: Dict[str, Tuple[np.ndarray, List[Any]]] = {}
+        self._objects: Dict[str, List[Any]] = {}
+        self._present: Dict[str, np.ndarray] = {}
+
+        for key in self.keys:
+            values = [post.get(key, _MISSING) for post in posts]
+            present = np.fromiter((value is not _MISSING for value in values), dtype=bool, count=self._size)
+            if not present.all():
+                self._present[key] = present
+
+            if key in self.NUMERIC_COLUMNS and self._store_numeric(key, values):
+                continue
+            if key in self.CATEGORICAL_COLUMNS:
+                self._store_categorical(key, values)
+                continue
+            self._objects[key] = values
+        self._created: Optional[np.ndarray] = None
+
+    @property
+    def created(self) -> np.ndarray:
+        """发布时间（datetime64[us]，本地naive时间，无法解析为NaT），首次访问时解析"""
+        if self._created is None:
+            self._created = np.array([parse_created(value) for value in self.column('created_utc')],
+                                     dtype='datetime64[us]')
+        return self._created
+
+    @classmethod
+    def from_posts(cls, posts: Iterable[Dict[str, Any]], columns: Iterable[str] = None) -> 'PostTable':
+        """从帖子列表构建，columns 指定只存储的字段"""
+        return cls(list(posts), columns)
+
+    @classmethod
+    def from_posts_dict(cls, posts_dict: Dict[str, List[Dict[str, Any]]]) -> 'PostTable':
+        """
+        从 {"timeframe_sub": [posts]} 构建，按键的顺序拼接
+
+        groups 记录每个键对应的行范围。
+        """
+        posts, groups, start = [], {}, 0
+        for key, group_posts in posts_dict.items():
+            posts.extend(group_posts)
+            groups[key] = slice(start, start + len(group_posts))
+            start += len(group_posts)
+        table = cls(posts)
+        table.groups = groups
+        return table
+
+    def _store_numeric(self, key: str, values: List[Any]) -> bool:
+        """全部为整数（或全部为实数）时存为NumPy数组，否则返回False按普通列存储"""
+        actual = [value for value in values if value is not _MISSING]
+        if all(type(value) is int for value in actual):
+            dtype = np.int64
+        elif all(type(value) in (int, float) for value in actual):
+            dtype = np.float64
+        else:
+            return False
+        try:
+            self._numeric[key] = np.array([value if value is not _MISSING else 0 for value in values],
+                                          dtype=dtype)
+        except OverflowError:
+            return False
+        return True
+
+    def _store_categorical(self, key: str, values: List[Any]) -> None:
+        """按首次出现的顺序为取值编码，缺失为-1"""
+        index: Dict[Any, int] = {}
+        codes = np.fromiter(
+            (index.setdefault(value, len(index)) if value is not _MISSING else -1 for value in values),
+            dtype=np.int32, count=len(values)
+        )
+        self._categorical[key] = (codes, list(index))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> 'PostRow':
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return PostRow(self, index)
+
+    def __iter__(self) -> Iterator['PostRow']:
+        return (PostRow(self, index) for index in range(self._size))
+
+    def has(self, key: str, index: int) -> bool:
+        """第 index 行是否有该字段"""
+        present = self._present.get(key)
+        if present is None:
+            return key in self._numeric or key in self._categorical or key in self._objects
+        return bool(present[index])
+
+    def value(self, key: str, index: int, default: Any = None) -> Any:
+        """第 index 行的字段值（Python类型），没有该字段时返回default"""
+        if not self.has(key, index):
+            return default
+        if key in self._numeric:
+            return self._numeric[key][index].item()
+        if key in self._categorical:
+            codes, categories = self._categorical[key]
+            return categories[codes[index]]
+        return self._objects[key][index]
+
+    def array(self, key: str, default: float = 0) -> np.ndarray:
+        """
+        数值列（缺失的行填充default）
+
+        Args:
+            key: score / num_comments / upvote_ratio
+            default: 缺失值的填充值（与 post.get(key, default) 相同语义）
+        """
+        if key not in self._numeric:
+            return np.array(self.column(key, default))
+        values = self._numeric[key]
+        present = self._present.get(key)
+        if present is None:
+            return values
+        return np.where(present, values, default)
+
+    def codes(self, key: str) -> Tuple[np.ndarray, List[Any]]:
+        """
+        分类列的编码
+
+        Returns:
+            (每行的编码数组，缺失为-1；编码对应的取值列表)
+        """
+        if key in self._categorical:
+            return self._categorical[key]
+        index: Dict[Any, int] = {}
+        codes = np.fromiter(
+            (index.setdefault(value, len(index)) if value is not _MISSING else -1
+             for value in self._raw_column(key)),
+            dtype=np.int32, count=self._size
+        )
+        return codes, list(index)
+
+    def column(self, key: str, default: Any = None) -> List[Any]:
+        """任意字段的一列（Python列表，缺失的行为default）"""
+        return [default if value is _MISSING else value for value in self._raw_column(key)]
+
+    def _raw_column(self, key: str) -> List[Any]:
+        if key in self._objects:
+            return self._objects[key]
+        if key in self._numeric:
+            values = self._numeric[key].tolist()
+        elif key in self._categorical:
+            codes, categories = self._categorical[key]
+            values = [categories[code] for code in codes.tolist()]
+        else:
+            return [_MISSING] * self._size
+        present = self._present.get(key)
+        if present is not None:
+            values = [value if flag else _MISSING for value, flag in zip(values, present.tolist())]
+        return values
+
+    def to_dict(self, index: int) -> Dict[str, Any]:
+        """第 index 行还原为帖子dict（字段顺序与构建时一致）"""
+        return {key: self.value(key, index) for key in self.keys if self.has(key, index)}
+
+    def to_dicts(self, indices: Iterable[int] = None) -> List[Dict[str, Any]]:
+        """多行还原为帖子dict列表，默认全部"""
+        if indices is None:
+            indices = range(self._size)
+        return [self.to_dict(int(index)) for index in indices]
+
+
+class PostRow(Mapping):
+    """帖子表中一行的只读dict视图"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: PostTable, index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._table.value(key, self._index, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self._table.keys if self._table.has(key, self._index))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> Dict[str, Any]:
+        """与 dict.copy 一样返回可修改的dict"""
+        return self._table.to_dict(self._index)
+
+    def __repr__(self) -> str:
+        return f"PostRow({self.copy()!r})"
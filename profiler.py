@@ -0,0 +1,157 @@
+"""
+性能剖析模块 - 记录主流程各阶段的耗时、API调用、LLM token、缓存命中、重试与内存峰值
+
+进程内共享一个 profiler 实例：main.py 用 stage() 划分阶段，各模块用 count() 记录计数、
+用 @timed 记录热点方法的调用次数与耗时，运行结束后写出JSON格式的运行剖析。
+计数归入当前阶段（后台线程的计数同样计入调用时所处的阶段）。
+"""
+
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows没有resource模块
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """进程的内存峰值（MB），无法获取时返回None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS为字节
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+class RunProfiler:
+    """运行剖析器（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = []
+        self._current = None
+        self._counters = defaultdict(float)
+        self._timings = defaultdict(lambda: {'calls': 0, 'seconds': 0.0})
+        self._started_at = datetime.now()
+        self._start = time.perf_counter()
+
+    def reset(self) -> None:
+        """清空已记录的阶段、计数与耗时（同一进程内多次运行主流程时使用，如基准测试）"""
+        with self._lock:
+            self._stages = []
+            self._current = None
+            self._counters = defaultdict(float)
+            self._timings = defaultdict(lambda: {'calls': 0, 'seconds': 0.0})
+            self._started_at = datetime.now()
+            self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """记录一个流水线阶段"""
+        stage = {
+            'name': name,
+            'counters': defaultdict(float),
+            'wall_seconds': 0.0,
+            'cpu_seconds': 0.0,
+        }
+        previous = self._current
+        self._current = stage
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            stage['wall_seconds'] = round(time.perf_counter() - start, 3)
+            stage['cpu_seconds'] = round(time.process_time() - cpu_start, 3)
+            stage['peak_rss_mb'] = peak_rss_mb()
+            self._current = previous
+            with self._lock:
+                self._stages.append(stage)
+            logger.info(f"阶段 {name} 耗时 {stage['wall_seconds']:.2f} 秒")
+
+    def count(self, name: str, value: float = 1) -> None:
+        """累加一个计数（同时计入当前阶段与全局）"""
+        with self._lock:
+            self._counters[name] += value
+            if self._current is not None:
+                self._current['counters'][name] += value
+
+    def record_timing(self, name: str, seconds: float) -> None:
+        """记录一次方法调用的耗时"""
+        with self._lock:
+            timing = self._timings[name]
+            timing['calls'] += 1
+            timing['seconds'] += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出运行剖析"""
+        with self._lock:
+            return {
+                'started_at': self._started_at.isoformat(),
+                'wall_seconds': round(time.perf_counter() - self._start, 3),
+                'peak_rss_mb': peak_rss_mb(),
+                'counters': _plain_counters(self._counters),
+                'stages': [
+                    {**stage, 'counters': _plain_counters(stage['counters'])}
+                    for stage in self._stages
+                ],
+                'timings': {
+                    name: {'calls': timing['calls'], 'seconds': round(timing['seconds'], 3)}
+                    for name, timing in sorted(self._timings.items())
+                },
+            }
+
+    def write(self, path: str) -> str:
+        """把运行剖析写入JSON文件"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding='utf-8')
+        logger.info(f"运行剖析已保存: {path}")
+        return str(path)
+
+
+def _plain_counters(counters: Dict[str, float]) -> Dict[str, Any]:
+    return {name: int(value) if float(value).is_integer() else round(value, 3)
+            for name, value in sorted(counters.items())}
+
+
+profiler = RunProfiler()
+
+
+def count(name: str, value: float = 1) -> None:
+    """在全局剖析器中累加计数"""
+    profiler.count(name, value)
+
+
+def record_llm_usage(usage) -> None:
+    """记录一次LLM调用的token用量（接口未返回usage时只计请求数）"""
+    profiler.count('llm_requests')
+    if usage is None:
+        return
+    profiler.count('llm_prompt_tokens', getattr(usage, 'prompt_tokens', 0) or 0)
+    profiler.count('llm_completion_tokens', getattr(usage, 'completion_tokens', 0) or 0)
+
+
+def timed(name: str):
+    """装饰器：记录方法的调用次数与累计耗时"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record_timing(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,167 @@
+"""
+提示词组装模块 - 按优先级把各段内容装入token预算
+
+token数为粗略估计（不依赖具体模型的分词器）：中日韩字符约1个token/字，
+其余字符约4个字符/token。
+"""
+
+import json
+import logging
+import math
+import re
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+OMITTED_TEXT = "（因长度限制省略）"
+
+
+def estimate_tokens(text: str) -> int:
+    """估计文本的token数"""
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def compact_json(data: Any) -> str:
+    """紧凑序列化（无缩进、无多余空格），比 indent=2 节省约三成token"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def shrink_json(data: Any, max_tokens: int) -> str:
+    """
+    把JSON数据压缩到预算内
+
+    反复把其中最长的列表/字典截短一半（保留靠前的条目，分析结果都已按重要性排序），
+    直到序列化结果不超过预算或无法再截短。
+
+    Returns:
+        序列化文本；无法装入预算时返回的文本仍可能超出，由调用方决定是否丢弃
+    """
+    text = compact_json(data)
+    while estimate_tokens(text) > max_tokens:
+        container = _longest_container(data)
+        if container is None:
+            break
+        data = _truncate_container(data, container, (len(container) + 1) // 2 if len(container) > 1 else 0)
+        text = compact_json(data)
+    return text
+
+
+def _longest_container(data: Any):
+    """找到嵌套结构中条目最多的非空列表/字典"""
+    best = None
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, dict)):
+            if node and (best is None or len(node) > len(best)):
+                best = node
+            stack.extend(node.values() if isinstance(node, dict) else node)
+    return best
+
+
+def _truncate_container(data: Any, target, size: int) -> Any:
+    """返回把 target 截短为 size 个条目后的数据副本（只复制路径上的节点）"""
+    if data is target:
+        if isinstance(data, dict):
+            return dict(list(data.items())[:size])
+        return data[:size]
+    if isinstance(data, dict):
+        return {key: _truncate_container(value, target, size) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_truncate_container(value, target, size) for value in data]
+    return data
+
+
+class PromptBuilder:
+    """
+    提示词组装器
+
+    固定文本（任务说明、输出要求）总是保留；各内容段按 priority 从小到大依次装入
+    剩余预算。列表段逐条装入，装不下时丢弃该段剩余条目；JSON段整体截短后装入。
+    build() 返回各段渲染后的文本，由调用方填回模板，各段在提示词中的位置不受优先级影响。
+    """
+
+    def __init__(self, budget_tokens: int):
+        """
+        初始化组装器
+
+        Args:
+            budget_tokens: 整个提示词的token预算
+        """
+        self.budget_tokens = budget_tokens
+        self._fixed_tokens = 0
+        self._sections: List[Dict[str, Any]] = []
+
+    def add_fixed(self, text: str) -> None:
+        """登记必须保留的固定文本（模板本身）"""
+        self._fixed_tokens += estimate_tokens(text)
+
+    def add_items(self, name: str, items: List[str], priority: int, separator: str = "\n") -> None:
+        """
+        登记一个由多条文本组成的内容段
+
+        Args:
+            name: 段名
+            items: 按重要性排列的条目
+            priority: 优先级，数值越小越先装入
+            separator: 条目之间的分隔符
+        """
+        self._sections.append({
+            'name': name, 'kind': 'items', 'items': items,
+            'priority': priority, 'separator': separator
+        })
+
+    def add_json(self, name: str, data: Any, priority: int) -> None:
+        """登记一个JSON内容段，预算不足时截短其中的列表/字典"""
+        self._sections.append({'name': name, 'kind': 'json', 'data': data, 'priority': priority})
+
+    def build(self) -> Dict[str, str]:
+        """
+        按优先级装入各段
+
+        Returns:
+            {段名: 渲染后的文本}
+        """
+        remaining = self.budget_tokens - self._fixed_tokens
+        rendered = {}
+
+        for section in sorted(self._sections, key=lambda s: s['priority']):
+            if section['kind'] == 'items':
+                text, used = self._pack_items(section, remaining)
+            else:
+                text = shrink_json(section['data'], remaining)
+                used = estimate_tokens(text)
+                if used > remaining:
+                    text, used = OMITTED_TEXT, estimate_tokens(OMITTED_TEXT)
+                    logger.warning(f"提示词预算不足，已省略 {section['name']}")
+
+            rendered[section['name']] = text
+            remaining -= used
+
+        logger.info(f"提示词约 {self.budget_tokens - remaining} tokens（预算 {self.budget_tokens}）")
+        return rendered
+
+    def _pack_items(self, section: Dict[str, Any], remaining: int):
+        separator_tokens = estimate_tokens(section['separator'])
+        kept = []
+        used = 0
+
+        for item in section['items']:
+            cost = estimate_tokens(item) + (separator_tokens if kept else 0)
+            if used + cost > remaining:
+                break
+            kept.append(item)
+            used += cost
+
+        dropped = len(section['items']) - len(kept)
+        if dropped:
+            logger.warning(f"提示词预算不足，{section['name']} 省略了 {dropped}/{len(section['items'])} 条")
+            if not kept:
+                return OMITTED_TEXT, estimate_tokens(OMITTED_TEXT)
+
+        return section['separator'].join(kept), used
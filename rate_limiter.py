@@ -0,0 +1,175 @@
+"""
+限流模块 - 为Reddit API请求提供线程安全的限流器
+"""
+
+import logging
+import threading
+import time
+
+from profiler import count
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """令牌桶限流器（线程安全，多个抓取线程共享同一实例）"""
+
+    def __init__(self, requests_per_minute: int = 100, burst: int = 10):
+        """
+        初始化限流器
+
+        Args:
+            requests_per_minute: 每分钟允许的请求数（令牌补充速率）
+            burst: 令牌桶容量，即允许的瞬时突发请求数
+        """
+        self.rate = max(requests_per_minute, 1) / 60.0
+        self.capacity = float(max(burst, 1))
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        logger.info(f"令牌桶限流器初始化完成 - {requests_per_minute} 次/分钟, 突发 {burst}")
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        获取令牌，令牌不足时阻塞等待
+
+        Args:
+            tokens: 本次请求消耗的令牌数
+
+        Returns:
+            实际等待的秒数
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        预占令牌但不阻塞（令牌可以透支），返回调用方需要等待的秒数
+
+        异步调用方据此 await asyncio.sleep()，而不是阻塞事件循环。
+        """
+        tokens = min(float(tokens), self.capacity)
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= tokens
+
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RedditRateLimiter:
+    """
+    基于Reddit限流响应头的自适应限流器
+
+    PRAW 在每次响应后更新 reddit.auth.limits（remaining / used，旧版本还有
+    reset_timestamp）。额度充足时不等待；低于 pacing 阈值时把剩余额度均匀
+    分摊到窗口剩余时间；低于 reserve 时等待窗口重置。还没有任何响应头时
+    （进程刚启动）退回令牌桶限流。
+    """
+
+    def __init__(self, reddit, window_seconds: int = 600, reserve: int = 10,
+                 pacing_threshold: int = 100, fallback: TokenBucketRateLimiter = None):
+        """
+        初始化限流器
+
+        Args:
+            reddit: praw.Reddit 实例
+            window_seconds: Reddit 配额窗口长度（秒）
+            reserve: 保留额度，剩余额度低于此值时等待窗口重置
+            pacing_threshold: 剩余额度低于此值时开始放缓请求
+            fallback: 尚未拿到限流信息时使用的令牌桶
+        """
+        self.reddit = reddit
+        self.window_seconds = window_seconds
+        self.reserve_budget = reserve
+        self.pacing_threshold = max(pacing_threshold, reserve + 1)
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        在发出请求前调用，必要时阻塞等待
+
+        Args:
+            tokens: 本次操作预计消耗的API请求数
+
+        Returns:
+            实际等待的秒数
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def reserve(self, tokens: int = 1) -> float:
+        """预占请求额度但不阻塞，返回调用方需要等待的秒数"""
+        count('reddit_api_requests', tokens)
+        wait = self._reserve(tokens)
+        if wait > 0:
+            count('reddit_rate_limit_wait_seconds', wait)
+        return wait
+
+    def _reserve(self, tokens: int) -> float:
+        remaining, reset_in = self._read_limits()
+
+        if remaining is None:
+            return self.fallback.reserve(tokens) if self.fallback else 0.0
+
+        available = remaining - tokens
+        if available >= self.pacing_threshold:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            if available <= self.reserve_budget:
+                # 额度即将耗尽，等待窗口重置
+                wait = reset_in + 1
+                logger.warning(f"Reddit API剩余额度 {remaining}，等待 {wait:.0f} 秒至配额窗口重置")
+            else:
+                # 把剩余额度均匀分摊到窗口剩余时间
+                interval = reset_in / (available - self.reserve_budget) * tokens
+                self._next_allowed = max(self._next_allowed, now) + interval
+                wait = self._next_allowed - interval - now
+
+        return max(wait, 0.0)
+
+    def _read_limits(self):
+        """读取PRAW记录的限流信息，返回 (剩余额度, 距离窗口重置的秒数)"""
+        try:
+            limits = self.reddit.auth.limits
+        except Exception:
+            return None, 0.0
+
+        remaining = limits.get('remaining')
+        if remaining is None:
+            return None, 0.0
+
+        reset_timestamp = limits.get('reset_timestamp')
+        if reset_timestamp:
+            reset_in = max(0.0, reset_timestamp - time.time())
+        else:
+            # 新版PRAW不再暴露重置时间，Reddit的配额窗口按整点对齐
+            reset_in = self.window_seconds - (time.time() % self.window_seconds)
+
+        return int(remaining), reset_in
+
+
+def create_reddit_rate_limiter(reddit, config: dict) -> RedditRateLimiter:
+    """按FETCH_CONFIG创建Reddit限流器"""
+    return RedditRateLimiter(
+        reddit,
+        window_seconds=config.get("rate_limit_window", 600),
+        reserve=config.get("rate_limit_reserve", 10),
+        pacing_threshold=config.get("rate_limit_pacing", 100),
+        fallback=TokenBucketRateLimiter(
+            requests_per_minute=config.get("requests_per_minute", 100),
+            burst=config.get("burst", 30)
+        )
+    )
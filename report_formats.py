@@ -0,0 +1,173 @@
+"""
+报告数据输出 - Markdown之外的机器可读格式
+
+- JSON数据文件（report_*.json）：各榜单帖子（POST_COLUMNS中的字段）、趋势分析与大模型分析（紧凑JSON），
+  下游直接加载，不必从Markdown表格中解析。不包含 report_data 中的 detailed_posts（评论与正文）
+  与 scored_posts（全部评分帖子），后者只写入Parquet
+- Parquet帖子表（report_*.parquet）：所有入榜与参与质量评分的帖子，每行一个 (榜单, 帖子)，
+  跨日期分析时只需列式扫描
+
+pyarrow 为可选依赖，未安装时跳过Parquet输出并记录警告。所有文件先写入临时路径再原子替换。
+"""
+
+import contextlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 可选依赖
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+# Parquet帖子表的列及类型（帖子缺少的字段为null）
+POST_COLUMNS = (
+    ('list', 'string'),           # hot / week / month / quality / scored
+    ('rank', 'int64'),            # 在该榜单中的名次（从1开始）
+    ('id', 'string'),
+    ('title', 'string'),
+    ('subreddit', 'string'),
+    ('author', 'string'),
+    ('flair', 'string'),
+    ('score', 'int64'),
+    ('num_comments', 'int64'),
+    ('upvote_ratio', 'float64'),
+    ('quality_score', 'float64'),
+    ('created_utc', 'string'),
+    ('source_timeframe', 'string'),
+    ('url', 'string'),
+    ('permalink', 'string'),
+    ('summary', 'string'),
+)
+
+_COERCE = {'string': str, 'int64': int, 'float64': float}
+
+
+@contextlib.contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """
+    原子写入：产出同目录下的临时路径，写入成功后替换为path，失败时删除临时文件
+
+    Args:
+        path: 目标文件路径
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def json_report_data(report_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    取出写入JSON数据文件的部分：榜单帖子只保留Parquet与报告索引用到的字段，
+    不含 detailed_posts（评论与正文）与 scored_posts（全部评分帖子），保持体积接近Markdown报告
+
+    Args:
+        report_data: 报告数据
+
+    Returns:
+        精简后的报告数据
+    """
+    post_fields = [column for column, _ in POST_COLUMNS[2:]]
+
+    def slim(posts):
+        return [{field: post[field] for field in post_fields if field in post} for post in posts if post]
+
+    timeframe_rankings = report_data.get('timeframe_rankings', {})
+    return {
+        'metadata': report_data.get('metadata', {}),
+        'timeframe_rankings': {name: slim(posts) for name, posts in timeframe_rankings.items()},
+        'quality_ranking': slim(report_data.get('quality_ranking', [])),
+        'trend_analysis': report_data.get('trend_analysis', {}),
+        'llm_analysis': report_data.get('llm_analysis', ''),
+    }
+
+
+def write_json(report_data: Dict[str, Any], path: Path) -> Path:
+    """
+    把精简后的 report_data（见 json_report_data）写为紧凑JSON
+
+    Args:
+        report_data: 报告数据
+        path: 输出路径
+
+    Returns:
+        输出路径
+    """
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(json_report_data(report_data), f, ensure_ascii=False, separators=(',', ':'), default=str)
+    return Path(path)
+
+
+def iter_post_rows(report_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    按榜单展开帖子：hot/week/month 排行、quality 高质量TOP、scored 全部评分帖子（按质量评分排名）
+
+    Yields:
+        每个 (榜单, 帖子) 一行，字段见 POST_COLUMNS
+    """
+    timeframe_rankings = report_data.get('timeframe_rankings', {})
+    lists = [(name, timeframe_rankings.get(name, [])) for name in ('hot', 'week', 'month')]
+    lists.append(('quality', report_data.get('quality_ranking', [])))
+    # score_posts 返回的评分结果已按质量评分排序
+    lists.append(('scored', [post for post in report_data.get('scored_posts', []) if post]))
+
+    for name, posts in lists:
+        rank = 0
+        for post in posts:
+            if post is None:
+                continue
+            rank += 1
+            row = {'list': name, 'rank': rank}
+            for column, _ in POST_COLUMNS[2:]:
+                row[column] = post.get(column)
+            yield row
+
+
+def post_columns(report_data: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """把帖子行转为按列存储，值按 POST_COLUMNS 的类型转换，无法转换时为None"""
+    columns: Dict[str, List[Any]] = {column: [] for column, _ in POST_COLUMNS}
+    for row in iter_post_rows(report_data):
+        for column, kind in POST_COLUMNS:
+            value = row[column]
+            if value is not None:
+                try:
+                    value = _COERCE[kind](value)
+                except (TypeError, ValueError):
+                    value = None
+            columns[column].append(value)
+    return columns
+
+
+def write_parquet(report_data: Dict[str, Any], path: Path) -> bool:
+    """
+    把帖子表写为Parquet
+
+    Args:
+        report_data: 报告数据
+        path: 输出路径
+
+    Returns:
+        是否写入（未安装pyarrow时为False）
+    """
+    if pa is None:
+        logger.warning("未安装pyarrow，跳过Parquet帖子表输出（pip install pyarrow 后启用）")
+        return False
+
+    columns = post_columns(report_data)
+    schema = pa.schema([(column, getattr(pa, kind)()) for column, kind in POST_COLUMNS])
+    table = pa.table({column: pa.array(columns[column], type=schema.field(column).type)
+                      for column, _ in POST_COLUMNS}, schema=schema)
+    with atomic_path(path) as tmp_path:
+        pq.write_table(table, tmp_path)
+    return True
@@ -0,0 +1,509 @@
+"""
+历史报告索引 - 在本地SQLite中索引 reports/ 下的全部历史报告
+
+每份报告索引以下内容（按报告增量更新，Markdown与JSON数据文件大小未变化时跳过）：
+- rankings：各榜单（hot/week/month/quality）的名次、帖子、分数与摘要
+- keywords：趋势关键词的出现频率与趋势级别
+- subreddits：社区表现统计
+- posts_fts：帖子标题与摘要的FTS5全文索引
+
+有JSON数据文件（report_*.json）的报告直接读取数据文件，更早的报告从Markdown表格中解析回填。
+"某个帖子/关键词最早什么时候上榜"之类的问题由索引查询回答，不再逐个读取报告文件。
+
+用法：
+    python report_index.py update                # 增量索引 reports/
+    python report_index.py rebuild               # 清空后重建
+    python report_index.py search "qwen agent"   # 全文搜索帖子
+    python report_index.py keyword llm           # 关键词历史
+    python report_index.py post 1vkmhyl          # 帖子上榜历史
+    python report_index.py subreddit LocalLLaMA  # 社区历史
+"""
+
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import REPORT_CONFIG
+from report_formats import iter_post_rows
+
+logger = logging.getLogger(__name__)
+
+# 索引表结构版本（PRAGMA user_version），不一致时清空重建
+SCHEMA_VERSION = 2
+
+# 报告文件名中的时间戳：report_YYYYMMDD_HHMMSS.md
+_REPORT_NAME = re.compile(r"^report_(\d{8}_\d{6})\.md$")
+
+# Markdown报告中各段的标题（与 ReportGenerator._write_markdown_report 一致）
+_SECTION_HEADINGS = {
+    "## 🔥 当天热门帖子排行榜 (实时热度)": 'hot',
+    "## 📈 本周热门帖子排行榜 (按分数排序)": 'week',
+    "## 🗓️ 本月热门帖子排行榜 (按分数排序)": 'month',
+    "## ⭐ 高质量帖子深度分析": 'quality',
+    "## 🔍 趋势关键词": 'keywords',
+    "# 🤖 AI智能深度分析": 'analysis',
+    "## 📌 附录": 'appendix',
+}
+
+_POST_ROW = re.compile(
+    r"^\| (?P<rank>\d+) \| \[(?P<title>(?:\\.|[^\]\\])*)\]\((?P<url>[^)\s]*)\) \| "
+    r"r/(?P<subreddit>[^|\s]+) \| (?P<numbers>.+) \|$"
+)
+_SUMMARY_ROW = re.compile(r"^\| \| (?P<text>.*?) \|(?: \|)+$")
+_KEYWORD_ROW = re.compile(r"^\| (?P<keyword>[^|]+?) \| (?P<frequency>\d+) \| (?P<label>[^|]+?) \|$")
+_SUBREDDIT_LINE = re.compile(r"^- \*\*r/(?P<subreddit>.+?)\*\*: (?P<posts>\d+)个帖子, 平均分数 (?P<avg>[-\d.]+)$")
+_POST_ID = re.compile(r"/comments/([0-9a-z]+)")
+_ESCAPED = re.compile(r"\\(.)")
+
+# 趋势级别：Markdown中的标签 -> 索引中的取值
+_TREND_LEVELS = {"🔥 热门": 'hot', "📈 上升": 'rising', "➡️ 一般": 'normal'}
+
+_SUMMARY_ERROR_PREFIX = "⚠️ 摘要生成错误"
+
+
+def _unescape(text: str) -> str:
+    return _ESCAPED.sub(r"\1", text)
+
+
+def _report_time(path: Path) -> Optional[str]:
+    """从报告文件名解析生成时间（ISO格式）"""
+    match = _REPORT_NAME.match(path.name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").isoformat()
+
+
+def parse_markdown_report(text: str) -> Dict[str, Any]:
+    """
+    从Markdown报告中解析出榜单、关键词与社区统计
+
+    Args:
+        text: 报告全文
+
+    Returns:
+        {"rankings": [行], "keywords": [(关键词, 频率, 级别)], "subreddits": [(社区, 帖子数, 平均分数)]}，
+        榜单行的字段与 report_formats.iter_post_rows 相同（Markdown中没有的字段为None，标题可能被截断）
+    """
+    rankings: List[Dict[str, Any]] = []
+    keywords: List[Tuple[str, int, str]] = []
+    subreddits: List[Tuple[str, int, float]] = []
+
+    section = None
+    last_row = None
+    for line in text.splitlines():
+        if line in _SECTION_HEADINGS:
+            section = _SECTION_HEADINGS[line]
+            last_row = None
+            continue
+        if section in ('hot', 'week', 'month', 'quality'):
+            match = _POST_ROW.match(line)
+            if match:
+                last_row = _markdown_post_row(section, match)
+                if last_row:
+                    rankings.append(last_row)
+                continue
+            match = _SUMMARY_ROW.match(line)
+            if match and last_row is not None:
+                summary = _unescape(match.group('text'))
+                if not summary.startswith(_SUMMARY_ERROR_PREFIX):
+                    last_row['summary'] = summary
+        elif section == 'keywords':
+            match = _KEYWORD_ROW.match(line)
+            if match:
+                label = match.group('label')
+                keywords.append((match.group('keyword'), int(match.group('frequency')),
+                                 _TREND_LEVELS.get(label, label)))
+        elif section == 'appendix':
+            match = _SUBREDDIT_LINE.match(line)
+            if match:
+                subreddits.append((match.group('subreddit'), int(match.group('posts')),
+                                   float(match.group('avg'))))
+
+    return {'rankings': rankings, 'keywords': keywords, 'subreddits': subreddits}
+
+
+def _markdown_post_row(section: str, match: 're.Match') -> Optional[Dict[str, Any]]:
+    """把榜单表格的一行转换为帖子行"""
+    numbers = [value.strip() for value in match.group('numbers').split('|')]
+    try:
+        if section == 'quality':
+            quality_score, score, num_comments = float(numbers[0]), int(numbers[1]), int(numbers[2])
+        else:
+            quality_score, score, num_comments = None, int(numbers[0]), int(numbers[1])
+    except (IndexError, ValueError):
+        return None
+
+    url = match.group('url')
+    post_id = _POST_ID.search(url)
+    return {
+        'list': section,
+        'rank': int(match.group('rank')),
+        'id': post_id.group(1) if post_id else None,
+        'title': _unescape(match.group('title')),
+        'subreddit': match.group('subreddit').strip(),
+        'score': score,
+        'num_comments': num_comments,
+        'quality_score': quality_score,
+        'permalink': url,
+        'summary': None,
+    }
+
+
+def parse_report_data(report_data: Dict[str, Any]) -> Dict[str, Any]:
+    """从JSON数据文件（report_data）中取出榜单、关键词与社区统计，结构与 parse_markdown_report 相同"""
+    trend_analysis = report_data.get('trend_analysis', {})
+    keyword_trends = trend_analysis.get('keyword_trends', {})
+    trending = keyword_trends.get('trending_keywords', [])
+
+    keywords = []
+    for keyword, frequency in keyword_trends.get('keyword_frequency', {}).items():
+        level = 'hot' if keyword in trending[:5] else 'rising' if keyword in trending else 'normal'
+        keywords.append((keyword, frequency, level))
+
+    subreddit_perf = trend_analysis.get('subreddit_trends', {}).get('subreddit_performance', {})
+    subreddits = [(name, stats.get('posts', 0), stats.get('avg_score', 0))
+                  for name, stats in subreddit_perf.items()]
+
+    return {'rankings': list(iter_post_rows(report_data)), 'keywords': keywords, 'subreddits': subreddits}
+
+
+class ReportIndex:
+    """历史报告索引（SQLite + FTS5，线程安全）"""
+
+    def __init__(self, path: str = None):
+        """
+        打开（或创建）索引
+
+        Args:
+            path: SQLite数据库文件路径，默认为 REPORT_CONFIG["index_path"]
+        """
+        self.path = Path(path or REPORT_CONFIG.get("index_path", ".cache/report_index.sqlite3"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # 索引可以随时从 reports/ 重建，结构变化时直接清空
+            self._conn.executescript("""
+                DROP TABLE IF EXISTS reports;
+                DROP TABLE IF EXISTS rankings;
+                DROP TABLE IF EXISTS keywords;
+                DROP TABLE IF EXISTS subreddits;
+                DROP TABLE IF EXISTS posts_fts;
+            """)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reports (
+                report_id TEXT PRIMARY KEY,
+                generated_at TEXT,
+                path TEXT,
+                source TEXT,
+                size INTEGER,
+                json_size INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS rankings (
+                report_id TEXT,
+                list TEXT,
+                rank INTEGER,
+                post_id TEXT,
+                title TEXT,
+                subreddit TEXT,
+                author TEXT,
+                score INTEGER,
+                num_comments INTEGER,
+                quality_score REAL,
+                permalink TEXT,
+                summary TEXT,
+                PRIMARY KEY (report_id, list, rank)
+            );
+            CREATE INDEX IF NOT EXISTS rankings_post ON rankings (post_id);
+            CREATE INDEX IF NOT EXISTS rankings_subreddit ON rankings (subreddit);
+            CREATE TABLE IF NOT EXISTS keywords (
+                report_id TEXT,
+                keyword TEXT,
+                frequency INTEGER,
+                level TEXT,
+                PRIMARY KEY (report_id, keyword)
+            );
+            CREATE INDEX IF NOT EXISTS keywords_keyword ON keywords (keyword);
+            CREATE TABLE IF NOT EXISTS subreddits (
+                report_id TEXT,
+                subreddit TEXT,
+                posts INTEGER,
+                avg_score REAL,
+                PRIMARY KEY (report_id, subreddit)
+            );
+            CREATE INDEX IF NOT EXISTS subreddits_subreddit ON subreddits (subreddit);
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                title, summary, report_id UNINDEXED, list UNINDEXED, post_id UNINDEXED
+            );
+        """)
+        logger.info(f"报告索引已打开: {self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def update(self, reports_dir: str = "reports") -> Dict[str, int]:
+        """
+        增量更新：索引新增或变化的报告，删除已不存在的报告
+
+        Args:
+            reports_dir: 报告根目录（YYYY/MM/DD/report_*.md）
+
+        Returns:
+            {"indexed": 新索引的报告数, "unchanged": 未变化的报告数, "removed": 删除的报告数}
+        """
+        stats = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+        with self._lock:
+            known = {row[0]: (row[1], row[2]) for row in
+                     self._conn.execute("SELECT report_id, size, json_size FROM reports")}
+
+        seen = set()
+        for md_path in sorted(Path(reports_dir).glob("*/*/*/report_*.md")):
+            report_id = md_path.stem
+            if _report_time(md_path) is None:
+                continue
+            seen.add(report_id)
+            if known.get(report_id) == self._signature(md_path):
+                stats['unchanged'] += 1
+                continue
+            try:
+                self.index_report(md_path)
+                stats['indexed'] += 1
+            except (OSError, ValueError) as exc:
+                logger.warning(f"索引报告失败 {md_path}: {exc}")
+
+        for report_id in set(known) - seen:
+            self._delete(report_id)
+            stats['removed'] += 1
+
+        logger.info(f"报告索引更新完成: 新索引 {stats['indexed']} 份, 未变化 {stats['unchanged']} 份, "
+                    f"删除 {stats['removed']} 份")
+        return stats
+
+    def rebuild(self, reports_dir: str = "reports") -> Dict[str, int]:
+        """清空索引后重新索引全部报告"""
+        with self._lock:
+            for table in ('reports', 'rankings', 'keywords', 'subreddits', 'posts_fts'):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+        return self.update(reports_dir)
+
+    def index_report(self, md_path: Path) -> str:
+        """
+        索引一份报告（已索引过时替换），有同名JSON数据文件时读取数据文件，否则解析Markdown
+
+        Args:
+            md_path: Markdown报告路径
+
+        Returns:
+            report_id（报告文件名，不含扩展名）
+        """
+        md_path = Path(md_path)
+        json_path = md_path.with_suffix('.json')
+        if json_path.exists():
+            with open(json_path, encoding='utf-8') as f:
+                parsed = parse_report_data(json.load(f))
+            source = 'json'
+        else:
+            parsed = parse_markdown_report(md_path.read_text(encoding='utf-8'))
+            source = 'markdown'
+
+        report_id = md_path.stem
+        size, json_size = self._signature(md_path)
+        rankings = parsed['rankings']
+
+        with self._lock:
+            conn = self._conn
+            with conn:
+                self._delete_rows(report_id)
+                conn.execute(
+                    "INSERT INTO reports (report_id, generated_at, path, source, size, json_size) VALUES (?, ?, ?, ?, ?, ?)",
+                    (report_id, _report_time(md_path), str(md_path), source, size, json_size)
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rankings (report_id, list, rank, post_id, title, subreddit, author, "
+                    "score, num_comments, quality_score, permalink, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(report_id, row['list'], row['rank'], row.get('id'), row.get('title'), row.get('subreddit'),
+                      row.get('author'), row.get('score'), row.get('num_comments'), row.get('quality_score'),
+                      row.get('permalink'), row.get('summary')) for row in rankings]
+                )
+                conn.executemany(
+                    "INSERT INTO posts_fts (title, summary, report_id, list, post_id) VALUES (?, ?, ?, ?, ?)",
+                    [(row.get('title') or '', row.get('summary') or '', report_id, row['list'], row.get('id'))
+                     for row in rankings]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO keywords (report_id, keyword, frequency, level) VALUES (?, ?, ?, ?)",
+                    [(report_id, *keyword) for keyword in parsed['keywords']]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO subreddits (report_id, subreddit, posts, avg_score) VALUES (?, ?, ?, ?)",
+                    [(report_id, *subreddit) for subreddit in parsed['subreddits']]
+                )
+        return report_id
+
+    # ---------- 查询 ----------
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        全文搜索帖子标题与摘要，同一帖子只返回最近的一次
+
+        每个空白分隔的词按FTS5短语匹配（"gpt-4" 之类带符号的词不会被当作查询语法），
+        所有词都需出现。
+
+        Returns:
+            [{"post_id", "title", "report_id", "generated_at", "list"}]，按相关度排序
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        rows = self._query(
+            """
+            SELECT f.post_id, f.title, f.report_id, r.generated_at, f.list
+            FROM posts_fts f JOIN reports r ON r.report_id = f.report_id
+            WHERE posts_fts MATCH ?
+            ORDER BY bm25(posts_fts), r.generated_at DESC
+            """,
+            (match,)
+        )
+        results, seen = [], set()
+        for post_id, title, report_id, generated_at, list_name in rows:
+            key = post_id or title
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append({'post_id': post_id, 'title': title, 'report_id': report_id,
+                            'generated_at': generated_at, 'list': list_name})
+            if len(results) >= limit:
+                break
+        return results
+
+    def post_history(self, post_id: str) -> List[Dict[str, Any]]:
+        """帖子在各报告中的上榜记录（按时间顺序，第一条即最早上榜）"""
+        rows = self._query(
+            """
+            SELECT r.generated_at, k.report_id, k.list, k.rank, k.score, k.num_comments, k.quality_score, k.title
+            FROM rankings k JOIN reports r ON r.report_id = k.report_id
+            WHERE k.post_id = ? AND k.list != 'scored'
+            ORDER BY r.generated_at, k.list
+            """,
+            (post_id,)
+        )
+        columns = ('generated_at', 'report_id', 'list', 'rank', 'score', 'num_comments', 'quality_score', 'title')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def keyword_history(self, keyword: str) -> List[Dict[str, Any]]:
+        """关键词在各报告中的出现频率与趋势级别（按时间顺序）"""
+        rows = self._query(
+            """
+            SELECT r.generated_at, k.report_id, k.frequency, k.level
+            FROM keywords k JOIN reports r ON r.report_id = k.report_id
+            WHERE k.keyword = ?
+            ORDER BY r.generated_at
+            """,
+            (keyword.lower(),)
+        )
+        return [dict(zip(('generated_at', 'report_id', 'frequency', 'level'), row)) for row in rows]
+
+    def first_trending(self, keyword: str) -> Optional[str]:
+        """关键词第一次成为趋势关键词（热门或上升）的报告时间"""
+        rows = self._query(
+            """
+            SELECT MIN(r.generated_at)
+            FROM keywords k JOIN reports r ON r.report_id = k.report_id
+            WHERE k.keyword = ? AND k.level IN ('hot', 'rising')
+            """,
+            (keyword.lower(),)
+        )
+        return rows[0][0] if rows else None
+
+    def subreddit_history(self, subreddit: str) -> List[Dict[str, Any]]:
+        """社区在各报告中的帖子数与平均分数（按时间顺序）"""
+        rows = self._query(
+            """
+            SELECT r.generated_at, s.report_id, s.posts, s.avg_score
+            FROM subreddits s JOIN reports r ON r.report_id = s.report_id
+            WHERE s.subreddit = ?
+            ORDER BY r.generated_at
+            """,
+            (subreddit,)
+        )
+        return [dict(zip(('generated_at', 'report_id', 'posts', 'avg_score'), row)) for row in rows]
+
+    # ---------- 内部方法 ----------
+
+    @staticmethod
+    def _signature(md_path: Path) -> Tuple[int, int]:
+        """
+        报告的变化标识：(Markdown大小, JSON数据文件大小，没有时为0)
+
+        报告按生成时间命名、生成后不再修改，不使用mtime（检出仓库时mtime会被重置）；
+        之后才补上的JSON数据文件会改变标识，使报告按数据文件重新索引。
+        """
+        json_path = md_path.with_suffix('.json')
+        return md_path.stat().st_size, json_path.stat().st_size if json_path.exists() else 0
+
+    def _delete_rows(self, report_id: str) -> None:
+        for table in ('reports', 'rankings', 'keywords', 'subreddits', 'posts_fts'):
+            self._conn.execute(f"DELETE FROM {table} WHERE report_id = ?", (report_id,))
+
+    def _delete(self, report_id: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._delete_rows(report_id)
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+def _print_rows(rows: Iterator[Dict[str, Any]]) -> None:
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史报告索引")
+    parser.add_argument("--index", help="索引数据库路径（默认 REPORT_INDEX_PATH）")
+    parser.add_argument("--reports-dir", default=REPORT_CONFIG.get("output_dir", "reports"), help="报告根目录")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("update", help="增量索引新增或变化的报告")
+    subparsers.add_parser("rebuild", help="清空后重建索引")
+    search_parser = subparsers.add_parser("search", help="全文搜索帖子标题与摘要")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=20)
+    subparsers.add_parser("keyword", help="关键词历史").add_argument("keyword")
+    subparsers.add_parser("post", help="帖子上榜历史").add_argument("post_id")
+    subparsers.add_parser("subreddit", help="社区历史").add_argument("subreddit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    index = ReportIndex(args.index)
+    try:
+        if args.command == "update":
+            print(index.update(args.reports_dir))
+        elif args.command == "rebuild":
+            print(index.rebuild(args.reports_dir))
+        elif args.command == "search":
+            _print_rows(index.search(args.query, limit=args.limit))
+        elif args.command == "keyword":
+            print(f"首次成为趋势关键词: {index.first_trending(args.keyword) or '无'}")
+            _print_rows(index.keyword_history(args.keyword))
+        elif args.command == "post":
+            _print_rows(index.post_history(args.post_id))
+        elif args.command == "subreddit":
+            _print_rows(index.subreddit_history(args.subreddit))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,36 @@
 """报告生成模块 - 负责调用大模型分析和生成最终报告"""
 
-import json
+import io
 import logging
+import os
+import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
-from openai import OpenAI
+from openai import BadRequestError
 
-from config import LLM_CONFIG, LLM_ANALYSIS_CONFIG
+from config import LLM_CONFIG, LLM_ANALYSIS_CONFIG, REPORT_CONFIG
+from llm_client import get_llm_client
+from profiler import record_llm_usage, timed
+from prompt_builder import PromptBuilder
+from report_formats import atomic_path, write_json, write_parquet
 
 
 logger = logging.getLogger(__name__)
 
+# 写报告文件的缓冲区大小
+REPORT_WRITE_BUFFER = 1 << 16
+
 
 class ReportGenerator:
     """报告生成器"""
 
     def __init__(self) -> None:
-        self.llm_client = OpenAI(
-            api_key=LLM_CONFIG.get("api_key"),
-            base_url=LLM_CONFIG.get("base_url"),
-        )
+        self.llm_client = get_llm_client(LLM_CONFIG.get("api_key"), LLM_CONFIG.get("base_url"))
         logger.info("报告生成器初始化完成")
 
+    @timed("reporter.generate_report")
     def generate_report(
         self,
         report_data: Dict[str, Any],
@@ -41,19 +48,44 @@ class ReportGenerator:
         timestamp = now.strftime("%Y%m%d_%H%M%S")
         md_path = date_dir / f"report_{timestamp}.md"
 
-        markdown_content = self._create_markdown_report(report_data)
-        md_path.write_text(markdown_content, encoding="utf-8")
+        # 各段直接写入缓冲文件，写完后原子替换到目标路径
+        with atomic_path(md_path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8", buffering=REPORT_WRITE_BUFFER) as f:
+                self._write_markdown_report(report_data, f.write)
 
         latest_path = base_dir / "latest_report.md"
-        latest_path.write_text(markdown_content, encoding="utf-8")
+        self._link_latest(md_path, latest_path)
 
         logger.info("报告已生成: %s", md_path)
 
-        return {
+        report_files = {
             "markdown": str(md_path),
             "latest": str(latest_path),
         }
 
+        # 机器可读的数据文件，与Markdown报告同名
+        data_formats = {fmt.strip() for fmt in REPORT_CONFIG.get("data_formats", "").split(",")}
+        if "json" in data_formats:
+            report_files["json"] = str(write_json(report_data, md_path.with_suffix(".json")))
+        if "parquet" in data_formats and write_parquet(report_data, md_path.with_suffix(".parquet")):
+            report_files["parquet"] = str(md_path.with_suffix(".parquet"))
+
+        return report_files
+
+    @staticmethod
+    def _link_latest(md_path: Path, latest_path: Path) -> None:
+        """
+        让 latest_report.md 指向最新报告：先在临时路径创建硬链接再原子重命名，
+        文件系统不支持硬链接时退回为复制
+        """
+        with atomic_path(latest_path) as tmp_path:
+            tmp_path.unlink(missing_ok=True)
+            try:
+                os.link(md_path, tmp_path)
+            except OSError:
+                shutil.copyfile(md_path, tmp_path)
+
+    @timed("reporter.analyze_with_llm")
     def analyze_with_llm(
         self,
         hot_ranking: List[Dict],
@@ -110,13 +142,10 @@ class ReportGenerator:
         api_key = LLM_ANALYSIS_CONFIG.get("api_key") or LLM_CONFIG.get("api_key")
         
         try:
-            # 为步骤8创建专用的客户端
-            analysis_client = OpenAI(
-                api_key=api_key,
-                base_url=LLM_ANALYSIS_CONFIG.get("base_url"),
-            )
+            # 步骤8专用的客户端（共享连接池，与摘要使用同一端点时复用连接）
+            analysis_client = get_llm_client(api_key, LLM_ANALYSIS_CONFIG.get("base_url"))
             
-            response = analysis_client.chat.completions.create(
+            request = dict(
                 model=LLM_ANALYSIS_CONFIG.get("model"),
                 messages=[
                     {
@@ -130,11 +159,30 @@ class ReportGenerator:
                 max_tokens=LLM_ANALYSIS_CONFIG.get("max_tokens", 10000),
             )
             
+            if LLM_ANALYSIS_CONFIG.get("stream_usage", True):
+                try:
+                    response = analysis_client.chat.completions.create(
+                        **request, stream_options={"include_usage": True}
+                    )
+                except BadRequestError as exc:
+                    # 部分OpenAI兼容端点不接受 stream_options，去掉后重试（不统计token用量）
+                    logger.warning("分析端点拒绝 stream_options，不统计用量重试: %s", exc)
+                    response = analysis_client.chat.completions.create(**request)
+            else:
+                response = analysis_client.chat.completions.create(**request)
+            
             content = ""
+            usage = None
             for chunk in response:
+                # 开启 include_usage 后最后一个分块只携带用量，没有choices
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
                 delta = chunk.choices[0].delta.content
                 if delta:
                     content += delta
+            record_llm_usage(usage)
             
             logger.info("大模型分析完成")
             return content
@@ -143,6 +191,7 @@ class ReportGenerator:
             logger.error("大模型分析失败: %s", exc)
             return f"分析失败: {exc}"
     
+    @timed("reporter.build_llm_prompt")
     def _build_llm_prompt(self, hot_ranking: List[Dict],
                          trend_analysis: Dict[str, Any],
                          detailed_posts: List[Dict]) -> str:
@@ -192,8 +241,30 @@ class ReportGenerator:
 - 评论数: {len(post.get('comments', []))}
 """)
         
-        prompt = f"""
-当前日期: {datetime.now().strftime("%Y-%m-%d")}
+        # 按优先级把各段内容装入token预算：排行榜与高质量帖子优先，其次是趋势统计
+        builder = PromptBuilder(LLM_ANALYSIS_CONFIG.get("prompt_token_budget", 12000))
+        builder.add_items('hot_summary', hot_summary, priority=1)
+        builder.add_items('detailed_summary', detailed_summary, priority=2)
+        builder.add_json('keyword_trends', trend_analysis.get('keyword_trends', {}), priority=3)
+        builder.add_json('subreddit_trends', trend_analysis.get('subreddit_trends', {}), priority=4)
+        builder.add_json('engagement_trends', trend_analysis.get('engagement_trends', {}), priority=5)
+        builder.add_json('author_trends', trend_analysis.get('author_trends', {}), priority=6)
+        builder.add_json('velocity_trends', trend_analysis.get('velocity_trends', {}), priority=7)
+        
+        template = self._llm_prompt_template()
+        builder.add_fixed(template)
+        sections = builder.build()
+        
+        return template.format(
+            current_date=datetime.now().strftime("%Y-%m-%d"),
+            **sections
+        )
+    
+    @staticmethod
+    def _llm_prompt_template() -> str:
+        """综合分析提示词模板，各数据段以占位符表示"""
+        return """
+当前日期: {current_date}
 
 # Reddit AI社区趋势分析任务
 
@@ -202,23 +273,26 @@ class ReportGenerator:
 ## 数据概览
 
 ### 热门帖子TOP10
-{chr(10).join(hot_summary)}
+{hot_summary}
 
 ### 趋势关键词
-{json.dumps(trend_analysis.get('keyword_trends', {}), ensure_ascii=False, indent=2)}
+{keyword_trends}
 
 ### 社区表现
-{json.dumps(trend_analysis.get('subreddit_trends', {}), ensure_ascii=False, indent=2)}
+{subreddit_trends}
 
 ### 活跃作者
-{json.dumps(trend_analysis.get('author_trends', {}), ensure_ascii=False, indent=2)}
+{author_trends}
 
 ### 互动趋势
-{json.dumps(trend_analysis.get('engagement_trends', {}), ensure_ascii=False, indent=2)}
+{engagement_trends}
+
+### 跨日趋势（与此前各次运行相比的增速、加速度与z-score异常上升）
+{velocity_trends}
 
 ## 高质量帖子详细内容
 
-{chr(10).join(detailed_summary)}
+{detailed_summary}
 
 ---
 
@@ -256,11 +330,23 @@ class ReportGenerator:
 
 请使用清晰的Markdown格式，用具体的数据和实例支持你的分析。确保分析深入、数据驱动，并提供可操作的洞察。
 """
-        
-        return prompt
     
     def _create_markdown_report(self, report_data: Dict[str, Any]) -> str:
-        """创建Markdown报告"""
+        """创建Markdown报告（返回完整字符串，写文件时使用 _write_markdown_report）"""
+        buffer = io.StringIO()
+        self._write_markdown_report(report_data, buffer.write)
+        return buffer.getvalue()
+    
+    @timed("reporter.create_markdown_report")
+    def _write_markdown_report(self, report_data: Dict[str, Any],
+                               write: Callable[[str], Any]) -> None:
+        """
+        按顺序把Markdown报告的各段交给write输出，不在内存中拼接整份报告
+        
+        Args:
+            report_data: 报告数据
+            write: 接收文本片段的函数（如文件对象的write）
+        """
     
         metadata = report_data.get('metadata', {})
         timeframe_rankings = report_data.get('timeframe_rankings', {})
@@ -275,7 +361,7 @@ class ReportGenerator:
         }
         quality_ranking = [post for post in quality_ranking if post is not None]
     
-        report = f"""# Reddit AI社区深度分析报告
+        write(f"""# Reddit AI社区深度分析报告
 
     **生成时间**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}  
     **数据收集时间**: {metadata.get('start_time', 'N/A')}  
@@ -298,77 +384,27 @@ class ReportGenerator:
 
 | 排名 | 标题 | 社区 | 分数 | 评论数 |
 |------|------|------|------|--------|
-"""
+""")
     
         # 添加当天热门排行
-        for i, post in enumerate(timeframe_rankings.get('hot', [])[:20], 1):
-            post_url = post.get('permalink', f"https://reddit.com/comments/{post['id']}")
-            title = self._escape_markdown(post['title'][:60])
-            if len(post['title']) > 60:
-                title += "..."
-        
-            report += f"| {i} | [{title}]({post_url}) | "
-            report += f"r/{post['subreddit']} | {post['score']} | "
-            report += f"{post['num_comments']} |\n"
-            # 添加摘要或错误信息
-            if post.get('summary_error'):
-                error_msg = f"⚠️ 摘要生成错误：{post.get('summary_error')}"
-                error_escaped = self._escape_markdown(error_msg)
-                report += f"| | {error_escaped} | | | |\n"
-            elif post.get('summary'):
-                summary_escaped = self._escape_markdown(post['summary'])
-                report += f"| | {summary_escaped} | | | |\n"
+        self._write_ranking_rows(write, timeframe_rankings.get('hot', [])[:20])
     
-        report += "\n---\n\n## 📈 本周热门帖子排行榜 (按分数排序)\n\n"
-        report += "| 排名 | 标题 | 社区 | 分数 | 评论数 |\n"
-        report += "|------|------|------|------|--------|\n"
+        write("\n---\n\n## 📈 本周热门帖子排行榜 (按分数排序)\n\n")
+        write("| 排名 | 标题 | 社区 | 分数 | 评论数 |\n")
+        write("|------|------|------|------|--------|\n")
     
-        for i, post in enumerate(timeframe_rankings.get('week', [])[:20], 1):
-            post_url = post.get('permalink', f"https://reddit.com/comments/{post['id']}")
-            title = self._escape_markdown(post['title'][:60])
-            if len(post['title']) > 60:
-                title += "..."
-        
-            report += f"| {i} | [{title}]({post_url}) | "
-            report += f"r/{post['subreddit']} | {post['score']} | "
-            report += f"{post['num_comments']} |\n"
-            # 添加摘要或错误信息
-            if post.get('summary_error'):
-                error_msg = f"⚠️ 摘要生成错误：{post.get('summary_error')}"
-                error_escaped = self._escape_markdown(error_msg)
-                report += f"| | {error_escaped} | | | |\n"
-            elif post.get('summary'):
-                summary_escaped = self._escape_markdown(post['summary'])
-                report += f"| | {summary_escaped} | | | |\n"
+        self._write_ranking_rows(write, timeframe_rankings.get('week', [])[:20])
     
-        report += "\n---\n\n## 🗓️ 本月热门帖子排行榜 (按分数排序)\n\n"
-        report += "| 排名 | 标题 | 社区 | 分数 | 评论数 |\n"
-        report += "|------|------|------|------|--------|\n"
+        write("\n---\n\n## 🗓️ 本月热门帖子排行榜 (按分数排序)\n\n")
+        write("| 排名 | 标题 | 社区 | 分数 | 评论数 |\n")
+        write("|------|------|------|------|--------|\n")
     
-        for i, post in enumerate(timeframe_rankings.get('month', [])[:20], 1):
-            post_url = post.get('permalink', f"https://reddit.com/comments/{post['id']}")
-            title = self._escape_markdown(post['title'][:60])
-            if len(post['title']) > 60:
-                title += "..."
-        
-            report += f"| {i} | [{title}]({post_url}) | "
-            report += f"r/{post['subreddit']} | {post['score']} | "
-            report += f"{post['num_comments']} |\n"
-            # 添加摘要或错误信息
-            if post.get('summary_error'):
-                error_msg = f"⚠️ 摘要生成错误：{post.get('summary_error')}"
-                error_escaped = self._escape_markdown(error_msg)
-                report += f"| | {error_escaped} | | | |\n"
-            elif post.get('summary'):
-                summary_escaped = self._escape_markdown(post['summary'])
-                report += f"| | {summary_escaped} | | | |\n"
-
-        # ... 其余报告内容保持不变
+        self._write_ranking_rows(write, timeframe_rankings.get('month', [])[:20])
         
         # 添加高质量排行
-        report += "\n---\n\n## ⭐ 高质量帖子深度分析\n\n"
-        report += "| 排名 | 标题 | 社区 | 质量评分 | 分数 | 评论数 |\n"
-        report += "|------|------|------|----------|------|--------|\n"
+        write("\n---\n\n## ⭐ 高质量帖子深度分析\n\n")
+        write("| 排名 | 标题 | 社区 | 质量评分 | 分数 | 评论数 |\n")
+        write("|------|------|------|----------|------|--------|\n")
         
         for i, post in enumerate(quality_ranking, 1):
             post_url = post.get('permalink', f"https://reddit.com/comments/{post['id']}")
@@ -376,45 +412,62 @@ class ReportGenerator:
             if len(post['title']) > 50:
                 title += "..."
             
-            report += f"| {i} | [{title}]({post_url}) | "
-            report += f"r/{post['subreddit']} | {post.get('quality_score', 0):.2f} | "
-            report += f"{post['score']} | {post['num_comments']} |\n"
+            write(f"| {i} | [{title}]({post_url}) | "
+                  f"r/{post['subreddit']} | {post.get('quality_score', 0):.2f} | "
+                  f"{post['score']} | {post['num_comments']} |\n")
             # 添加摘要或错误信息
-            if post.get('summary_error'):
-                error_msg = f"⚠️ 摘要生成错误：{post.get('summary_error')}"
-                error_escaped = self._escape_markdown(error_msg)
-                report += f"| | {error_escaped} | | | | |\n"
-            elif post.get('summary'):
-                summary_escaped = self._escape_markdown(post['summary'])
-                report += f"| | {summary_escaped} | | | | |\n"
+            self._write_summary_row(write, post, columns=6)
         
         # 添加趋势关键词
         keyword_freq = trend_analysis.get('keyword_trends', {}).get('keyword_frequency', {})
         trending_kw = trend_analysis.get('keyword_trends', {}).get('trending_keywords', [])
         
-        report += "\n---\n\n## 🔍 趋势关键词\n\n"
-        report += "| 关键词 | 出现频率 | 趋势级别 |\n"
-        report += "|--------|----------|----------|\n"
+        write("\n---\n\n## 🔍 趋势关键词\n\n")
+        write("| 关键词 | 出现频率 | 趋势级别 |\n")
+        write("|--------|----------|----------|\n")
         
         for keyword, freq in list(keyword_freq.items())[:15]:
             trend_label = "🔥 热门" if keyword in trending_kw[:5] else "📈 上升" if keyword in trending_kw else "➡️ 一般"
-            report += f"| {keyword} | {freq} | {trend_label} |\n"
+            write(f"| {keyword} | {freq} | {trend_label} |\n")
         
         # 添加大模型分析
-        report += "\n---\n\n# 🤖 AI智能深度分析\n\n"
-        report += llm_analysis
+        write("\n---\n\n# 🤖 AI智能深度分析\n\n")
+        write(llm_analysis)
         
         # 添加附录
-        report += "\n\n---\n\n## 📌 附录\n\n"
-        report += "### 社区表现统计\n\n"
+        write("\n\n---\n\n## 📌 附录\n\n")
+        write("### 社区表现统计\n\n")
         
         subreddit_perf = trend_analysis.get('subreddit_trends', {}).get('subreddit_performance', {})
         for sub, stats in list(subreddit_perf.items())[:10]:
-            report += f"- **r/{sub}**: {stats['posts']}个帖子, 平均分数 {stats['avg_score']:.1f}\n"
+            write(f"- **r/{sub}**: {stats['posts']}个帖子, 平均分数 {stats['avg_score']:.1f}\n")
         
-        report += f"\n\n---\n\n*报告由Reddit智能分析系统生成*  \n*数据来源: Reddit API*"
+        write(f"\n\n---\n\n*报告由Reddit智能分析系统生成*  \n*数据来源: Reddit API*")
+    
+    def _write_ranking_rows(self, write: Callable[[str], Any], posts: List[Dict]) -> None:
+        """输出热门排行榜的表格行（每个帖子一行，有摘要或错误时再加一行）"""
+        for i, post in enumerate(posts, 1):
+            post_url = post.get('permalink', f"https://reddit.com/comments/{post['id']}")
+            title = self._escape_markdown(post['title'][:60])
+            if len(post['title']) > 60:
+                title += "..."
         
-        return report
+            write(f"| {i} | [{title}]({post_url}) | "
+                  f"r/{post['subreddit']} | {post['score']} | "
+                  f"{post['num_comments']} |\n")
+            # 添加摘要或错误信息
+            self._write_summary_row(write, post, columns=5)
+    
+    def _write_summary_row(self, write: Callable[[str], Any], post: Dict, columns: int) -> None:
+        """输出帖子的摘要行（摘要生成失败时输出错误信息），表格共columns列"""
+        if post.get('summary_error'):
+            error_msg = f"⚠️ 摘要生成错误：{post.get('summary_error')}"
+            text = self._escape_markdown(error_msg)
+        elif post.get('summary'):
+            text = self._escape_markdown(post['summary'])
+        else:
+            return
+        write(f"| | {text} |" + " |" * (columns - 2) + "\n")
     
     def _escape_markdown(self, text: str) -> str:
         """转义Markdown特殊字符"""
@@ -5,13 +5,26 @@
 import logging
 from datetime import datetime
 from typing import Dict, List, Any
+import numpy as np
+from keyword_matcher import count_keyword_matches_many
+from post_table import PostTable
+from topk import select_top_k
 
 logger = logging.getLogger(__name__)
 
 class QualityScorer:
     """质量评分器"""
     
-    def __init__(self):
+    # 评分用到的帖子字段（构建列式表时只存储这些列）
+    SCORING_COLUMNS = ('score', 'num_comments', 'upvote_ratio', 'title', 'selftext_preview',
+                       'flair', 'created_utc', 'author', 'subreddit')
+    
+    def __init__(self, snapshot_store=None):
+        """
+        Args:
+            snapshot_store: 帖子快照存储（SnapshotStore），提供时增加动量评分
+        """
+        self.snapshot_store = snapshot_store
         logger.info("质量评分器初始化完成")
     
     def score_posts(self, posts: List[Dict], 
@@ -24,228 +37,231 @@ class QualityScorer:
             trend_analysis: 趋势分析结果
         
         Returns:
-            带评分的帖子列表
+            按质量评分从高到低排序的帖子列表（评分相同时保持输入顺序）
         """
         logger.info(f"开始对 {len(posts)} 个帖子进行质量评分...")
         
-        scored_posts = []
-        
-        for post in posts:
-            # 避免重复计算
-            if 'quality_score' not in post:
-                score = self._calculate_quality_score(post, trend_analysis)
+        # 避免重复计算
+        pending = [post for post in posts if 'quality_score' not in post]
+        if pending:
+            scores = self.calculate_quality_scores(pending, trend_analysis)
+            for post, score in zip(pending, scores.tolist()):
                 post['quality_score'] = round(score, 2)
-            
-            scored_posts.append(post)
         
-        # 按评分排序
-        scored_posts.sort(key=lambda x: x['quality_score'], reverse=True)
+        # 稳定排序，评分相同时保持输入顺序
+        scored_posts = sorted(posts, key=lambda x: x['quality_score'], reverse=True)
         
-        logger.info(f"评分完成，最高分: {scored_posts[0]['quality_score']:.2f}, "
-                   f"最低分: {scored_posts[-1]['quality_score']:.2f}")
+        if scored_posts:
+            logger.info(f"评分完成，最高分: {scored_posts[0]['quality_score']:.2f}, "
+                        f"最低分: {scored_posts[-1]['quality_score']:.2f}")
         
         return scored_posts
     
     def get_top_quality_posts(self, scored_posts: List[Dict], 
                              top_k: int = 5) -> List[Dict]:
-        """获取高质量帖子TOP K"""
-        return scored_posts[:top_k]
+        """获取高质量帖子TOP K（评分相同时保持原顺序）"""
+        return select_top_k(scored_posts, top_k, key=lambda x: x['quality_score'])
     
-    def _calculate_quality_score(self, post: Dict[str, Any], 
-                                 trend_analysis: Dict[str, Any]) -> float:
+    def calculate_quality_scores(self, posts: List[Dict],
+                                 trend_analysis: Dict[str, Any]) -> np.ndarray:
         """
-        计算综合质量评分 (0-100)
+        批量计算综合质量评分 (0-100)，各维度在数组上一次算完
         
         评分维度:
         1. 互动指标 (40分): 点赞、评论、点赞率
         2. 内容质量 (20分): 标题、内容、标签
         3. 时效性 (15分): 发布时间
         4. 趋势相关性 (25分): 关键词、作者、社区活跃度
+        5. 动量 (10分，仅在提供快照存储时): 最近两次快照间每小时的互动增长
+        
+        各项的运算顺序与逐帖计算时相同，结果逐位一致。
+        
+        Args:
+            posts: 帖子列表
+            trend_analysis: 趋势分析结果
+        
+        Returns:
+            与posts顺序对应的评分数组（未取整）
         """
-        total_score = 0.0
+        table = PostTable.from_posts(posts, self.SCORING_COLUMNS)
+        
+        total_score = np.zeros(len(table))
         
         # 1. 互动指标 (40分)
-        total_score += self._score_interaction(post)
+        total_score += self._score_interaction(table)
         
         # 2. 内容质量 (20分)
-        total_score += self._score_content(post)
+        total_score += self._score_content(table)
         
         # 3. 时效性 (15分)
-        total_score += self._score_freshness(post)
+        total_score += self._score_freshness(table)
         
         # 4. 趋势相关性 (25分)
-        total_score += self._score_trend_relevance(post, trend_analysis)
+        total_score += self._score_trend_relevance(posts, table, trend_analysis)
         
-        return min(total_score, 100.0)
+        # 5. 动量 (10分)
+        if self.snapshot_store is not None:
+            total_score += self._score_momentum(posts)
+        
+        return np.minimum(total_score, 100.0)
     
-    def _score_interaction(self, post: Dict[str, Any]) -> float:
+    def _score_interaction(self, table: PostTable) -> np.ndarray:
         """互动指标评分 (0-40)"""
-        score = max(post.get('score', 0), 0)
-        comments = max(post.get('num_comments', 0), 0)
-        upvote_ratio = max(min(post.get('upvote_ratio', 0.5), 1.0), 0.0)
+        score = np.maximum(table.array('score', 0), 0).astype(np.float64)
+        comments = np.maximum(table.array('num_comments', 0), 0).astype(np.float64)
+        upvote_ratio = np.clip(table.array('upvote_ratio', 0.5).astype(np.float64), 0.0, 1.0)
         
         # 点赞评分 (0-15): 对数缩放
-        score_points = min(15, 5 * (1 + 2 * (score ** 0.5) / 100))
+        score_points = np.minimum(15, 5 * (1 + 2 * np.power(score, 0.5) / 100))
         
         # 评论评分 (0-15): 对数缩放
-        comment_points = min(15, 5 * (1 + 2 * (comments ** 0.6) / 50))
+        comment_points = np.minimum(15, 5 * (1 + 2 * np.power(comments, 0.6) / 50))
         
         # 点赞率评分 (0-10)
-        if upvote_ratio >= 0.9:
-            ratio_points = 10
-        elif upvote_ratio >= 0.8:
-            ratio_points = 8
-        elif upvote_ratio >= 0.7:
-            ratio_points = 6
-        elif upvote_ratio >= 0.6:
-            ratio_points = 4
-        else:
-            ratio_points = 2
+        ratio_points = np.select(
+            [upvote_ratio >= 0.9, upvote_ratio >= 0.8, upvote_ratio >= 0.7, upvote_ratio >= 0.6],
+            [10, 8, 6, 4],
+            default=2
+        )
         
         return score_points + comment_points + ratio_points
     
-    def _score_content(self, post: Dict[str, Any]) -> float:
+    def _score_content(self, table: PostTable) -> np.ndarray:
         """内容质量评分 (0-20)"""
-        title = post.get('title', '')
-        content = post.get('selftext_preview', '')
-        
         # 标题质量 (0-8)
-        title_len = len(title)
-        if title_len > 50:
-            title_points = 8
-        elif title_len > 30:
-            title_points = 6
-        elif title_len > 15:
-            title_points = 4
-        else:
-            title_points = 2
+        title_len = np.fromiter((len(title) if title else 0 for title in table.column('title', '')),
+                                dtype=np.int64, count=len(table))
+        title_points = np.select(
+            [title_len > 50, title_len > 30, title_len > 15],
+            [8, 6, 4],
+            default=2
+        )
         
         # 内容丰富度 (0-7)
-        content_len = len(content)
-        if content_len > 500:
-            content_points = 7
-        elif content_len > 200:
-            content_points = 5
-        elif content_len > 100:
-            content_points = 3
-        elif content_len > 0:
-            content_points = 1
-        else:
-            content_points = 0
-        
-        # 分类标签 (0-5)
-        flair = post.get('flair', '')
-        if flair and flair.lower() not in ['general', 'discussion', 'other', '']:
-            flair_points = 5
-        else:
-            flair_points = 0
+        content_len = np.fromiter((len(content) if content else 0
+                                   for content in table.column('selftext_preview', '')),
+                                  dtype=np.int64, count=len(table))
+        content_points = np.select(
+            [content_len > 500, content_len > 200, content_len > 100, content_len > 0],
+            [7, 5, 3, 1],
+            default=0
+        )
+        
+        # 分类标签 (0-5)：按标签取值计算一次，再按编码展开
+        codes, flairs = table.codes('flair')
+        flair_points = np.array(
+            [5 if flair and flair.lower() not in ['general', 'discussion', 'other', ''] else 0
+             for flair in flairs] + [0]
+        )[codes]
         
         return title_points + content_points + flair_points
     
-    def _score_freshness(self, post: Dict[str, Any]) -> float:
-        """时效性评分 (0-15)"""
-        try:
-            created_utc = post.get('created_utc')
-            if isinstance(created_utc, str):
-                created_time = datetime.fromisoformat(created_utc.replace('Z', ''))
-            else:
-                created_time = datetime.fromtimestamp(created_utc)
-            
-            hours_old = (datetime.now() - created_time).total_seconds() / 3600
-            
-            if hours_old < 2:
-                return 15
-            elif hours_old < 6:
-                return 12
-            elif hours_old < 12:
-                return 10
-            elif hours_old < 24:
-                return 8
-            elif hours_old < 48:
-                return 6
-            elif hours_old < 168:
-                return 4
-            else:
-                return 2
-        except:
-            return 5
+    def _score_freshness(self, table: PostTable) -> np.ndarray:
+        """时效性评分 (0-15)，发布时间无法解析时为5分"""
+        created = table.created
+        valid = ~np.isnat(created)
+        
+        now = np.datetime64(datetime.now(), 'us')
+        elapsed_us = (now - np.where(valid, created, now)).astype(np.int64)
+        hours_old = elapsed_us / 10**6 / 3600
+        
+        return np.select(
+            [~valid, hours_old < 2, hours_old < 6, hours_old < 12,
+             hours_old < 24, hours_old < 48, hours_old < 168],
+            [5, 15, 12, 10, 8, 6, 4],
+            default=2
+        )
     
-    def _score_trend_relevance(self, post: Dict[str, Any], 
-                              trend_analysis: Dict[str, Any]) -> float:
+    def _score_trend_relevance(self, posts: List[Dict], table: PostTable,
+                               trend_analysis: Dict[str, Any]) -> np.ndarray:
         """趋势相关性评分 (0-25)"""
         if not trend_analysis:
-            return 12.0
+            return np.full(len(table), 12.0)
         
-        total = 0.0
+        total = np.zeros(len(table))
         
         # 关键词匹配 (0-10)
-        total += self._score_keyword_relevance(post, trend_analysis)
+        total += self._score_keyword_relevance(posts, trend_analysis)
         
         # 作者活跃度 (0-8)
-        total += self._score_author_activity(post, trend_analysis)
+        total += self._score_author_activity(table, trend_analysis)
         
         # 社区活跃度 (0-7)
-        total += self._score_subreddit_activity(post, trend_analysis)
+        total += self._score_subreddit_activity(table, trend_analysis)
         
         return total
     
-    def _score_keyword_relevance(self, post: Dict[str, Any], 
-                                 trend_analysis: Dict[str, Any]) -> float:
+    def _score_keyword_relevance(self, posts: List[Dict],
+                                 trend_analysis: Dict[str, Any]) -> np.ndarray:
         """关键词相关性 (0-10)"""
         trending_keywords = trend_analysis.get('keyword_trends', {}).get('trending_keywords', [])
         
         if not trending_keywords:
-            return 0
-        
-        text = f"{post.get('title', '')} {post.get('selftext_preview', '')}".lower()
+            return np.zeros(len(posts))
         
-        matches = sum(1 for kw in trending_keywords[:10] if kw.lower() in text)
+        matches = np.array(count_keyword_matches_many(posts, trending_keywords[:10]), dtype=np.int64)
         
-        if matches >= 3:
-            return 10
-        elif matches >= 2:
-            return 8
-        elif matches >= 1:
-            return 5
-        else:
-            return 0
+        return np.select([matches >= 3, matches >= 2, matches >= 1], [10, 8, 5], default=0)
     
-    def _score_author_activity(self, post: Dict[str, Any], 
-                               trend_analysis: Dict[str, Any]) -> float:
-        """作者活跃度 (0-8)"""
-        author = post.get('author', '')
+    def _score_author_activity(self, table: PostTable,
+                               trend_analysis: Dict[str, Any]) -> np.ndarray:
+        """作者活跃度 (0-8)：按作者取值计算一次，再按编码展开"""
         top_authors = trend_analysis.get('author_trends', {}).get('top_authors', [])
         
+        ranks = {}
         for i, author_info in enumerate(top_authors):
-            if author_info.get('author') == author:
-                rank = i + 1
-                if rank <= 3:
-                    return 8
-                elif rank <= 5:
-                    return 6
-                elif rank <= 10:
-                    return 4
-                else:
-                    return 2
+            ranks.setdefault(author_info.get('author'), i + 1)
         
-        return 0
+        def author_points(author) -> int:
+            rank = ranks.get(author)
+            if rank is None:
+                return 0
+            if rank <= 3:
+                return 8
+            elif rank <= 5:
+                return 6
+            elif rank <= 10:
+                return 4
+            else:
+                return 2
+        
+        codes, authors = table.codes('author')
+        # 没有author字段的帖子按空字符串匹配
+        return np.array([author_points(author) for author in authors] + [author_points('')])[codes]
     
-    def _score_subreddit_activity(self, post: Dict[str, Any], 
-                                  trend_analysis: Dict[str, Any]) -> float:
-        """社区活跃度 (0-7)"""
-        subreddit = post.get('subreddit', '')
+    def _score_subreddit_activity(self, table: PostTable,
+                                  trend_analysis: Dict[str, Any]) -> np.ndarray:
+        """社区活跃度 (0-7)：按社区取值计算一次，再按编码展开"""
         subreddit_perf = trend_analysis.get('subreddit_trends', {}).get('subreddit_performance', {})
         
-        if subreddit in subreddit_perf:
-            avg_score = subreddit_perf[subreddit].get('avg_score', 0)
+        def subreddit_points(subreddit) -> int:
+            if subreddit in subreddit_perf:
+                avg_score = subreddit_perf[subreddit].get('avg_score', 0)
+                
+                if avg_score > 100:
+                    return 7
+                elif avg_score > 50:
+                    return 5
+                elif avg_score > 20:
+                    return 3
+                else:
+                    return 1
             
-            if avg_score > 100:
-                return 7
-            elif avg_score > 50:
-                return 5
-            elif avg_score > 20:
-                return 3
-            else:
-                return 1
+            return 2
         
-        return 2
\ No newline at end of file
+        codes, subreddits = table.codes('subreddit')
+        # 没有subreddit字段的帖子按空字符串匹配
+        return np.array([subreddit_points(subreddit) for subreddit in subreddits]
+                        + [subreddit_points('')])[codes]
+    
+    def _score_momentum(self, posts: List[Dict]) -> np.ndarray:
+        """动量评分 (0-10)：最近两次快照间每小时的分数与评论增长，没有轨迹的帖子为0"""
+        score_rate, comment_rate, tracked = self.snapshot_store.growth_rates(
+            str(post.get('id', '')) for post in posts
+        )
+        growth = np.where(tracked, score_rate + comment_rate, 0.0)
+        return np.select(
+            [growth >= 50, growth >= 20, growth >= 10, growth >= 5, growth > 0],
+            [10, 8, 6, 4, 2],
+            default=0
+        )
@@ -0,0 +1,233 @@
+"""
+帖子快照存储 - 记录每个帖子分数/评论数随时间的轨迹，提供增长速度特征
+
+同一帖子会出现在 hot/day/week/month 多个列表中，也会在连续多天的运行中重复出现。
+每次运行为每个帖子记录一个快照 (时间, 分数, 评论数, 点赞率)，按帖子ID分段存储为
+NumPy数组（类似CSR：ids + offsets + 各列）。间隔不超过 min_interval 的相邻快照只保留较新的一个，
+超过 max_age_days 的快照被丢弃。
+
+保存时各列在每个帖子的分段内做差分编码（首个快照存绝对值，其余存与前一个快照的差值），
+时间相对最早快照以秒存为int32，点赞率存为千分比int16，再用 npz 压缩；增长缓慢的帖子差值
+大多很小，压缩后每个快照只占几个字节。
+
+QualityScorer 通过 growth_rates 获取每小时的分数/评论增长速度（按最近两个快照计算）。
+"""
+
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ('times', 'scores', 'comments', 'ratios')
+
+
+def _snapshot_time(post: Dict[str, Any], default: int) -> int:
+    """快照时间：优先使用帖子的 collected_at（缓存刷新的时间），否则为本次运行时间"""
+    collected_at = post.get('collected_at')
+    if isinstance(collected_at, str):
+        try:
+            return int(datetime.fromisoformat(collected_at).timestamp())
+        except ValueError:
+            pass
+    return default
+
+
+class SnapshotStore:
+    """按帖子分段、差分编码的快照存储"""
+
+    def __init__(self, path: str, max_age_days: int = 30, min_interval: int = 3600):
+        """
+        初始化并加载快照
+
+        Args:
+            path: npz文件路径
+            max_age_days: 快照保留天数
+            min_interval: 间隔不超过该值（秒）的同一帖子相邻快照只保留较新的一个
+        """
+        self.path = Path(path)
+        self.max_age = max_age_days * 24 * 3600
+        self.min_interval = min_interval
+
+        # ids按字典序排列；第i个帖子的快照为 [offsets[i], offsets[i+1])，按时间升序
+        self.ids = np.array([], dtype=str)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.times = np.array([], dtype=np.int64)
+        self.scores = np.array([], dtype=np.int64)
+        self.comments = np.array([], dtype=np.int64)
+        self.ratios = np.array([], dtype=np.int64)     # 点赞率（千分比），-1 表示缺失
+        self._pending: List[Tuple[str, int, int, int, int]] = []
+        self._load()
+
+    def __len__(self) -> int:
+        """快照总数（含未合并的新快照）"""
+        return len(self.times) + len(self._pending)
+
+    def record(self, posts: Iterable[Dict[str, Any]], timestamp: float = None) -> int:
+        """
+        记录一批帖子的当前快照
+
+        Args:
+            posts: 帖子列表（可以包含同一帖子的多个副本）
+            timestamp: 快照时间（Unix秒），默认当前时间；帖子有 collected_at 时以其为准
+
+        Returns:
+            记录的快照数
+        """
+        default_time = int(timestamp if timestamp is not None else time.time())
+        recorded = 0
+        for post in posts:
+            if not post or not post.get('id'):
+                continue
+            ratio = post.get('upvote_ratio')
+            try:
+                self._pending.append((
+                    str(post['id']),
+                    _snapshot_time(post, default_time),
+                    int(post.get('score', 0)),
+                    int(post.get('num_comments', 0)),
+                    int(round(float(ratio) * 1000)) if ratio is not None else -1,
+                ))
+            except (TypeError, ValueError):
+                continue
+            recorded += 1
+        return recorded
+
+    def growth_rates(self, post_ids: Iterable[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        按最近两个快照计算每小时的增长速度
+
+        Args:
+            post_ids: 帖子ID列表
+
+        Returns:
+            (分数增长/小时, 评论增长/小时, 是否有至少两个快照)，与post_ids顺序对应；
+            没有轨迹的帖子增长速度为0
+        """
+        self._merge()
+        post_ids = np.array(list(post_ids), dtype=str)
+        score_rate = np.zeros(len(post_ids))
+        comment_rate = np.zeros(len(post_ids))
+        tracked = np.zeros(len(post_ids), dtype=bool)
+        if not len(self.ids) or not len(post_ids):
+            return score_rate, comment_rate, tracked
+
+        index = np.minimum(np.searchsorted(self.ids, post_ids), len(self.ids) - 1)
+        found = self.ids[index] == post_ids
+        counts = np.diff(self.offsets)[index]
+        tracked = found & (counts >= 2)
+
+        last = self.offsets[index + 1] - 1
+        # 最近两个快照时间相同时不计算增长速度（避免除以0）
+        tracked &= self.times[last] > self.times[np.maximum(last - 1, 0)]
+        rows, last = np.flatnonzero(tracked), last[tracked]
+        hours = (self.times[last] - self.times[last - 1]) / 3600
+        score_rate[rows] = (self.scores[last] - self.scores[last - 1]) / hours
+        comment_rate[rows] = (self.comments[last] - self.comments[last - 1]) / hours
+        return score_rate, comment_rate, tracked
+
+    def trajectory(self, post_id: str) -> List[Dict[str, Any]]:
+        """帖子的全部快照（按时间顺序）"""
+        self._merge()
+        i = int(np.searchsorted(self.ids, post_id))
+        if i >= len(self.ids) or self.ids[i] != post_id:
+            return []
+        rows = range(self.offsets[i], self.offsets[i + 1])
+        return [{
+            'time': datetime.fromtimestamp(int(self.times[r])).isoformat(),
+            'score': int(self.scores[r]),
+            'num_comments': int(self.comments[r]),
+            'upvote_ratio': int(self.ratios[r]) / 1000 if self.ratios[r] >= 0 else None,
+        } for r in rows]
+
+    def _merge(self) -> None:
+        """把新记录的快照并入分段数组：按 (帖子, 时间) 排序，合并过近的快照并丢弃过期快照"""
+        if not self._pending:
+            return
+        pending = list(zip(*self._pending))
+        self._pending = []
+
+        ids = np.concatenate([np.repeat(self.ids, np.diff(self.offsets)), np.array(pending[0], dtype=str)])
+        columns = [np.concatenate([getattr(self, name), np.array(values, dtype=np.int64)])
+                   for name, values in zip(_COLUMNS, pending[1:])]
+
+        # 稳定排序：同一帖子同一时间的快照，后记录的排在后面
+        order = np.lexsort((columns[0], ids))
+        ids = ids[order]
+        columns = [column[order] for column in columns]
+        times = columns[0]
+
+        # 同一帖子的下一个快照与当前快照间隔不超过 min_interval 时丢弃当前快照（时间相同的快照
+        # 总会合并，保证相邻快照的间隔大于0）；丢弃过期快照
+        same_post_next = np.append(ids[1:] == ids[:-1], False)
+        gaps = np.append(times[1:] - times[:-1], self.min_interval + 1)
+        too_close = same_post_next & (gaps <= self.min_interval)
+        expired = times < times.max() - self.max_age
+        keep = ~(too_close | expired)
+
+        ids = ids[keep]
+        self.times, self.scores, self.comments, self.ratios = (column[keep] for column in columns)
+        self.ids, starts = np.unique(ids, return_index=True)
+        self.offsets = np.append(starts, len(ids)).astype(np.int64)
+
+    def save(self) -> None:
+        """差分编码后原子写入npz文件"""
+        self._merge()
+        starts = self.offsets[:-1]
+        base_time = int(self.times.min()) if len(self.times) else 0
+
+        def delta(values: np.ndarray, dtype) -> np.ndarray:
+            encoded = np.diff(values, prepend=0)
+            encoded[starts] = values[starts]
+            return encoded.astype(dtype)
+
+        arrays = {
+            'ids': self.ids,
+            'counts': np.diff(self.offsets).astype(np.int32),
+            'base_time': np.array(base_time, dtype=np.int64),
+            'times': delta(self.times - base_time, np.int32),
+            'scores': delta(self.scores, np.int32),
+            'comments': delta(self.comments, np.int32),
+            'ratios': delta(self.ratios, np.int16),
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        tmp_path.replace(self.path)
+        logger.info(f"帖子快照已保存: {len(self.ids)} 个帖子, {len(self.times)} 个快照 -> {self.path}")
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                counts = data['counts'].astype(np.int64)
+                offsets = np.concatenate([[0], np.cumsum(counts)])
+                starts = offsets[:-1]
+
+                def undelta(encoded: np.ndarray) -> np.ndarray:
+                    # 整体累加后减去各分段起点之前的累计值
+                    values = np.cumsum(encoded.astype(np.int64))
+                    before = values[starts] - encoded[starts]
+                    return values - np.repeat(before, counts)
+
+                self.ids = data['ids']
+                self.offsets = offsets
+                self.times = undelta(data['times']) + int(data['base_time'])
+                self.scores = undelta(data['scores'])
+                self.comments = undelta(data['comments'])
+                self.ratios = undelta(data['ratios'])
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning(f"读取帖子快照失败，重新开始记录: {exc}")
+            self.ids = np.array([], dtype=str)
+            self.offsets = np.zeros(1, dtype=np.int64)
+            for name in _COLUMNS:
+                setattr(self, name, np.array([], dtype=np.int64))
+            return
+        logger.info(f"帖子快照：{len(self.ids)} 个帖子, {len(self.times)} 个快照")
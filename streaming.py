@@ -0,0 +1,138 @@
+"""
+流式流水线 - 抓取、清洗与摘要生成重叠执行
+
+各社区的列表一到达就立即清洗；帖子一旦确定进入排行榜，就在后台开始生成摘要，
+Reddit请求与LLM请求的延迟相互重叠，总耗时接近两者中较慢的一方而不是两者之和。
+"""
+
+import logging
+from typing import Any, Dict, List
+
+from topk import select_top_k
+
+logger = logging.getLogger(__name__)
+
+
+class RankingTracker:
+    """
+    跟踪已到达的清洗结果，判断哪些帖子已经确定进入排行榜
+
+    与 TrendAnalyzer.create_hot_ranking 的排行规则保持一致：
+    - hot榜：按配置顺序拼接各社区的 hot/day 列表后取前K个，
+      因此只要某帖子之前的所有社区都已到达，它的位置就确定了
+    - week/month榜：按score降序取前K个。尚未到达的社区最多还能贡献 limit 个帖子，
+      帖子在已到达帖子中的名次加上这些潜在帖子数仍小于K时，才确定进入榜单
+    """
+
+    def __init__(self, sub_infos: List[Dict], top_k: int = 20):
+        """
+        初始化跟踪器
+
+        Args:
+            sub_infos: 按配置顺序展开的社区列表 [{"name": "xxx", "limit": 50}]
+            top_k: 每个排行榜的长度
+        """
+        self.order = [sub_info['name'] for sub_info in sub_infos]
+        self.limits = {sub_info['name']: sub_info['limit'] for sub_info in sub_infos}
+        self.top_k = top_k
+        self._arrived: Dict[str, Dict[str, List[Dict]]] = {}
+        self._ranked_ids = set()
+
+    def add(self, name: str, listings: Dict[str, List[Dict]]) -> List[Dict[str, Any]]:
+        """
+        登记一个社区的清洗结果
+
+        Args:
+            name: 社区名
+            listings: {"timeframe_sub": [清洗后的帖子]}
+
+        Returns:
+            本次新确定进入任一排行榜的帖子（按ID去重）
+        """
+        self._arrived[name] = listings
+
+        newly_ranked = []
+        for post in self._certain_hot() + self._certain_by_score('week') + self._certain_by_score('month'):
+            post_id = post.get('id')
+            if post_id and post_id not in self._ranked_ids:
+                self._ranked_ids.add(post_id)
+                newly_ranked.append(post)
+        return newly_ranked
+
+    def _certain_hot(self) -> List[Dict]:
+        certain = []
+        for name in self.order:
+            if name not in self._arrived:
+                break
+            listings = self._arrived[name]
+            for timeframe in ('hot', 'day'):
+                for post in listings.get(f"{timeframe}_{name}", []):
+                    if len(certain) >= self.top_k:
+                        return certain
+                    certain.append(post)
+        return certain
+
+    def _certain_by_score(self, timeframe: str) -> List[Dict]:
+        pending_capacity = sum(self.limits[name] for name in self.order if name not in self._arrived)
+        slots = self.top_k - pending_capacity
+        if slots <= 0:
+            return []
+
+        posts = [
+            post
+            for name in self.order if name in self._arrived
+            for post in self._arrived[name].get(f"{timeframe}_{name}", [])
+        ]
+        return select_top_k(posts, slots, key=lambda x: x.get('score', 0))
+
+
+def stream_fetch_and_clean(fetcher, cleaner, subreddit_config: Dict[str, List[Dict]],
+                           top_k: int = 20, summarizer=None,
+                           max_comments: int = 5, incremental=None) -> Dict[str, List[Dict]]:
+    """
+    流式执行抓取与清洗，并为确定进入排行榜的帖子提前调度摘要
+
+    返回值与 cleaner.clean_posts(fetcher.fetch_posts_from_subreddits(...)) 相同，
+    之后照常调用 create_hot_ranking 即可，已调度的摘要会被直接复用。
+
+    Args:
+        fetcher: RedditDataFetcher实例
+        cleaner: DataCleaner实例
+        subreddit_config: {"priority": [{"name": "xxx", "limit": 50}]}
+        top_k: 排行榜长度（与 create_hot_ranking 的 top_k 一致）
+        summarizer: PostSummarizer实例，为None时只做流式抓取与清洗
+        max_comments: 当selftext较短时，获取的评论数量
+        incremental: IncrementalState实例，提供时复用未变化帖子的清洗结果与摘要
+
+    Returns:
+        {"timeframe_sub": [清洗后的帖子]}，按配置顺序排列
+    """
+    sub_infos = fetcher.flatten_subreddit_config(subreddit_config)
+    tracker = RankingTracker(sub_infos, top_k)
+
+    logger.info("开始流式抓取与清洗...")
+    cleaned_by_subreddit = {}
+    scheduled = 0
+
+    for name, listings in fetcher.iter_posts_from_subreddits(subreddit_config):
+        if incremental:
+            cleaned_by_subreddit[name] = incremental.clean_posts(cleaner, listings)
+            if summarizer:
+                incremental.seed_summaries(summarizer, cleaned_by_subreddit[name])
+        else:
+            cleaned_by_subreddit[name] = dict(cleaner.iter_clean_posts(listings.items()))
+
+        ranked = tracker.add(name, cleaned_by_subreddit[name])
+        if ranked and summarizer:
+            count = summarizer.prefetch_summaries(ranked, fetcher, max_comments=max_comments)
+            scheduled += count
+            logger.info(f"  r/{name} 到达后新调度 {count} 个摘要（累计 {scheduled}）")
+
+    cleaned_posts = {}
+    for sub_info in sub_infos:
+        cleaned_posts.update(cleaned_by_subreddit.get(sub_info['name'], {}))
+
+    logger.info(f"流式清洗完成: {cleaner.stats['valid']}/{cleaner.stats['total']} 有效, "
+                f"{cleaner.stats['invalid']} 无效, {cleaner.stats['filtered']} 过滤; "
+                f"抓取期间已调度 {scheduled} 个摘要")
+    return cleaned_posts
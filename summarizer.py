@@ -2,14 +2,47 @@
 摘要生成模块 - 负责为帖子生成摘要
 """
 
+import asyncio
+import json
 import logging
+import threading
 from typing import Dict, List, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from openai import OpenAI
-from config import LLM_CONFIG
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from cache import SummaryCache
+from concurrency import AdaptiveConcurrencyLimiter, async_call_with_retry, call_with_retry
+from llm_client import get_llm_client, run_async_llm
+from profiler import record_llm_usage, timed
+from config import LLM_CONFIG, SUMMARY_CACHE_CONFIG, SUMMARY_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# 可重试的LLM错误；其中429与超时同时视为过载信号，触发并发上限缩减
+RETRYABLE_LLM_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+OVERLOAD_LLM_ERRORS = (RateLimitError, APITimeoutError)
+
+SUMMARY_SYSTEM_PROMPT = "你是一个专业的内容摘要助手，擅长提取核心信息并生成简洁的摘要。"
+
+SUMMARY_PROMPT_TEMPLATE = """请为以下Reddit帖子生成一个简洁的摘要，要求：
+1. 摘要字数控制在100字以内
+2. 突出帖子的核心内容和要点
+3. 使用中文
+4. 直接输出摘要，不要添加任何前缀或说明
+
+帖子内容：
+{content}
+
+摘要："""
+
+SUMMARY_BATCH_PROMPT_TEMPLATE = """请为以下每个Reddit帖子分别生成一个简洁的摘要，要求：
+1. 每条摘要字数控制在100字以内
+2. 突出帖子的核心内容和要点
+3. 使用中文
+4. 只输出一个JSON对象，键为帖子id，值为对应的摘要，不要添加任何其他内容
+
+帖子列表（JSON数组，每项包含id和content）：
+{posts}"""
+
 
 class PostSummarizer:
     """帖子摘要生成器"""
@@ -24,15 +57,122 @@ class PostSummarizer:
             base_url: API基础URL，默认从config读取
         """
         self.model = model or LLM_CONFIG.get("model")
+        self.batch_size = max(1, SUMMARY_CONFIG.get("batch_size", 1))
         self.api_key = api_key or LLM_CONFIG.get("api_key")
         self.base_url = base_url or LLM_CONFIG.get("base_url")
         
-        self.llm_client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
+        self.async_fanout = SUMMARY_CONFIG.get("async_fanout", False)
+        
+        # 共享连接池的客户端；重试由 call_with_retry 统一处理，关闭SDK自带的重试以免叠加
+        self.llm_client = get_llm_client(self.api_key, self.base_url, max_retries=0)
+        
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=SUMMARY_CONFIG.get("concurrency_initial", 4),
+            min_limit=SUMMARY_CONFIG.get("concurrency_min", 1),
+            max_limit=SUMMARY_CONFIG.get("concurrency_max", 12),
+            overload_errors=OVERLOAD_LLM_ERRORS
         )
+        
+        # 摘要缓存：内容未变化的帖子直接复用之前的摘要
+        self.summary_cache = None
+        if SUMMARY_CACHE_CONFIG.get("enabled"):
+            self.summary_cache = SummaryCache(
+                SUMMARY_CACHE_CONFIG["path"],
+                SUMMARY_CACHE_CONFIG["ttl"],
+                SUMMARY_CACHE_CONFIG["max_entries"]
+            )
+        
+        # 流式流水线提前调度的摘要任务 {post_id: Future[str]}
+        self._pending_summaries: Dict[str, Future] = {}
+        # 本次运行中已知的摘要 {post_id: 摘要文本}（预先登记的与已成功生成的），只读取不移除，
+        # 同一次运行中不会为同一帖子重复生成摘要
+        self._known_summaries: Dict[str, str] = {}
+        self._pending_lock = threading.Lock()
+        self._prefetch_executor = None
+        
         logger.info(f"摘要生成器初始化完成 - 模型: {self.model}")
     
+    def prefetch_summaries(
+        self,
+        posts: List[Dict[str, Any]],
+        fetcher,
+        max_workers: int = 5,
+        max_comments: int = 5
+    ) -> int:
+        """
+        在后台提前为帖子生成摘要（流式流水线中，帖子一旦进入排行榜即调度）
+        
+        之后 generate_summaries_for_posts 遇到同一帖子时直接复用结果，
+        不会重复调用LLM。batch_size > 1 时每 batch_size 个帖子合并为一次请求。
+        
+        Args:
+            posts: 帖子列表
+            fetcher: RedditDataFetcher实例，用于获取评论
+            max_workers: 后台线程数（首次调用时生效）
+            max_comments: 当selftext较短时，获取的评论数量
+        
+        Returns:
+            本次新调度的帖子数
+        """
+        scheduled = 0
+        
+        with self._pending_lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=max(max_workers, self.concurrency.max_limit)
+                )
+            
+            new_posts = {}
+            for post in posts:
+                post_id = post.get('id')
+                if post_id and post_id not in self._pending_summaries and post_id not in self._known_summaries:
+                    new_posts[post_id] = post
+            new_posts = list(new_posts.values())
+            
+            if self.batch_size == 1:
+                for post in new_posts:
+                    self._pending_summaries[post['id']] = self._prefetch_executor.submit(
+                        self._summarize_post, post, fetcher, max_comments
+                    )
+            else:
+                for i in range(0, len(new_posts), self.batch_size):
+                    batch = new_posts[i:i + self.batch_size]
+                    futures = {post['id']: Future() for post in batch}
+                    self._pending_summaries.update(futures)
+                    self._prefetch_executor.submit(
+                        self._run_summary_batch, batch, futures, fetcher, max_comments
+                    )
+            scheduled = len(new_posts)
+        
+        return scheduled
+    
+    def close(self) -> None:
+        """关闭后台摘要线程池：取消尚未开始的预先调度任务，等待进行中的请求结束"""
+        with self._pending_lock:
+            executor, self._prefetch_executor = self._prefetch_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def seed_summaries(self, summaries: Dict[str, str]) -> int:
+        """
+        登记已知的摘要（例如增量运行中内容未变化的帖子），之后不再为这些帖子调用LLM
+        
+        Args:
+            summaries: {post_id: 摘要文本}
+        
+        Returns:
+            新登记的摘要数
+        """
+        seeded = 0
+        with self._pending_lock:
+            for post_id, summary in summaries.items():
+                if post_id in self._pending_summaries or post_id in self._known_summaries:
+                    continue
+                self._known_summaries[post_id] = summary
+                seeded += 1
+        return seeded
+    
+    @timed("summarizer.generate_summaries_for_posts")
     def generate_summaries_for_posts(
         self, 
         posts: List[Dict[str, Any]], 
@@ -46,7 +186,7 @@ class PostSummarizer:
         Args:
             posts: 帖子列表
             fetcher: RedditDataFetcher实例，用于获取评论
-            max_workers: 最大并发数
+            max_workers: 线程数下限（LLM请求的并发数由自适应控制器调整）
             max_comments: 当selftext较短时，获取的评论数量
         
         Returns:
@@ -56,8 +196,24 @@ class PostSummarizer:
         
         posts_with_summary = []
         
-        # 使用线程池并发生成摘要
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 正文较短的帖子需要评论：先从缓存恢复，启用异步后端时并发预取
+        # （流式流水线已提前调度的帖子自行获取评论）
+        fetcher.prefetch_submission_trees([
+            post.get('id') for post in posts
+            if len(post.get('selftext_preview', '') or post.get('content', '')) < 50
+            and post.get('id') not in self._pending_summaries
+            and post.get('id') not in self._known_summaries
+        ])
+        
+        # 协程模式：所有请求在一个事件循环内并发完成；批量模式：按批次调度到后台。
+        # 两种模式下，下面的逐帖循环都直接取用各帖子已登记的结果
+        if self.async_fanout:
+            self._summarize_posts_async(posts, fetcher, max_workers, max_comments)
+        elif self.batch_size > 1:
+            self.prefetch_summaries(posts, fetcher, max_workers=max_workers, max_comments=max_comments)
+        
+        # 使用线程池并发生成摘要，实际同时进行的LLM请求数由自适应并发控制器决定
+        with ThreadPoolExecutor(max_workers=max(max_workers, self.concurrency.max_limit)) as executor:
             future_to_post = {
                 executor.submit(
                     self._generate_single_summary, 
@@ -104,11 +260,24 @@ class PostSummarizer:
                     post['summary'] = None
                     posts_with_summary.append(post)
         
+        # 移除已完成的任务：成功的摘要文本留在 _known_summaries 中供本次运行复用，
+        # 失败的之后再遇到时重新生成
+        with self._pending_lock:
+            for post in posts:
+                pending = self._pending_summaries.get(post.get('id'))
+                if pending is not None and pending.done():
+                    del self._pending_summaries[post.get('id')]
+            for post in posts_with_summary:
+                if post.get('id') and post.get('summary') is not None:
+                    self._known_summaries[post['id']] = post['summary']
+        
         # 汇总报告
         logger.info(f"\n{'='*60}")
         logger.info(f"摘要生成完成: 总计 {len(posts)} 个帖子")
         logger.info(f"  ✅ 成功: {success_count} 个")
         logger.info(f"  ❌ 失败: {failed_count} 个")
+        if self.summary_cache:
+            logger.info(f"  💾 摘要缓存累计命中: {self.summary_cache.hits}, 未命中: {self.summary_cache.misses}")
         if failed_count > 0:
             logger.warning(f"失败的帖子:")
             for post in posts_with_summary:
@@ -141,6 +310,52 @@ class PostSummarizer:
         """
         post_copy = post.copy()
         
+        known = self._known_summaries.get(post.get('id'))
+        if known is not None:
+            post_copy['summary'] = known
+            return post_copy
+        
+        # 流式流水线已提前调度过的帖子直接等待其结果；调度的任务失败时移除并单独重试
+        pending = self._pending_summaries.get(post.get('id'))
+        if pending is not None:
+            try:
+                post_copy['summary'] = pending.result()
+                return post_copy
+            except Exception as e:
+                logger.warning(f"预先调度的摘要失败，单独重试 - {post.get('id')}: {e}")
+                with self._pending_lock:
+                    if self._pending_summaries.get(post.get('id')) is pending:
+                        del self._pending_summaries[post.get('id')]
+        
+        post_copy['summary'] = self._summarize_post(post, fetcher, max_comments)
+        
+        return post_copy
+    
+    def _summarize_post(
+        self,
+        post: Dict[str, Any],
+        fetcher,
+        max_comments: int
+    ) -> str:
+        """组装帖子内容（必要时附带评论）并调用LLM生成摘要"""
+        prompt_content = self._build_summary_content(post, fetcher, max_comments)
+        
+        # 先查摘要缓存，未命中再调用LLM
+        cached = self._get_cached_summary(prompt_content)
+        if cached is not None:
+            return cached
+        
+        summary = self._call_llm_for_summary(prompt_content)
+        self._put_cached_summary(prompt_content, summary)
+        return summary
+    
+    def _build_summary_content(
+        self,
+        post: Dict[str, Any],
+        fetcher,
+        max_comments: int
+    ) -> str:
+        """组装用于生成摘要的帖子内容，正文较短时附带评论"""
         # 获取正文内容
         selftext = post.get('selftext_preview', '') or post.get('content', '')
         title = post.get('title', '')
@@ -149,16 +364,203 @@ class PostSummarizer:
         if len(selftext) < 50:
             # 正文较短，需要获取评论
             comments_text = self._fetch_comments_for_summary(post.get('id'), fetcher, max_comments)
-            prompt_content = f"标题: {title}\n\n正文: {selftext}\n\n评论:\n{comments_text}"
-        else:
-            # 正文足够长，直接使用正文
-            prompt_content = f"标题: {title}\n\n正文: {selftext}"
+            return f"标题: {title}\n\n正文: {selftext}\n\n评论:\n{comments_text}"
         
-        # 调用LLM生成摘要
-        summary = self._call_llm_for_summary(prompt_content)
-        post_copy['summary'] = summary
+        # 正文足够长，直接使用正文
+        return f"标题: {title}\n\n正文: {selftext}"
+    
+    def _summary_cache_key(self, prompt_content: str) -> str:
+        # 批量请求与单帖请求的摘要要求相同，共用单帖提示词的缓存键
+        return SummaryCache.make_key(
+            self.model, SUMMARY_SYSTEM_PROMPT, SUMMARY_PROMPT_TEMPLATE, prompt_content
+        )
+    
+    def _get_cached_summary(self, prompt_content: str):
+        if not self.summary_cache:
+            return None
+        return self.summary_cache.get(self._summary_cache_key(prompt_content))
+    
+    def _put_cached_summary(self, prompt_content: str, summary: str) -> None:
+        if self.summary_cache:
+            self.summary_cache.put(self._summary_cache_key(prompt_content), summary)
+    
+    def _run_summary_batch(
+        self,
+        posts: List[Dict[str, Any]],
+        futures: Dict[str, Future],
+        fetcher,
+        max_comments: int
+    ) -> None:
+        """执行一个批次，并把每个帖子的结果（摘要或异常）写入对应的Future"""
+        try:
+            results = self._summarize_batch(posts, fetcher, max_comments)
+        except Exception as e:
+            results = {post_id: e for post_id in futures}
         
-        return post_copy
+        for post_id, future in futures.items():
+            result = results.get(post_id)
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def _summarize_batch(
+        self,
+        posts: List[Dict[str, Any]],
+        fetcher,
+        max_comments: int
+    ) -> Dict[str, Any]:
+        """
+        用一次LLM请求为多个帖子生成摘要
+        
+        缓存命中的帖子不进入请求；响应中缺失或无法解析的帖子退回单帖请求。
+        
+        Args:
+            posts: 同一批次的帖子
+            fetcher: RedditDataFetcher实例
+            max_comments: 当selftext较短时，获取的评论数量
+        
+        Returns:
+            {post_id: 摘要文本或异常}
+        """
+        results = {}
+        contents = {}
+        for post in posts:
+            prompt_content = self._build_summary_content(post, fetcher, max_comments)
+            cached = self._get_cached_summary(prompt_content)
+            if cached is not None:
+                results[post['id']] = cached
+            else:
+                contents[post['id']] = prompt_content
+        
+        if len(contents) > 1:
+            try:
+                batch_summaries = self._call_llm_for_batch(contents)
+            except Exception as e:
+                logger.warning(f"批量摘要请求失败，退回逐个生成: {e}")
+                batch_summaries = {}
+            
+            self._accept_batch_summaries(contents, batch_summaries, results)
+        
+        for post_id, prompt_content in contents.items():
+            if post_id in results:
+                continue
+            try:
+                summary = self._call_llm_for_summary(prompt_content)
+                self._put_cached_summary(prompt_content, summary)
+                results[post_id] = summary
+            except Exception as e:
+                results[post_id] = e
+        
+        return results
+    
+    def _accept_batch_summaries(
+        self,
+        contents: Dict[str, str],
+        batch_summaries: Dict[str, str],
+        results: Dict[str, Any]
+    ) -> None:
+        """记录批量请求解析出的摘要并写入缓存"""
+        missing = len(contents) - len(batch_summaries)
+        if missing:
+            logger.warning(f"批量摘要中有 {missing}/{len(contents)} 个帖子未能解析，退回逐个生成")
+        
+        for post_id, summary in batch_summaries.items():
+            results[post_id] = summary
+            self._put_cached_summary(contents[post_id], summary)
+    
+    def _summarize_posts_async(
+        self,
+        posts: List[Dict[str, Any]],
+        fetcher,
+        max_workers: int,
+        max_comments: int
+    ) -> None:
+        """
+        以协程并发为帖子生成摘要，结果登记为已完成的Future
+        
+        组装内容（可能需要获取评论）仍在线程池中完成；LLM请求在共享的后台事件循环中
+        通过进程级的AsyncOpenAI并发发送，同样遵循批量大小与自适应并发上限。
+        """
+        new_posts = {}
+        for post in posts:
+            post_id = post.get('id')
+            if post_id and post_id not in self._pending_summaries and post_id not in self._known_summaries:
+                new_posts[post_id] = post
+        if not new_posts:
+            return
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            prompt_contents = list(executor.map(
+                lambda post: self._build_summary_content(post, fetcher, max_comments),
+                new_posts.values()
+            ))
+        
+        results = {}
+        contents = {}
+        for post_id, prompt_content in zip(new_posts, prompt_contents):
+            cached = self._get_cached_summary(prompt_content)
+            if cached is not None:
+                results[post_id] = cached
+            else:
+                contents[post_id] = prompt_content
+        
+        if contents:
+            results.update(run_async_llm(
+                self.api_key, self.base_url, self._summarize_contents_async, contents, max_retries=0
+            ))
+        
+        with self._pending_lock:
+            for post_id in new_posts:
+                future = Future()
+                result = results.get(post_id)
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+                self._pending_summaries[post_id] = future
+    
+    async def _summarize_contents_async(self, client, contents: Dict[str, str]) -> Dict[str, Any]:
+        """按批量大小分组并发请求，返回 {post_id: 摘要文本或异常}"""
+        post_ids = list(contents)
+        groups = [post_ids[i:i + self.batch_size] for i in range(0, len(post_ids), self.batch_size)]
+        
+        group_results = await asyncio.gather(*(
+            self._summarize_group_async(client, {post_id: contents[post_id] for post_id in group})
+            for group in groups
+        ))
+        
+        results = {}
+        for group_result in group_results:
+            results.update(group_result)
+        return results
+    
+    async def _summarize_group_async(self, client, contents: Dict[str, str]) -> Dict[str, Any]:
+        """与 _summarize_batch 相同的批量与回退逻辑（协程版）"""
+        results = {}
+        
+        if len(contents) > 1:
+            try:
+                response = await self._acreate_completion(client, **self._batch_request(contents))
+                batch_summaries = self._parse_batch_response(
+                    response.choices[0].message.content or '', contents
+                )
+            except Exception as e:
+                logger.warning(f"批量摘要请求失败，退回逐个生成: {e}")
+                batch_summaries = {}
+            self._accept_batch_summaries(contents, batch_summaries, results)
+        
+        remaining = [post_id for post_id in contents if post_id not in results]
+        summaries = await asyncio.gather(
+            *(self._acall_llm_for_summary(client, contents[post_id]) for post_id in remaining),
+            return_exceptions=True
+        )
+        for post_id, summary in zip(remaining, summaries):
+            if not isinstance(summary, BaseException):
+                self._put_cached_summary(contents[post_id], summary)
+            results[post_id] = summary
+        
+        return results
     
     def _fetch_comments_for_summary(
         self, 
@@ -178,15 +580,9 @@ class PostSummarizer:
             评论文本
         """
         try:
-            submission = fetcher.reddit.submission(id=post_id)
-            submission.comments.replace_more(limit=0)
-            
-            comments = []
-            for comment in submission.comments[:max_comments]:
-                if hasattr(comment, 'body') and comment.body != '[deleted]':
-                    # 限制每条评论长度
-                    comment_text = comment.body[:200]
-                    comments.append(f"- {comment_text}")
+            # 评论的获取与缓存由fetcher负责
+            snippets = fetcher.fetch_comment_snippets(post_id, max_comments)
+            comments = [f"- {comment_text}" for comment_text in snippets]
             
             return "\n".join(comments) if comments else "无有效评论"
         
@@ -194,6 +590,7 @@ class PostSummarizer:
             logger.warning(f"获取帖子 {post_id} 评论失败: {e}")
             return "无法获取评论"
     
+    @timed("summarizer.call_llm_for_summary")
     def _call_llm_for_summary(self, content: str) -> str:
         """调用LLM生成摘要
         
@@ -206,42 +603,144 @@ class PostSummarizer:
         Raises:
             Exception: 如果LLM调用失败
         """
-        prompt = f"""请为以下Reddit帖子生成一个简洁的摘要，要求：
-1. 摘要字数控制在100字以内
-2. 突出帖子的核心内容和要点
-3. 使用中文
-4. 直接输出摘要，不要添加任何前缀或说明
-
-帖子内容：
-{content}
-
-摘要："""
-        
         try:
-            response = self.llm_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一个专业的内容摘要助手，擅长提取核心信息并生成简洁的摘要。"
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=200,
-            )
-            
-            summary = response.choices[0].message.content.strip()
-            # 确保摘要不超过100字
-            if len(summary) > 100:
-                summary = summary[:100]
-            
-            return summary
+            response = self._create_completion(**self._summary_request(content))
+            return self._clean_summary(response.choices[0].message.content)
         
         except Exception as e:
             logger.error(f"LLM调用失败: {e}")
             # 失败时抛出异常，让上层处理
             raise Exception(f"LLM调用失败: {str(e)}")
+    
+    async def _acall_llm_for_summary(self, client, content: str) -> str:
+        """_call_llm_for_summary 的协程版本"""
+        try:
+            response = await self._acreate_completion(client, **self._summary_request(content))
+            return self._clean_summary(response.choices[0].message.content)
+        
+        except Exception as e:
+            logger.error(f"LLM调用失败: {e}")
+            raise Exception(f"LLM调用失败: {str(e)}")
+    
+    def _summary_request(self, content: str) -> Dict[str, Any]:
+        """单帖摘要请求的参数"""
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": SUMMARY_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": SUMMARY_PROMPT_TEMPLATE.format(content=content)
+                }
+            ],
+            temperature=0.3,
+            max_tokens=200,
+        )
+    
+    @staticmethod
+    def _clean_summary(text: str) -> str:
+        summary = text.strip()
+        # 确保摘要不超过100字
+        if len(summary) > 100:
+            summary = summary[:100]
+        return summary
+    
+    @timed("summarizer.call_llm_for_batch")
+    def _call_llm_for_batch(self, contents: Dict[str, str]) -> Dict[str, str]:
+        """调用LLM为多个帖子生成摘要
+        
+        Args:
+            contents: {post_id: 帖子内容}
+        
+        Returns:
+            成功解析的摘要 {post_id: 摘要文本}，可能少于输入
+        
+        Raises:
+            Exception: 如果LLM调用失败
+        """
+        response = self._create_completion(**self._batch_request(contents))
+        return self._parse_batch_response(response.choices[0].message.content or '', contents)
+    
+    def _batch_request(self, contents: Dict[str, str]) -> Dict[str, Any]:
+        """批量摘要请求的参数"""
+        items = [{"id": post_id, "content": content} for post_id, content in contents.items()]
+        prompt = SUMMARY_BATCH_PROMPT_TEMPLATE.format(
+            posts=json.dumps(items, ensure_ascii=False, separators=(',', ':'))
+        )
+        
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": SUMMARY_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.3,
+            max_tokens=200 * len(contents),
+        )
+    
+    @staticmethod
+    def _parse_batch_response(text: str, contents: Dict[str, str]) -> Dict[str, str]:
+        """从批量响应中解析 {post_id: 摘要}，只保留输入中存在且非空的条目"""
+        # 模型有时会把JSON包在代码块或说明文字里，截取最外层的花括号
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end <= start:
+            return {}
+        
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+        
+        if not isinstance(data, dict):
+            return {}
+        
+        summaries = {}
+        for post_id, summary in data.items():
+            if post_id in contents and isinstance(summary, str) and summary.strip():
+                # 与单帖请求一致，摘要不超过100字
+                summaries[post_id] = summary.strip()[:100]
+        return summaries
+    
+    def _create_completion(self, **kwargs):
+        """在自适应并发上限内调用LLM，429/超时/连接错误按带抖动的指数退避重试"""
+        return call_with_retry(
+            self._create_completion_once,
+            retry_on=RETRYABLE_LLM_ERRORS,
+            max_retries=SUMMARY_CONFIG.get("max_retries", 4),
+            base_delay=SUMMARY_CONFIG.get("retry_base_delay", 1.0),
+            max_delay=SUMMARY_CONFIG.get("retry_max_delay", 30.0),
+            **kwargs
+        )
+    
+    def _create_completion_once(self, **kwargs):
+        with self.concurrency.slot():
+            response = self.llm_client.chat.completions.create(**kwargs)
+        record_llm_usage(getattr(response, 'usage', None))
+        return response
+    
+    async def _acreate_completion(self, client, **kwargs):
+        """_create_completion 的协程版本，使用调用方事件循环内的异步客户端"""
+        return await async_call_with_retry(
+            self._acreate_completion_once,
+            client,
+            retry_on=RETRYABLE_LLM_ERRORS,
+            max_retries=SUMMARY_CONFIG.get("max_retries", 4),
+            base_delay=SUMMARY_CONFIG.get("retry_base_delay", 1.0),
+            max_delay=SUMMARY_CONFIG.get("retry_max_delay", 30.0),
+            **kwargs
+        )
+    
+    async def _acreate_completion_once(self, client, **kwargs):
+        async with self.concurrency.async_slot():
+            response = await client.chat.completions.create(**kwargs)
+        record_llm_usage(getattr(response, 'usage', None))
+        return response
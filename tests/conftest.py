@@ -0,0 +1,6 @@
+"""测试配置：模块位于仓库根目录，直接加入导入路径"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
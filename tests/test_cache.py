@@ -0,0 +1,18 @@
+"""cache：帖子字段合并"""
+
+from cache import RedditCache
+
+TTL = {'stable': 3600, 'volatile': 3600, 'comments': 3600, 'listing': 3600}
+
+
+def test_put_post_merges_stable_and_volatile_fields(tmp_path):
+    cache = RedditCache(str(tmp_path / 'cache.sqlite3'), TTL)
+    cache.put_post({'id': 'a', 'title': 't', 'score': 5, 'stickied': True, 'locked': False})
+    cache.put_post({'id': 'a', 'content': 'full text', 'score': 7})
+
+    post = cache.get_post('a')
+    assert post['title'] == 't'
+    assert post['content'] == 'full text'
+    assert post['score'] == 7
+    assert post['stickied'] is True
+    assert post['locked'] is False
@@ -0,0 +1,44 @@
+"""keyword_matcher：单词边界、多词关键词与复数形式"""
+
+from keyword_matcher import KeywordMatcher, count_keyword_matches, count_keyword_matches_many
+
+
+def test_word_boundaries():
+    matcher = KeywordMatcher(['ai', 'rag'])
+    assert matcher.match("He said the drag race was fun") == ()
+    assert matcher.match("Open-source AI with RAG") == ('ai', 'rag')
+
+
+def test_multi_word_keywords():
+    matcher = KeywordMatcher(['machine learning', 'fine-tune'])
+    assert matcher.match("Machine Learning: how to fine-tune") == ('machine learning', 'fine-tune')
+    assert matcher.match("machine that is learning") == ()
+
+
+def test_plural_variants_map_to_keyword():
+    matcher = KeywordMatcher(['llm', 'model', 'fine-tune'])
+    assert matcher.match("LLMs and models") == ('llm', 'model')
+    assert matcher.match("fine-tunes") == ('fine-tune',)
+
+
+def test_words_are_not_stemmed():
+    matcher = KeywordMatcher(['bias', 'gpu'])
+    assert matcher.match("bias") == ('bias',)
+    assert matcher.match("bia") == ()
+    assert matcher.match("GPUs") == ('gpu',)
+
+
+def test_results_follow_keyword_order_and_deduplicate():
+    matcher = KeywordMatcher(['gpt', 'openai', 'gpt'])
+    assert matcher.keywords == ['gpt', 'openai']
+    assert matcher.match("OpenAI gpt gpt") == ('gpt', 'openai')
+
+
+def test_count_keyword_matches():
+    posts = [
+        {'title': 'Agents and RAG', 'selftext_preview': 'using local models'},
+        {'title': 'Nothing here', 'selftext_preview': ''},
+    ]
+    keywords = ['agent', 'rag', 'model', 'unseen keyword']
+    assert count_keyword_matches(posts[0], keywords) == 3
+    assert count_keyword_matches_many(posts, keywords) == [3, 0]
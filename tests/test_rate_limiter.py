@@ -0,0 +1,66 @@
+"""rate_limiter：令牌预占与透支后的等待时间"""
+
+import pytest
+
+import rate_limiter
+from rate_limiter import RedditRateLimiter, TokenBucketRateLimiter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', fake)
+    return fake
+
+
+def test_token_bucket_reserve_accounting(clock):
+    limiter = TokenBucketRateLimiter(requests_per_minute=60, burst=3)
+    assert limiter.reserve(2) == 0.0
+    assert limiter.reserve(1) == 0.0
+    # 桶已空：透支的令牌按每秒1个补充
+    assert limiter.reserve(2) == pytest.approx(2.0)
+    assert limiter.reserve(1) == pytest.approx(3.0)
+
+    clock.now += 3.0
+    assert limiter.reserve(1) == pytest.approx(1.0)
+
+
+def test_token_bucket_caps_cost_at_capacity(clock):
+    limiter = TokenBucketRateLimiter(requests_per_minute=60, burst=2)
+    assert limiter.reserve(10) == 0.0
+    assert limiter.reserve(1) == pytest.approx(1.0)
+
+
+class _Reddit:
+    def __init__(self, remaining):
+        self.auth = type('Auth', (), {'limits': {'remaining': remaining, 'reset_timestamp': None}})()
+
+
+def test_reddit_limiter_no_wait_with_ample_budget(clock):
+    limiter = RedditRateLimiter(_Reddit(remaining=500), reserve=10, pacing_threshold=100)
+    assert limiter.reserve(5) == 0.0
+
+
+def test_reddit_limiter_paces_reservations(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, 'time', lambda: 0.0)
+    limiter = RedditRateLimiter(_Reddit(remaining=60), window_seconds=600, reserve=10, pacing_threshold=100)
+    # 600秒窗口内还能用 59-10=49 个请求：首个请求不等待，之后每个请求间隔递增
+    first = limiter.reserve(1)
+    second = limiter.reserve(1)
+    assert first == 0.0
+    assert second == pytest.approx(600 / 49)
+
+
+def test_reddit_limiter_falls_back_without_headers(clock):
+    fallback = TokenBucketRateLimiter(requests_per_minute=60, burst=1)
+    limiter = RedditRateLimiter(_Reddit(remaining=None), fallback=fallback)
+    assert limiter.reserve(1) == 0.0
+    assert limiter.reserve(1) == pytest.approx(1.0)
@@ -0,0 +1,55 @@
+"""report_index：全文搜索与关键词首次上榜时间"""
+
+import json
+
+import pytest
+
+from report_index import ReportIndex
+
+
+def _write_report(reports_dir, stamp, posts, trending):
+    day_dir = reports_dir / stamp[:4] / stamp[4:6] / stamp[6:8]
+    day_dir.mkdir(parents=True, exist_ok=True)
+    (day_dir / f"report_{stamp}.md").write_text("# report\n", encoding='utf-8')
+    report_data = {
+        'timeframe_rankings': {'hot': posts, 'week': [], 'month': []},
+        'quality_ranking': [],
+        'trend_analysis': {'keyword_trends': {
+            'keyword_frequency': {keyword: 10 for keyword in trending + ['rag']},
+            'trending_keywords': trending,
+        }},
+    }
+    (day_dir / f"report_{stamp}.json").write_text(json.dumps(report_data), encoding='utf-8')
+
+
+@pytest.fixture
+def index(tmp_path):
+    reports_dir = tmp_path / 'reports'
+    _write_report(reports_dir, '20260101_120000',
+                  [{'id': 'p1', 'title': 'GPT-4 beats benchmarks', 'subreddit': 'ml', 'summary': 'evals'}],
+                  trending=[])
+    _write_report(reports_dir, '20260102_120000',
+                  [{'id': 'p1', 'title': 'GPT-4 beats benchmarks', 'subreddit': 'ml'},
+                   {'id': 'p2', 'title': 'Local llama quantization', 'subreddit': 'LocalLLaMA'}],
+                  trending=['llm'])
+    report_index = ReportIndex(str(tmp_path / 'index.sqlite3'))
+    assert report_index.update(str(reports_dir))['indexed'] == 2
+    yield report_index
+    report_index.close()
+
+
+def test_search_handles_symbols_and_deduplicates(index):
+    results = index.search('gpt-4')
+    assert [row['post_id'] for row in results] == ['p1']
+    assert results[0]['report_id'] == 'report_20260102_120000'
+    assert index.search('llama quantization')[0]['post_id'] == 'p2'
+    assert index.search('"unbalanced') == []
+
+
+def test_first_trending(index):
+    assert index.first_trending('LLM') == '2026-01-02T12:00:00'
+    assert index.first_trending('rag') is None
+
+
+def test_update_skips_unchanged_reports(index, tmp_path):
+    assert index.update(str(tmp_path / 'reports')) == {'indexed': 0, 'unchanged': 2, 'removed': 0}
@@ -0,0 +1,39 @@
+"""snapshot_store：差分编码的保存/加载与增长速度"""
+
+import numpy as np
+
+from snapshot_store import SnapshotStore
+
+
+def test_delta_encoding_round_trip(tmp_path):
+    path = tmp_path / 'snapshots.npz'
+    store = SnapshotStore(str(path), min_interval=60)
+    store.record([{'id': 'a', 'score': 10, 'num_comments': 1, 'upvote_ratio': 0.9}], timestamp=1_000_000)
+    store.record([{'id': 'a', 'score': 25, 'num_comments': 4, 'upvote_ratio': 0.95},
+                  {'id': 'b', 'score': 7, 'num_comments': 0}], timestamp=1_003_600)
+    store.save()
+
+    loaded = SnapshotStore(str(path), min_interval=60)
+    assert len(loaded) == 3
+    assert loaded.trajectory('a') == store.trajectory('a')
+    assert [point['score'] for point in loaded.trajectory('a')] == [10, 25]
+    assert loaded.trajectory('b')[0]['upvote_ratio'] is None
+
+
+def test_growth_rates(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.npz'), min_interval=60)
+    store.record([{'id': 'a', 'score': 10, 'num_comments': 2}], timestamp=0 + 10_000)
+    store.record([{'id': 'a', 'score': 30, 'num_comments': 6}], timestamp=7200 + 10_000)
+    store.record([{'id': 'b', 'score': 5, 'num_comments': 0}], timestamp=7200 + 10_000)
+
+    score_rate, comment_rate, tracked = store.growth_rates(['a', 'b', 'missing'])
+    assert tracked.tolist() == [True, False, False]
+    assert np.allclose(score_rate, [10.0, 0.0, 0.0])
+    assert np.allclose(comment_rate, [2.0, 0.0, 0.0])
+
+
+def test_close_snapshots_are_merged(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.npz'), min_interval=3600)
+    store.record([{'id': 'a', 'score': 1}], timestamp=10_000)
+    store.record([{'id': 'a', 'score': 2}], timestamp=10_600)
+    assert [point['score'] for point in store.trajectory('a')] == [2]
@@ -0,0 +1,54 @@
+"""summarizer：同一次运行内摘要只生成一次"""
+
+import pytest
+
+import config
+from summarizer import PostSummarizer
+
+
+class _Fetcher:
+    def prefetch_submission_trees(self, post_ids):
+        pass
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    monkeypatch.setitem(config.SUMMARY_CACHE_CONFIG, 'enabled', False)
+    monkeypatch.setitem(config.SUMMARY_CONFIG, 'batch_size', 1)
+    monkeypatch.setitem(config.SUMMARY_CONFIG, 'async_fanout', False)
+    summarizer = PostSummarizer(model='test', api_key='test', base_url='http://localhost:1')
+    calls = []
+    monkeypatch.setattr(summarizer, '_call_llm_for_summary', lambda content: calls.append(content) or 'generated')
+    summarizer.calls = calls
+    yield summarizer
+    summarizer.close()
+
+
+def _posts(n):
+    return [{'id': f'p{i}', 'title': f'post {i}', 'selftext_preview': 'x' * 60} for i in range(n)]
+
+
+def test_seeded_summaries_are_kept_for_the_whole_run(summarizer):
+    posts = _posts(3)
+    assert summarizer.seed_summaries({'p0': 'seeded'}) == 1
+
+    for _ in range(2):
+        results = {post['id']: post['summary'] for post in summarizer.generate_summaries_for_posts(posts, _Fetcher())}
+        assert results == {'p0': 'seeded', 'p1': 'generated', 'p2': 'generated'}
+    assert len(summarizer.calls) == 2
+
+
+def test_failed_summaries_are_retried(summarizer, monkeypatch):
+    attempts = []
+
+    def flaky(content):
+        attempts.append(content)
+        if len(attempts) == 1:
+            raise ValueError('boom')
+        return 'ok'
+
+    monkeypatch.setattr(summarizer, '_call_llm_for_summary', flaky)
+    first = summarizer.generate_summaries_for_posts(_posts(1), _Fetcher())
+    assert first[0]['summary'] is None
+    second = summarizer.generate_summaries_for_posts(_posts(1), _Fetcher())
+    assert second[0]['summary'] == 'ok'
@@ -0,0 +1,41 @@
+"""topk 与 post_table：部分选择与排序等价，列式表的读写"""
+
+import numpy as np
+
+from post_table import PostTable
+from topk import select_top_k, top_k_indices
+
+
+def test_select_top_k_matches_stable_sort():
+    items = [('a', 3), ('b', 5), ('c', 3), ('d', 1), ('e', 5)]
+    key = lambda item: item[1]
+    for k in range(0, 7):
+        assert select_top_k(items, k, key=key) == sorted(items, key=key, reverse=True)[:k]
+
+
+def test_top_k_indices_matches_stable_argsort():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 5, size=50).astype(float)
+    for k in (0, 1, 7, 50, 60):
+        expected = np.argsort(-values, kind='stable')[:k]
+        assert top_k_indices(values, k).tolist() == expected.tolist()
+
+
+def test_post_table_columns_and_groups():
+    table = PostTable.from_posts_dict({
+        'hot_a': [{'id': '1', 'score': 10, 'subreddit': 'a'}, {'id': '2', 'score': 3, 'subreddit': 'a'}],
+        'day_b': [{'id': '3', 'subreddit': 'b', 'title': 't'}],
+    })
+    assert len(table) == 3
+    assert table.groups == {'hot_a': slice(0, 2), 'day_b': slice(2, 3)}
+    assert table.array('score').tolist() == [10, 3, 0]
+    assert table.column('title', '') == ['', '', 't']
+    assert not table.has('score', 2)
+
+    codes, categories = table.codes('subreddit')
+    assert [categories[code] for code in codes] == ['a', 'a', 'b']
+
+
+def test_post_table_round_trip():
+    posts = [{'id': '1', 'score': 4, 'author': 'x'}, {'id': '2', 'upvote_ratio': 0.5}]
+    assert PostTable.from_posts(posts).to_dicts() == posts
@@ -0,0 +1,46 @@
+"""trend_history：环形缓冲的窗口、同日覆盖与持久化"""
+
+from trend_history import TrendHistory
+
+
+def _observe_days(history, counts_by_day):
+    result = None
+    for day, count in enumerate(counts_by_day, start=1):
+        result = history.observe({'keywords': {'llm': count}}, run_date=f"2026-01-{day:02d}")
+    return result
+
+
+def test_ring_buffer_keeps_last_window_runs(tmp_path):
+    history = TrendHistory(str(tmp_path / 'history.npz'), window=3, min_history=2)
+    result = _observe_days(history, [1, 2, 3, 4, 10])
+    assert result['runs'] == 3
+    rising = result['keywords']['rising'][0]
+    assert rising['name'] == 'llm'
+    assert rising['velocity'] == 6.0
+    assert history.run_dates.tolist() == ['2026-01-04', '2026-01-05', '2026-01-03']
+
+
+def test_same_day_overwrites_run(tmp_path):
+    history = TrendHistory(str(tmp_path / 'history.npz'), window=5)
+    history.observe({'keywords': {'llm': 1}}, run_date='2026-01-01')
+    result = history.observe({'keywords': {'llm': 4}}, run_date='2026-01-01')
+    assert result['runs'] == 1
+    assert history.runs == 1
+
+
+def test_emerging_by_zscore(tmp_path):
+    history = TrendHistory(str(tmp_path / 'history.npz'), window=10, min_history=3, z_threshold=2.0)
+    result = _observe_days(history, [2, 2, 2, 2, 12])
+    assert [item['name'] for item in result['keywords']['emerging']] == ['llm']
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'history.npz')
+    history = TrendHistory(path, window=4)
+    _observe_days(history, [1, 3])
+    history.save()
+
+    loaded = TrendHistory(path, window=4)
+    assert loaded.runs == 2
+    result = loaded.observe({'keywords': {'llm': 6}}, run_date='2026-01-03')
+    assert result['keywords']['rising'][0]['velocity'] == 3.0
@@ -0,0 +1,60 @@
+"""
+TOP K 选择 - 排行榜、质量评分与趋势统计共用的部分选择工具
+
+只需要前K个时不对整个列表排序：列表使用 heapq.nlargest（O(n log k)），
+NumPy数组使用 np.argpartition（O(n)）。两者的结果都与
+sorted(..., reverse=True)[:k] 完全相同，分数相同时保持原顺序（稳定）。
+"""
+
+import heapq
+from typing import Any, Callable, Iterable, List, TypeVar
+
+import numpy as np
+
+T = TypeVar('T')
+
+
+def select_top_k(items: Iterable[T], k: int, key: Callable[[T], Any] = None) -> List[T]:
+    """
+    按key降序取前k个元素
+
+    与 sorted(items, key=key, reverse=True)[:k] 等价：key相同的元素保持原顺序。
+
+    Args:
+        items: 元素序列
+        k: 返回的元素数，不大于0时返回空列表
+        key: 排序键函数，None表示比较元素本身
+
+    Returns:
+        前k个元素（按key降序）
+    """
+    if k <= 0:
+        return []
+    # heapq.nlargest 内部以原位置作为次要比较键，结果是稳定的
+    return heapq.nlargest(k, items, key=key)
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    数值数组中最大的k个值的下标
+
+    与 np.argsort(-values, kind='stable')[:k] 等价：值相同时下标小的在前。
+
+    Args:
+        values: 一维数值数组
+        k: 返回的下标数
+
+    Returns:
+        下标数组（按值降序）
+    """
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        # 第k大的值作为阈值，所有不小于阈值的元素（包括并列的）按原顺序作为候选
+        threshold = values[np.argpartition(values, n - k)[n - k]]
+        candidates = np.flatnonzero(values >= threshold)
+    else:
+        candidates = np.arange(n)
+    order = np.argsort(-values[candidates], kind='stable')
+    return candidates[order[:k]]
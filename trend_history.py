@@ -0,0 +1,190 @@
+"""
+跨日趋势历史 - 关键词、社区、作者计数的滚动窗口与增速/异常检测
+
+每次运行把本次的计数写入环形缓冲区（每个序列保留最近 window 次运行，同一天多次运行
+只保留最后一次），然后只基于缓冲区计算：
+- velocity：与上一次运行相比的变化量
+- acceleration：velocity 相比上一次的变化量
+- zscore：本次计数相对窗口内历史均值的偏离（标准差下限为1，避免历史全为0时无穷大）
+
+历史以 npz 文件保存（每个维度一个名称数组与一个 [序列数, window] 的计数矩阵），
+每次运行的开销只与本次数据量和窗口大小有关，不需要重新处理历史报告。
+"""
+
+import logging
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Mapping
+
+import numpy as np
+
+from topk import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+
+class _SeriesBuffer:
+    """一个维度（如关键词）下所有序列的环形缓冲区"""
+
+    def __init__(self, window: int, names: List[str] = None, values: np.ndarray = None):
+        self.window = window
+        self.names: List[str] = list(names or [])
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.values = values if values is not None else np.zeros((0, window))
+
+    def ensure(self, names) -> None:
+        """为新出现的名称追加全0的序列"""
+        new_names = [name for name in names if name not in self.index]
+        if not new_names:
+            return
+        for name in new_names:
+            self.index[name] = len(self.names)
+            self.names.append(name)
+        self.values = np.vstack([self.values, np.zeros((len(new_names), self.window))])
+
+    def prune(self) -> None:
+        """删除窗口内全为0的序列"""
+        keep = np.flatnonzero(self.values.any(axis=1))
+        if len(keep) == len(self.names):
+            return
+        self.names = [self.names[i] for i in keep]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.values = self.values[keep]
+
+
+class TrendHistory:
+    """跨运行的趋势历史"""
+
+    DIMENSIONS = ('keywords', 'subreddits', 'authors')
+
+    def __init__(self, path: str, window: int = 30, min_history: int = 3,
+                 z_threshold: float = 2.0, top_k: int = 10):
+        """
+        初始化并加载历史
+
+        Args:
+            path: npz文件路径
+            window: 每个序列保留的运行次数
+            min_history: 计算z-score至少需要的历史运行次数（不含本次）
+            z_threshold: z-score不低于该值视为异常上升（新兴话题）
+            top_k: 每个维度输出的条目数
+        """
+        self.path = Path(path)
+        self.window = window
+        self.min_history = min_history
+        self.z_threshold = z_threshold
+        self.top_k = top_k
+
+        self.runs = 0       # 累计运行次数（同一天多次运行算一次）
+        self.head = -1      # 最近一次运行所在的列
+        self.run_dates = np.array([''] * window, dtype='<U10')
+        self.buffers = {dimension: _SeriesBuffer(window) for dimension in self.DIMENSIONS}
+        self._load()
+
+    def observe(self, counts: Mapping[str, Mapping[str, float]], run_date: str = None) -> Dict[str, Any]:
+        """
+        记录一次运行的计数并计算增速与异常
+
+        Args:
+            counts: {维度: {名称: 计数}}，维度为 keywords / subreddits / authors
+            run_date: 运行日期（YYYY-MM-DD），默认今天；与最近一次运行同一天时覆盖该次记录
+
+        Returns:
+            {"runs": 历史运行次数, 维度: {"emerging": [...], "rising": [...]}}
+        """
+        run_date = run_date or date.today().isoformat()
+        if self.head < 0 or self.run_dates[self.head] != run_date:
+            self.head = (self.head + 1) % self.window
+            self.runs += 1
+            self.run_dates[self.head] = run_date
+
+        result: Dict[str, Any] = {'runs': min(self.runs, self.window)}
+        for dimension in self.DIMENSIONS:
+            buffer = self.buffers[dimension]
+            dimension_counts = counts.get(dimension, {})
+            buffer.ensure(dimension_counts)
+            buffer.values[:, self.head] = 0
+            for name, value in dimension_counts.items():
+                buffer.values[buffer.index[name], self.head] = value
+            result[dimension] = self._metrics(buffer)
+        return result
+
+    def _metrics(self, buffer: _SeriesBuffer) -> Dict[str, List[Dict[str, Any]]]:
+        """按时间顺序取出窗口内的序列，计算本次的增速、加速度与z-score"""
+        n = min(self.runs, self.window)
+        if not buffer.names or n == 0:
+            return {'emerging': [], 'rising': []}
+
+        columns = [(self.head - i) % self.window for i in range(n - 1, -1, -1)]
+        series = buffer.values[:, columns]
+        current = series[:, -1]
+        previous = series[:, -2] if n >= 2 else np.zeros_like(current)
+        before_previous = series[:, -3] if n >= 3 else previous
+
+        velocity = current - previous if n >= 2 else np.zeros_like(current)
+        acceleration = velocity - (previous - before_previous) if n >= 3 else np.zeros_like(current)
+
+        history = series[:, :-1]
+        if history.shape[1] >= self.min_history:
+            zscore = (current - history.mean(axis=1)) / np.maximum(history.std(axis=1), 1.0)
+        else:
+            zscore = np.zeros_like(current)
+
+        def items(indices) -> List[Dict[str, Any]]:
+            return [{
+                'name': buffer.names[i],
+                'count': float(current[i]),
+                'velocity': round(float(velocity[i]), 3),
+                'acceleration': round(float(acceleration[i]), 3),
+                'zscore': round(float(zscore[i]), 3),
+            } for i in indices]
+
+        emerging = np.flatnonzero((zscore >= self.z_threshold) & (current > 0))
+        rising = np.flatnonzero(velocity > 0)
+        return {
+            'emerging': items(emerging[top_k_indices(zscore[emerging], self.top_k)]),
+            'rising': items(rising[top_k_indices(velocity[rising], self.top_k)]),
+        }
+
+    def save(self) -> None:
+        """删除窗口内全为0的序列后原子写入npz文件"""
+        arrays = {
+            'window': np.array(self.window),
+            'runs': np.array(self.runs),
+            'head': np.array(self.head),
+            'run_dates': self.run_dates,
+        }
+        for dimension, buffer in self.buffers.items():
+            buffer.prune()
+            arrays[f'{dimension}_names'] = np.array(buffer.names, dtype=str)
+            arrays[f'{dimension}_values'] = buffer.values
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        tmp_path.replace(self.path)
+        logger.info(f"趋势历史已保存: {self.runs} 次运行 -> {self.path}")
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if int(data['window']) != self.window:
+                    logger.warning(f"趋势历史的窗口大小 {int(data['window'])} 与配置 {self.window} 不同，重新开始记录")
+                    return
+                self.runs = int(data['runs'])
+                self.head = int(data['head'])
+                self.run_dates = data['run_dates'].astype('<U10')
+                for dimension in self.DIMENSIONS:
+                    self.buffers[dimension] = _SeriesBuffer(
+                        self.window, data[f'{dimension}_names'].tolist(), data[f'{dimension}_values']
+                    )
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning(f"读取趋势历史失败，重新开始记录: {exc}")
+            self.runs, self.head = 0, -1
+            self.run_dates = np.array([''] * self.window, dtype='<U10')
+            self.buffers = {dimension: _SeriesBuffer(self.window) for dimension in self.DIMENSIONS}
+            return
+        logger.info(f"趋势历史：已记录 {self.runs} 次运行")